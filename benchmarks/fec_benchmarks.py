@@ -0,0 +1,349 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from codes.registry import get_codec
+
+# Codes benchmarked by default, as registry specs, over frame sizes from 7 to 2040 bits
+CODEC_SPECS = ["hamming:4", "hamming:57", "bch:15,7", "bch:63,39", "bch:127,113", "ldpc:63,32", "ldpc:127,64",
+               "rs:16,48", "rs:16"]
+
+# Channels as "module:class" and their parameters, and the frame sizes (bits) they are timed on
+CHANNELS = {
+    "bsc": ("channels.BSC_channel:BSCChannel", (0.01,)),
+    "ge": ("channels.GE_channel:GilbertElliottChannel", (0.01, 0.1, 0.001, 0.8)),
+    "awgn": ("channels.AWGN_channel:AWGNChannel", (4.0, 0.5)),
+}
+CHANNEL_FRAME_BITS = [63, 255, 2040]
+
+BATCH_SIZES = [1, 64, 1024]
+
+# BER of the channel producing the words given to the decoders, so that they have errors to correct
+DECODE_BER = 0.01
+
+# Default timing budget: warm-up calls, repeated measurements, minimum duration of one measurement
+# (short calls are looped) and maximum time spent on one case
+WARMUP = 2
+REPEATS = 15
+MIN_TIME = 0.005
+MAX_TIME = 2.0
+
+# Latency budget: individual (un-looped) calls timed per case, and the time they may take at most
+LATENCY_SAMPLES = 200
+LATENCY_MAX_TIME = 5.0
+
+
+def time_call(function, warmup=WARMUP, repeats=REPEATS, min_time=MIN_TIME, max_time=MAX_TIME):
+    """
+    Measures the duration of a call.
+
+    The call is first run `warmup` times (to fill caches and compile JIT kernels). Each measurement
+    then loops the call enough times to last at least `min_time`, so that the timer resolution does
+    not dominate short calls. Measuring stops after `repeats` measurements, or earlier once
+    `max_time` is spent (keeping at least 3).
+
+    Parameters:
+    function (callable): Function called without arguments.
+    warmup (int): Number of calls before measuring.
+    repeats (int): Number of measurements.
+    min_time (float): Minimum duration of a measurement, in seconds.
+    max_time (float): Time budget of the measurements, in seconds.
+
+    Returns:
+    np.array: Duration of one call in each measurement, in seconds.
+    """
+    for _ in range(warmup):
+        function()
+
+    # Number of calls per measurement, doubled until a measurement lasts min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+    spent = elapsed
+    while len(timings) < repeats and (spent < max_time or len(timings) < 3):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed / number)
+        spent += elapsed
+    return np.array(timings)
+
+
+def time_calls(function, samples=LATENCY_SAMPLES, max_time=LATENCY_MAX_TIME):
+    """
+    Measures the latency of individual calls, one timer reading per call.
+
+    Unlike `time_call`, calls are not looped or averaged, so the percentiles of the result describe
+    the spread of single calls (e.g. p99 needs about 100 samples or more to mean anything). The
+    function should have been warmed up. Measuring stops after `samples` calls, or earlier once
+    `max_time` is spent (keeping at least 3).
+
+    Parameters:
+    function (callable): Function called without arguments.
+    samples (int): Number of calls to time.
+    max_time (float): Time budget of the measurements, in seconds.
+
+    Returns:
+    np.array: Duration of each call, in seconds.
+    """
+    latencies = []
+    spent = 0.0
+    while len(latencies) < samples and (spent < max_time or len(latencies) < 3):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+        spent += latencies[-1]
+    return np.array(latencies)
+
+
+def measure(function, timing, latency):
+    """
+    Returns the looped timings (for the throughput) and the single-call latencies of a function.
+
+    Parameters:
+    function (callable): Function called without arguments.
+    timing (dict): Keyword arguments of `time_call`.
+    latency (dict): Keyword arguments of `time_calls`.
+    """
+    timings = time_call(function, **timing)  # Also warms the function up for the latencies
+    return timings, time_calls(function, **latency)
+
+
+def summarize(name, kind, target, batch, frame_bits, payload_bits, timings, latencies):
+    """
+    Builds the result record of one case.
+
+    Throughput is the number of payload bits (information bits for the codecs, channel bits for
+    the channels) per second of the median looped call. Latencies are the percentiles of the
+    durations of individual calls, each processing one batch of `batch` frames (so for batch=1 they
+    are per-frame latencies).
+
+    Returns:
+    dict: The record.
+    """
+    latencies_us = latencies * 1e6
+    return {
+        "name": name,
+        "kind": kind,
+        "target": target,
+        "batch": batch,
+        "frame_bits": frame_bits,
+        "mbps": payload_bits * batch / np.median(timings) / 1e6,
+        "latency_us": {f"p{q}": float(np.percentile(latencies_us, q)) for q in (50, 90, 99)},
+        "latency_samples": len(latencies),
+        "repeats": len(timings),
+    }
+
+
+def codec_cases(spec, batch_sizes, rng, timing, latency):
+    """
+    Times the batched encoder and decoder of one codec.
+
+    Parameters:
+    spec (str): Registry spec of the codec.
+    batch_sizes (list[int]): Numbers of frames per call.
+    rng (np.random.Generator): Generator for the messages and the channel errors.
+    timing (dict): Keyword arguments of `time_call`.
+    latency (dict): Keyword arguments of `time_calls`.
+
+    Returns:
+    list[dict]: The encode and decode records of every batch size.
+    """
+    from channels.BSC_channel import BSCChannel
+
+    codec = get_codec(spec)
+    records = []
+    for batch in batch_sizes:
+        messages = rng.integers(0, 2, (batch, codec.k), dtype=np.uint8)
+        encoded = np.asarray(codec.encode_batch(messages), dtype=np.uint8)
+        received, _ = BSCChannel(DECODE_BER, rng=rng).transmit(encoded)
+
+        timings = measure(lambda: codec.encode_batch(messages), timing, latency)
+        records.append(summarize(f"encode/{spec}/batch={batch}", "encode", spec, batch, codec.n, codec.k, *timings))
+        timings = measure(lambda: codec.decode_batch(received), timing, latency)
+        records.append(summarize(f"decode/{spec}/batch={batch}", "decode", spec, batch, codec.n, codec.k, *timings))
+    return records
+
+
+def channel_cases(name, batch_sizes, frame_sizes, rng, timing, latency):
+    """
+    Times the `transmit` method of one channel.
+
+    Returns:
+    list[dict]: The records of every frame size and batch size.
+    """
+    path, params = CHANNELS[name]
+    module, attribute = path.split(":")
+    channel = getattr(importlib.import_module(module), attribute)(*params, rng=rng)
+
+    records = []
+    for frame_bits in frame_sizes:
+        for batch in batch_sizes:
+            bits = rng.integers(0, 2, (batch, frame_bits), dtype=np.uint8)
+            timings = measure(lambda: channel.transmit(bits), timing, latency)
+            records.append(summarize(f"channel/{name}/n={frame_bits}/batch={batch}", "channel", name, batch,
+                                     frame_bits, frame_bits, *timings))
+    return records
+
+
+def metadata():
+    """
+    Returns a description of the machine and the code version the benchmarks ran on.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(codecs=CODEC_SPECS, channels=tuple(CHANNELS), batch_sizes=BATCH_SIZES,
+                   frame_sizes=CHANNEL_FRAME_BITS, pattern=None, seed=0, verbose=True,
+                   latency_samples=LATENCY_SAMPLES, latency_max_time=LATENCY_MAX_TIME, **timing):
+    """
+    Runs the benchmark cases.
+
+    Parameters:
+    codecs (list[str]): Registry specs of the codecs.
+    channels (list[str]): Names of the channels (keys of CHANNELS).
+    batch_sizes (list[int]): Numbers of frames per call.
+    frame_sizes (list[int]): Frame sizes (bits) of the channel cases.
+    pattern (str, optional): Only the cases whose codec spec or channel name contains it are run.
+    seed (int): Seed of the benchmark data.
+    verbose (bool): If True, print each result.
+    latency_samples (int): Number of individual calls timed per case for the latency percentiles.
+    latency_max_time (float): Time budget of the latency measurements of a case, in seconds.
+    **timing: Keyword arguments of `time_call`.
+
+    Returns:
+    dict: The metadata and the list of result records.
+    """
+    latency = {"samples": latency_samples, "max_time": latency_max_time}
+    records = []
+    cases = [(codec_cases, spec, (batch_sizes,)) for spec in codecs]
+    cases += [(channel_cases, name, (batch_sizes, frame_sizes)) for name in channels]
+    for run_case, target, args in cases:
+        if pattern and pattern not in target:
+            continue
+        # Every case draws its data from the seed, whichever cases are filtered out
+        for record in run_case(target, *args, np.random.default_rng(seed), timing, latency):
+            records.append(record)
+            if verbose:
+                print(f"{record['name']:40s} {record['mbps']:10.3f} Mbit/s   "
+                      f"p50 {record['latency_us']['p50']:10.2f} p99 {record['latency_us']['p99']:10.2f} us/call",
+                      file=sys.stderr)
+    return {"metadata": metadata(), "results": records}
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares the throughput of two benchmark runs case by case.
+
+    Parameters:
+    baseline (dict): Benchmark output of the reference version.
+    current (dict): Benchmark output of the version under test.
+    threshold (float): Relative throughput loss counted as a regression, e.g. 0.1 for 10 %.
+
+    Returns:
+    list[tuple]: (name, baseline Mbit/s, current Mbit/s, ratio, regressed) for every case present
+    in both runs, in the order of the current run.
+    """
+    reference = {record["name"]: record["mbps"] for record in baseline["results"]}
+    rows = []
+    for record in current["results"]:
+        if record["name"] in reference:
+            ratio = record["mbps"] / reference[record["name"]]
+            rows.append((record["name"], reference[record["name"]], record["mbps"], ratio, ratio < 1.0 - threshold))
+    return rows
+
+
+def main(argv=None):
+    """
+    Command-line entry point: `run` measures and writes JSON, `compare` reports regressions.
+
+    Parameters:
+    argv (list[str], optional): Arguments; defaults to the command line.
+
+    Returns:
+    int: Exit status, 1 when `compare` finds a regression.
+    """
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmarks of the codecs and channels.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("-o", "--output", help="JSON output file (default: standard output)")
+    run.add_argument("--codecs", nargs="*", default=CODEC_SPECS, help="registry specs of the codecs")
+    run.add_argument("--channels", nargs="*", default=list(CHANNELS), choices=list(CHANNELS))
+    run.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    run.add_argument("--frame-sizes", nargs="+", type=int, default=CHANNEL_FRAME_BITS,
+                     help="frame sizes (bits) of the channel cases")
+    run.add_argument("-k", "--filter", help="only run the cases whose codec spec or channel name contains this")
+    run.add_argument("--warmup", type=int, default=WARMUP)
+    run.add_argument("--repeats", type=int, default=REPEATS)
+    run.add_argument("--min-time", type=float, default=MIN_TIME, help="minimum seconds per measurement")
+    run.add_argument("--max-time", type=float, default=MAX_TIME, help="time budget per case, in seconds")
+    run.add_argument("--latency-samples", type=int, default=LATENCY_SAMPLES,
+                     help="individual calls timed per case for the latency percentiles")
+    run.add_argument("--latency-max-time", type=float, default=LATENCY_MAX_TIME,
+                     help="time budget of the latency measurements per case, in seconds")
+    run.add_argument("--seed", type=int, default=0)
+
+    check = commands.add_parser("compare", help="compare two benchmark outputs")
+    check.add_argument("baseline", help="JSON output of the reference version")
+    check.add_argument("current", help="JSON output of the version under test")
+    check.add_argument("--threshold", type=float, default=0.1,
+                       help="relative throughput loss reported as a regression (default 0.1)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        output = run_benchmarks(args.codecs, args.channels, args.batch_sizes, args.frame_sizes, args.filter,
+                                args.seed, latency_samples=args.latency_samples,
+                                latency_max_time=args.latency_max_time, warmup=args.warmup, repeats=args.repeats,
+                                min_time=args.min_time, max_time=args.max_time)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(output, file, indent=2)
+        else:
+            json.dump(output, sys.stdout, indent=2)
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    rows = compare(baseline, current, args.threshold)
+    for name, before, after, ratio, regressed in rows:
+        print(f"{name:40s} {before:10.3f} -> {after:10.3f} Mbit/s  x{ratio:5.2f}{'  REGRESSION' if regressed else ''}")
+    regressions = sum(row[4] for row in rows)
+    print(f"{len(rows)} cases compared, {regressions} regressions (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import numpy as np
+
+from codes.bitvector import BitVector
+
+MODULATIONS = ("bpsk", "qpsk")
+
+
+class AWGNChannel:
+    """
+    The AWGNChannel class simulates an Additive White Gaussian Noise channel with BPSK or
+    Gray-mapped QPSK modulation on whole batches of frames, and returns soft decisions.
+
+    The output of `transmit` is the log-likelihood ratio log(P(bit = 0) / P(bit = 1)) of every bit,
+    so a positive value means 0 and its magnitude is the reliability. This is the convention of the
+    LDPC decoder; hard-decision decoders slice the LLRs with `hard_decision`.
+
+    The noise level follows from Eb/N0, the energy per information bit: with code rate R and
+    b bits per symbol, Es/N0 = R * b * Eb/N0. Symbols have unit energy.
+
+    Attributes:
+        ebn0_db (float): Eb/N0 in dB.
+        rate (float): Code rate k/n of the transmitted frames.
+        modulation (str): "bpsk" or "qpsk".
+        bits_per_symbol (int): Number of bits carried by one symbol.
+        noise_variance (float): Variance of the noise per real dimension (N0 / 2).
+        rng (np.random.Generator): Random number generator used for every draw.
+    """
+
+    def __init__(self, ebn0_db, rate=1.0, modulation="bpsk", rng=None):
+        """
+        Initializes the channel with its signal-to-noise ratio.
+
+        Args:
+            ebn0_db (float): Eb/N0 in dB.
+            rate (float): Code rate k/n, between 0 (excluded) and 1.
+            modulation (str): "bpsk" or "qpsk".
+            rng (np.random.Generator or int, optional): Generator (or seed for one) used to
+                draw the noise.
+        """
+        if modulation not in MODULATIONS:
+            raise ValueError(f"Unknown modulation {modulation}, expected one of {MODULATIONS}")
+        if not 0.0 < rate <= 1.0:
+            raise ValueError(f"Code rate must be in (0, 1], got {rate}")
+
+        self.ebn0_db = ebn0_db
+        self.rate = rate
+        self.modulation = modulation
+        self.bits_per_symbol = 1 if modulation == "bpsk" else 2
+        esn0 = rate * self.bits_per_symbol * 10.0 ** (ebn0_db / 10.0)
+        self.noise_variance = 1.0 / (2.0 * esn0)
+        self.rng = np.random.default_rng(rng)
+
+    def modulate(self, bits):
+        """
+        Maps bits to unit-energy symbols (0 -> +1, 1 -> -1 on each real dimension).
+
+        Args:
+            bits (np.array): 0/1 array of shape (trials, n).
+
+        Returns:
+            np.array: float32 array of shape (trials, n) for BPSK, complex64 array of shape
+            (trials, ceil(n / 2)) for QPSK (an odd last bit is paired with a 0).
+        """
+        amplitudes = 1.0 - 2.0 * bits.astype(np.float32)
+        if self.modulation == "bpsk":
+            return amplitudes
+
+        if bits.shape[1] % 2:
+            amplitudes = np.pad(amplitudes, ((0, 0), (0, 1)), constant_values=1.0)
+        # Gray mapping: the even bit sits on the in-phase and the odd bit on the quadrature axis
+        return ((amplitudes[:, 0::2] + 1j * amplitudes[:, 1::2]) / np.sqrt(2.0)).astype(np.complex64)
+
+    def llr(self, symbols, n):
+        """
+        Computes the bit LLRs of received symbols.
+
+        Args:
+            symbols (np.array): Received symbols, as returned by `modulate` plus noise.
+            n (int): Number of bits per frame.
+
+        Returns:
+            np.array: float32 array of shape (trials, n).
+        """
+        if self.modulation == "bpsk":
+            return (2.0 / self.noise_variance * symbols).astype(np.float32)
+
+        scale = np.sqrt(2.0) / self.noise_variance  # 2 * amplitude / variance, amplitude 1 / sqrt(2)
+        llrs = np.empty((symbols.shape[0], 2 * symbols.shape[1]), dtype=np.float32)
+        llrs[:, 0::2] = scale * symbols.real
+        llrs[:, 1::2] = scale * symbols.imag
+        return llrs[:, :n]
+
+    def transmit(self, input_bits):
+        """
+        Transmits a batch of frames through the channel.
+
+        Args:
+            input_bits (np.array or BitVector): Bits to transmit, shape (n,) or (trials, n), or
+                packed frames.
+
+        Returns:
+            tuple: The float32 LLRs of the received bits (shape (..., n)) and the number of bits per
+            frame whose hard decision is wrong.
+        """
+        if isinstance(input_bits, BitVector):
+            input_bits = input_bits.to_bits()
+        input_bits = np.asarray(input_bits, dtype=np.uint8)
+        frames = input_bits.reshape(-1, input_bits.shape[-1])
+
+        symbols = self.modulate(frames)
+        sigma = np.sqrt(self.noise_variance)
+        if self.modulation == "bpsk":
+            symbols = symbols + sigma * self.rng.standard_normal(symbols.shape, dtype=np.float32)
+        else:
+            noise = self.rng.standard_normal(symbols.shape + (2,), dtype=np.float32)
+            symbols = symbols + sigma * (noise[..., 0] + 1j * noise[..., 1])
+
+        llrs = self.llr(symbols, frames.shape[1])
+        flipped_bits_count = (hard_decision(llrs) != frames).sum(axis=1)
+        return llrs.reshape(input_bits.shape), flipped_bits_count.reshape(input_bits.shape[:-1])
+
+
+def hard_decision(llrs):
+    """
+    Slices LLRs to bits: negative LLRs (more likely 1) become 1.
+
+    Args:
+        llrs (np.array): LLRs of any shape.
+
+    Returns:
+        np.array: uint8 array of the same shape.
+    """
+    return (np.asarray(llrs) < 0).astype(np.uint8)
@@ -1,35 +1,197 @@
 import numpy as np
 
-def bsc_channel(input_bits):
+from codes.bitvector import BitVector
+
+# Below this flip probability errors are drawn as sparse positions (geometric gaps)
+# instead of one uniform number per bit
+SPARSE_BER_THRESHOLD = 0.05
+
+
+class BSCChannel:
+    """
+    The BSCChannel class simulates a Binary Symmetric Channel on whole batches of frames.
+
+    At low BER the error pattern is generated by sampling the gaps between consecutive errors
+    from a geometric distribution, so the amount of random numbers drawn is proportional to the
+    number of errors rather than to the number of transmitted bits.
+
+    Attributes:
+        p (float): Bit flip probability (Bit Error Rate).
+        rng (np.random.Generator): Random number generator used for every draw.
+    """
+
+    def __init__(self, p, rng=None):
+        """
+        Initializes the channel with its flip probability.
+
+        Args:
+            p (float): Bit flip probability, between 0 and 1.
+            rng (np.random.Generator or int, optional): Generator (or seed for one) used to
+                draw the errors.
+        """
+        if not 0.0 <= p <= 1.0:
+            raise ValueError(f"BER must be between 0 and 1, got {p}")
+
+        self.p = p
+        self.rng = np.random.default_rng(rng)
+
+    def error_positions(self, trials, n):
+        """
+        Samples the positions of the flipped bits for a batch of frames.
+
+        The frames are treated as one stream of trials * n bits; the gaps between errors are
+        geometric with parameter p, which gives independent Bernoulli(p) flips.
+
+        Args:
+            trials (int): Number of frames.
+            n (int): Number of bits per frame.
+
+        Returns:
+            tuple: Two int64 arrays (rows, cols) with the frame index and the bit index of
+            every error, sorted by position in the stream.
+        """
+        total_bits = trials * n
+        if self.p == 0.0 or total_bits == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        # Draw slightly more gaps than the expected number of errors, extend if needed
+        expected = total_bits * self.p
+        chunk = int(expected + 5 * np.sqrt(expected)) + 16
+        positions = []
+        last = -1
+        while last < total_bits:
+            stream = last + np.cumsum(self.rng.geometric(self.p, size=chunk), dtype=np.int64)
+            positions.append(stream)
+            last = stream[-1]
+        positions = np.concatenate(positions)
+        positions = positions[positions < total_bits]
+
+        return np.divmod(positions, n)
+
+    def error_mask(self, trials, n):
+        """
+        Generates the error pattern for a batch of frames.
+
+        Args:
+            trials (int): Number of frames.
+            n (int): Number of bits per frame.
+
+        Returns:
+            np.array: Boolean array of shape (trials, n), True where a bit is flipped.
+        """
+        if self.p >= SPARSE_BER_THRESHOLD:
+            return self.rng.random((trials, n)) < self.p
+
+        errors = np.zeros((trials, n), dtype=bool)
+        rows, cols = self.error_positions(trials, n)
+        errors[rows, cols] = True
+        return errors
+
+    def transmit(self, input_bits):
+        """
+        Transmits a batch of frames through the channel.
+
+        Args:
+            input_bits (np.array or BitVector): Bits to transmit, shape (n,) or (trials, n), or
+                packed frames.
+
+        Returns:
+            tuple: The bits after transmission (same shape and type as the input; uint8 for
+            arrays) and the number of flipped bits per frame.
+        """
+        if isinstance(input_bits, BitVector):
+            packed, flipped_bits_count = self.transmit_packed(input_bits.words, input_bits.length)
+            return BitVector(packed, input_bits.length), flipped_bits_count
+
+        input_bits = np.asarray(input_bits, dtype=np.uint8)
+        frames = input_bits.reshape(-1, input_bits.shape[-1])
+
+        errors = self.error_mask(*frames.shape)
+
+        output_bits = (frames ^ errors).reshape(input_bits.shape)
+        flipped_bits_count = errors.sum(axis=1).reshape(input_bits.shape[:-1])
+        return output_bits, flipped_bits_count
+
+    def transmit_packed(self, packed_bits, n):
+        """
+        Transmits a batch of bit-packed frames through the channel.
+
+        Bits are packed most significant bit first within each word, so for uint8 words the
+        layout is the one produced by `np.packbits`. Only the words hit by an error are touched.
+
+        Args:
+            packed_bits (np.array): uint8 or uint64 array of shape (trials, words) holding the
+                packed frames.
+            n (int): Number of valid bits per frame (the padding bits are never flipped).
+
+        Returns:
+            tuple: The packed frames after transmission (same shape and dtype as the input) and
+            the number of flipped bits per frame.
+        """
+        packed_bits = np.array(packed_bits)
+        if packed_bits.dtype not in (np.uint8, np.uint64):
+            raise TypeError(f"Packed frames must be uint8 or uint64, got {packed_bits.dtype}")
+        frames = packed_bits.reshape(-1, packed_bits.shape[-1])
+        word_bits = 8 * frames.itemsize
+
+        rows, cols = self.error_positions(frames.shape[0], n)
+        words, offsets = np.divmod(cols, word_bits)
+        masks = np.left_shift(np.ones(1, dtype=frames.dtype), (word_bits - 1 - offsets).astype(frames.dtype))
+        # Several errors can land in the same word, so accumulate the XOR unbuffered
+        np.bitwise_xor.at(frames, (rows, words), masks)
+
+        flipped_bits_count = np.bincount(rows, minlength=frames.shape[0]).reshape(packed_bits.shape[:-1])
+        return frames.reshape(packed_bits.shape), flipped_bits_count
+
+    def log_likelihood(self, errors):
+        """
+        Computes the log-probability of error patterns under this channel.
+
+        Used by importance sampling to re-weight frames drawn from a channel with another BER.
+
+        Args:
+            errors (np.array): Boolean (or 0/1) error patterns of shape (trials, n).
+
+        Returns:
+            np.array: float64 array of shape (trials,) with the log-probability of each pattern.
+        """
+        errors = np.asarray(errors).reshape(-1, np.shape(errors)[-1])
+        flipped = errors.sum(axis=1)
+        return _xlog(flipped, self.p) + _xlog(errors.shape[1] - flipped, 1.0 - self.p)
+
+
+def _xlog(count, prob):
+    """
+    Returns count * log(prob), with 0 * log(0) taken as 0.
+    """
+    count = np.asarray(count, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, count * np.log(prob), 0.0)
+
+
+def bsc_channel(input_bits, ber=None):
     """
     Simulates a Binary Symmetric Channel (BSC) by flipping bits with a given Bit Error Rate (BER).
 
     Parameters:
     input_bits (list[int]): List of bits to be transmitted.
+    ber (float, optional): Bit Error Rate; asked for interactively when omitted.
 
     Returns:
     tuple: A tuple containing the list of bits after transmission through the BSC and the count of flipped bits.
     """
-    while True:
+    while ber is None:
         try:
             ber = float(input("\nInput BER (must be between 0.00 and 1.00):\n"))
-            if 0.0 <= ber <= 1.0:
-                break  # Exit the loop if valid
-            else:
+            if not 0.0 <= ber <= 1.0:
                 print("Error: BER must be between 0 and 1. Please try again.")
+                ber = None
         except ValueError:
             print("Error: Invalid input. Please enter a float value between 0 and 1.")
 
-    # Convert input_bits from string (if needed) to a NumPy array of integers
-    input_bits = np.array([int(bit) for bit in input_bits], dtype=int)
-
-    # Generate random numbers for each bit to simulate errors
-    random_values = np.random.rand(len(input_bits))
-
-    # Flip bits based on the BER
-    output_bits = np.where(random_values < ber, 1 - input_bits, input_bits)
-
-    # Count the number of bits that were flipped
-    flipped_bits_count = np.sum(output_bits != input_bits)
+    # Convert input_bits from string (if needed) to a NumPy array of bits
+    if isinstance(input_bits, str):
+        input_bits = np.frombuffer(input_bits.encode("ascii"), dtype=np.uint8) - ord("0")
 
-    return output_bits, flipped_bits_count
\ No newline at end of file
+    return BSCChannel(ber).transmit(input_bits)
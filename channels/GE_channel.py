@@ -1,17 +1,219 @@
 import numpy as np
 
-def gilbert_elliott_channel(input_bits):
+from channels.BSC_channel import _xlog
+from codes.bitvector import BitVector
+
+
+class GilbertElliottChannel:
+    """
+    The GilbertElliottChannel class simulates a two-state (Good/Bad) Markov channel on whole
+    batches of frames at once.
+
+    Instead of walking the bits one by one, the hidden state sequence is built from geometric
+    sojourn lengths: the channel stays in the Good state for Geometric(p_gb) bits and in the Bad
+    state for Geometric(p_bg) bits, which is exactly the distribution of the bit-by-bit Markov
+    chain. Every frame starts in the Good state.
+
+    Attributes:
+        p_gb (float): Probability of the Good-to-Bad transition.
+        p_bg (float): Probability of the Bad-to-Good transition.
+        p_g (float): Error probability in the Good state.
+        p_b (float): Error probability in the Bad state.
+        rng (np.random.Generator): Random number generator used for every draw.
+    """
+
+    def __init__(self, p_gb, p_bg, p_g, p_b, rng=None):
+        """
+        Initializes the channel with its transition and error probabilities.
+
+        Args:
+            p_gb (float): Probability of the Good-to-Bad transition.
+            p_bg (float): Probability of the Bad-to-Good transition.
+            p_g (float): Error probability in the Good state.
+            p_b (float): Error probability in the Bad state.
+            rng (np.random.Generator or int, optional): Generator (or seed for one) used to
+                draw states and errors.
+        """
+        for name, prob in (("p_gb", p_gb), ("p_bg", p_bg), ("p_g", p_g), ("p_b", p_b)):
+            if not 0.0 <= prob <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1, got {prob}")
+
+        self.p_gb = p_gb
+        self.p_bg = p_bg
+        self.p_g = p_g
+        self.p_b = p_b
+        self.rng = np.random.default_rng(rng)
+
+    def _sojourn_lengths(self, leave_prob, size, n):
+        """
+        Draws the number of bits spent in a state before leaving it.
+
+        Args:
+            leave_prob (float): Probability of leaving the state after each bit.
+            size (tuple): Shape of the returned array.
+            n (int): Frame length, used as the sojourn length of a state that is never left.
+
+        Returns:
+            np.array: int64 array of sojourn lengths (all >= 1).
+        """
+        if leave_prob == 0.0:
+            return np.full(size, n + 1, dtype=np.int64)
+        return self.rng.geometric(leave_prob, size=size).astype(np.int64)
+
+    def states(self, trials, n):
+        """
+        Generates the hidden state sequence for a batch of frames.
+
+        Args:
+            trials (int): Number of frames.
+            n (int): Number of bits per frame.
+
+        Returns:
+            np.array: uint8 array of shape (trials, n), 0 for the Good state and 1 for Bad.
+        """
+        # Expected number of Good/Bad pairs needed to cover a frame, with some headroom so
+        # that the extension loop below almost never runs
+        mean_cycle = (1.0 / self.p_gb if self.p_gb > 0 else n + 1) + (1.0 / self.p_bg if self.p_bg > 0 else n + 1)
+        pairs = int(1.25 * n / mean_cycle) + 4
+
+        ends = np.zeros((trials, 0), dtype=np.int64)
+        offset = np.zeros(trials, dtype=np.int64)
+        while True:
+            runs = np.empty((trials, 2 * pairs), dtype=np.int64)
+            runs[:, 0::2] = self._sojourn_lengths(self.p_gb, (trials, pairs), n)
+            runs[:, 1::2] = self._sojourn_lengths(self.p_bg, (trials, pairs), n)
+            new_ends = offset[:, None] + np.cumsum(runs, axis=1)
+            ends = np.concatenate([ends, new_ends], axis=1)
+            offset = new_ends[:, -1]
+            if offset.min() >= n:  # Every frame is fully covered by the drawn sojourns
+                break
+
+        # Each sojourn end is the index of the first bit in the next state: toggle there
+        rows, cols = np.nonzero(ends < n)
+        toggles = np.zeros((trials, n), dtype=np.uint8)
+        toggles[rows, ends[rows, cols]] = 1
+
+        return (np.cumsum(toggles, axis=1, dtype=np.int64) & 1).astype(np.uint8)
+
+    def transmit(self, input_bits, return_states=False):
+        """
+        Transmits a batch of frames through the channel.
+
+        Args:
+            input_bits (np.array or BitVector): Bits to transmit, shape (n,) or (trials, n), or
+                packed frames.
+            return_states (bool): If True, also return the hidden state trace.
+
+        Returns:
+            tuple: The bits after transmission (same shape and type as the input; uint8 for
+            arrays), the number of flipped bits per frame and, if `return_states` is True, the
+            state trace (0 = Good, 1 = Bad) as a uint8 array of shape (..., n). The trace is the
+            side information for erasure decoding, see `symbol_erasures`.
+        """
+        if isinstance(input_bits, BitVector):
+            shape = input_bits.shape + (input_bits.length,)
+        else:
+            input_bits = np.asarray(input_bits, dtype=np.uint8)
+            shape = input_bits.shape
+        trials, n = int(np.prod(shape[:-1])), shape[-1]
+
+        states = self.states(trials, n)
+        error_prob = np.where(states == 1, self.p_b, self.p_g)
+        errors = (self.rng.random((trials, n)) < error_prob).reshape(shape)
+
+        if isinstance(input_bits, BitVector):
+            output_bits = input_bits ^ BitVector.from_bits(errors)
+        else:
+            output_bits = input_bits ^ errors
+        flipped_bits_count = errors.sum(axis=-1)
+        states = states.reshape(shape)
+
+        if return_states:
+            return output_bits, flipped_bits_count, states
+        return output_bits, flipped_bits_count
+
+    def log_likelihood(self, errors, states):
+        """
+        Computes the log-probability of (state sequence, error pattern) pairs under this channel.
+
+        Used by importance sampling to re-weight frames drawn from a channel with other parameters.
+
+        Args:
+            errors (np.array): Boolean (or 0/1) error patterns of shape (trials, n).
+            states (np.array): State traces of shape (trials, n), as returned by `transmit`.
+
+        Returns:
+            np.array: float64 array of shape (trials,) with the log-probability of each frame.
+        """
+        errors = np.asarray(errors, dtype=bool).reshape(-1, np.shape(errors)[-1])
+        bad = np.asarray(states, dtype=bool).reshape(errors.shape)
+
+        # State transitions (every frame starts in the Good state with probability 1)
+        previous, current = bad[:, :-1], bad[:, 1:]
+        good_to_bad = (~previous & current).sum(axis=1)
+        good_to_good = (~previous & ~current).sum(axis=1)
+        bad_to_good = (previous & ~current).sum(axis=1)
+        bad_to_bad = (previous & current).sum(axis=1)
+
+        # Errors emitted in each state
+        good_errors = (errors & ~bad).sum(axis=1)
+        bad_errors = (errors & bad).sum(axis=1)
+        good_bits = (~bad).sum(axis=1)
+        bad_bits = bad.sum(axis=1)
+
+        return (_xlog(good_to_bad, self.p_gb) + _xlog(good_to_good, 1.0 - self.p_gb)
+                + _xlog(bad_to_good, self.p_bg) + _xlog(bad_to_bad, 1.0 - self.p_bg)
+                + _xlog(good_errors, self.p_g) + _xlog(good_bits - good_errors, 1.0 - self.p_g)
+                + _xlog(bad_errors, self.p_b) + _xlog(bad_bits - bad_errors, 1.0 - self.p_b))
+
+
+def symbol_erasures(states, symbol_bits=8, guard_bits=0):
+    """
+    Marks the symbols hit by a Bad-state burst, for erasure decoding of symbol codes such as
+    Reed-Solomon.
+
+    Args:
+        states (np.array): State traces of shape (..., n) as returned by `transmit` (1 = Bad).
+        symbol_bits (int): Number of bits per symbol; a trailing partial symbol counts as one.
+        guard_bits (int): Number of bits around each burst also assumed bad, since the burst
+            edges of an estimated state trace are uncertain.
+
+    Returns:
+        np.array: Boolean array of shape (..., ceil(n / symbol_bits)), True for the symbols
+        overlapping a (widened) burst.
+    """
+    bad = np.asarray(states, dtype=bool)
+    n = bad.shape[-1]
+    if guard_bits:
+        # Widen the bursts: a bit is bad if any bit within guard_bits of it is
+        padded = np.pad(bad, [(0, 0)] * (bad.ndim - 1) + [(guard_bits, guard_bits)])
+        window = np.cumsum(padded, axis=-1, dtype=np.int64)
+        window = np.concatenate([np.zeros(bad.shape[:-1] + (1,), dtype=np.int64), window], axis=-1)
+        bad = (window[..., 2 * guard_bits + 1:] - window[..., :n]) > 0
+
+    num_symbols = -(-n // symbol_bits)
+    padded = np.zeros(bad.shape[:-1] + (num_symbols * symbol_bits,), dtype=bool)
+    padded[..., :n] = bad
+    return padded.reshape(bad.shape[:-1] + (num_symbols, symbol_bits)).any(axis=-1)
+
+
+def gilbert_elliott_channel(input_bits, params=None):
     """
     Simulates a Gilbert-Elliott Channel by flipping bits based on state transition probabilities and error probabilities.
 
     Parameters:
     input_bits (list[int] or str): List of bits to be transmitted or a string of bits.
+    params (tuple, optional): The probabilities (p_gb, p_bg, p_g, p_b); asked for interactively when omitted.
 
     Returns:
     tuple: A tuple containing the list of bits after transmission through the Gilbert-Elliott Channel and the count of flipped bits.
     """
     # Ask user for parameters of the Gilbert-Elliott Channel
-    while True:
+    if params is not None:
+        if len(params) != 4:
+            raise ValueError(f"The Gilbert-Elliott channel takes 4 parameters (p_gb, p_bg, p_g, p_b), got {len(params)}")
+        p_gb, p_bg, p_g, p_b = params
+    while params is None:
         try:
             p_gb = float(input("\nInput p_gb (Probability of Good-to-Bad transition):\n"))
             p_bg = float(input("\nInput p_bg (Probability of Bad-to-Good transition):\n"))
@@ -28,33 +230,5 @@ def gilbert_elliott_channel(input_bits):
     if isinstance(input_bits, str):
         input_bits = np.array([int(bit) for bit in input_bits], dtype=int)
 
-    # Initialize state to 'Good' (0 = Good, 1 = Bad)
-    state = 0  # Start in Good state
-
-    # Output bits
-    output_bits = np.zeros(len(input_bits), dtype=int)
-
-    # Counter for flipped bits
-    flipped_bits_count = 0
-
-    for i in range(len(input_bits)):
-        # Determine error probability based on the current state
-        if state == 0:  # Good state
-            error_prob = p_g
-        else:  # Bad state
-            error_prob = p_b
-
-        # Generate a random number to see if we flip the bit
-        if np.random.rand() < error_prob:
-            output_bits[i] = 1 - input_bits[i]  # Flip the bit
-            flipped_bits_count += 1  # Increment the flip counter
-        else:
-            output_bits[i] = input_bits[i]  # No error
-
-        # Determine the next state based on transition probabilities
-        if state == 0:  # If in Good state
-            state = 1 if np.random.rand() < p_gb else 0  # Switch to Bad with probability p_gb
-        else:  # If in Bad state
-            state = 0 if np.random.rand() < p_bg else 1  # Switch to Good with probability p_bg
-
-    return output_bits, flipped_bits_count
\ No newline at end of file
+    channel = GilbertElliottChannel(p_gb, p_bg, p_g, p_b)
+    return channel.transmit(input_bits)
@@ -1,24 +1,143 @@
 import galois
 import numpy as np
 
+from channels.AWGN_channel import hard_decision
+from codes.BCH_decoder import TABLE_MAX_N, TableBCHDecoder
+from codes.bitvector import BitVector
+from codes.syndrome_decoder import MAX_REDUNDANCY, SyndromeTableDecoder
+
+BACKENDS = ("galois", "table", "syndrome")
+
+# Largest n - k for which the syndrome table is the default backend (2^16 syndromes)
+SYNDROME_DEFAULT_MAX_REDUNDANCY = 16
+
+# galois.BCH codecs built in this process, keyed by (n, k); building one solves for the generator
+# polynomial, so every BCHCode with the same parameters shares it
+_BCH_CACHE = {}
+
+
+def _galois_bch(n, k):
+    """
+    Returns the galois.BCH codec of the given parameters, constructing it once per process.
+
+    Args:
+        n (int): Length of the codeword.
+        k (int): Length of the message.
+
+    Returns:
+        galois.BCH: The codec.
+    """
+    if (n, k) not in _BCH_CACHE:
+        _BCH_CACHE[(n, k)] = galois.BCH(n=n, k=k, field=galois.GF(2))
+    return _BCH_CACHE[(n, k)]
+
 
 class BCHCode:
-    def __init__(self, n, k, t):
+    def __init__(self, n, k, t=None, backend=None):
         """
         Initialize the BCH code parameters.
 
         Args:
             n (int): Length of the codeword.
             k (int): Length of the message (information bits).
-            t (int): Error correction capability (number of errors that can be corrected).
+            t (int, optional): Error correction capability (number of errors that can be corrected).
+                It must match the capability of the (n, k) code; defaults to it.
+            backend (str, optional): Batch decoder: "syndrome" (coset-leader lookup, n - k <=
+                MAX_REDUNDANCY), "table" (Berlekamp-Massey with NumPy tables, primitive codes with
+                n <= TABLE_MAX_N) or "galois". Defaults to "syndrome" for n - k <=
+                SYNDROME_DEFAULT_MAX_REDUNDANCY, then to "table" when the code supports it. All
+                backends correct up to t errors and flag heavier patterns they cannot decode.
         """
         self.n = n  # Length of the codeword
         self.k = k  # Length of the message (number of information bits)
-        self.t = t  # Error correction capability
         self.galois_field = galois.GF(2)  # GF(2) field for binary operations
 
-        # BCH code definition using the Galois field
-        self.bch = galois.BCH(n=self.n, k=self.k, field=self.galois_field)
+        # BCH code definition using the Galois field (shared between instances)
+        self.bch = _galois_bch(self.n, self.k)
+
+        # The capability follows from the designed distance d = 2t + 1 of the code
+        if t is not None and t != self.bch.t:
+            raise ValueError(f"The BCH({n}, {k}) code corrects t={self.bch.t} errors (designed distance "
+                             f"{self.bch.d}), not t={t}")
+        self.t = self.bch.t  # Error correction capability
+
+        if backend is None:
+            if n - k <= SYNDROME_DEFAULT_MAX_REDUNDANCY:
+                backend = "syndrome"
+            else:
+                backend = "table" if self.bch.is_primitive and n <= TABLE_MAX_N else "galois"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown BCH backend {backend}, expected one of {BACKENDS}")
+        if backend == "syndrome" and n - k > MAX_REDUNDANCY:
+            raise ValueError(f"The syndrome backend needs n - k <= {MAX_REDUNDANCY}, got {n - k}")
+        self.backend = backend
+
+        if backend == "syndrome":
+            # Bounded-distance table (weight <= t) on the binary parity-check matrix [P^T | I] of
+            # the systematic generator [I | P]
+            parity = np.asarray(self.bch.G, dtype=np.uint8)[:, k:]
+            self.parity_check = np.hstack([parity.T, np.eye(n - k, dtype=np.uint8)])
+            self.decoder = SyndromeTableDecoder(self.parity_check, max_weight=self.t)
+        else:
+            self.decoder = TableBCHDecoder(self.bch) if backend == "table" else None
+
+    @property
+    def rate(self):
+        """float: Code rate k / n."""
+        return self.k / self.n
+
+    def _as_bits(self, words):
+        """
+        Converts packed words or soft values (LLRs, positive for 0) to a uint8 bit array.
+        """
+        if isinstance(words, BitVector):
+            return words.to_bits()
+        words = np.asarray(words)
+        if np.issubdtype(words.dtype, np.floating):
+            return hard_decision(words)  # The algebraic decoder works on hard decisions
+        return words.astype(np.uint8)
+
+    def encode_batch(self, data):
+        """
+        Encodes a batch of messages in one call to the vectorized codec.
+
+        Args:
+            data (np.array or BitVector): Binary messages of shape (num_words, k), or packed messages.
+
+        Returns:
+            np.array or BitVector: The (num_words, n) systematic codewords as uint8 (packed when
+            the input is packed).
+        """
+        codewords = np.asarray(self.bch.encode(self.galois_field(self._as_bits(data))), dtype=np.uint8)
+        return BitVector.from_bits(codewords) if isinstance(data, BitVector) else codewords
+
+    def decode_batch(self, encoded_data, return_status=False):
+        """
+        Decodes a batch of received words in one call to the selected backend.
+
+        Args:
+            encoded_data (np.array or BitVector): Received words of shape (num_words, n), as bits,
+                channel LLRs (sliced to hard bits) or packed words.
+            return_status (bool): If True, also return the decoding-failure flags.
+
+        Returns:
+            np.array: uint8 array of shape (num_words, k) with the information bits. If
+            `return_status` is True, a tuple of the information bits and a boolean array flagging
+            the words with more errors than the code can correct is returned.
+        """
+        received = self._as_bits(encoded_data).reshape(-1, self.n)
+        if self.backend == "syndrome":
+            corrected, failed = self.decoder.decode(received)
+            decoded_data = corrected[:, :self.k]  # Systematic: the message bits come first
+        elif self.decoder is not None:
+            decoded_data, failed = self.decoder.decode(received)
+        else:
+            decoded_data, num_errors = self.bch.decode(self.galois_field(received), errors=True)
+            decoded_data, failed = np.asarray(decoded_data, dtype=np.uint8), np.asarray(num_errors) < 0
+
+        if return_status:
+            return decoded_data, failed
+        return decoded_data
 
     def encode(self, data):
         """
@@ -31,37 +150,21 @@ class BCHCode:
             np.array: The encoded array of bits, including data and parity bits.
         """
         # Ensure the input data is of length k by padding if necessary
+        data = np.asarray(data)
         if len(data) < self.k:
             data = np.pad(data, (0, self.k - len(data)), 'constant')
 
-        # Convert the input data to a Galois field element
-        data_poly = galois.Poly(data, field=self.galois_field)
-
-        # Get the coefficients from the polynomial and encode the data
-        encoded_data = self.bch.encode(data_poly.coeffs)
-
-        # Return the encoded data as a numpy array
-        return np.array(encoded_data)
+        return self.encode_batch(data[None, :])[0]
 
     def decode(self, encoded_data):
         """
         Decodes the encoded data using the BCH code algorithm.
 
         Args:
-            encoded_data (np.array): A numpy array containing the encoded data.
+            encoded_data (np.array): A numpy array containing the encoded data, as bits or as
+                channel LLRs (floats, positive for 0), which are sliced to hard bits.
 
         Returns:
              np.array: The decoded array of bits (information bits).
         """
-        # Ensure the input encoded data is a Galois field element
-        encoded_poly = galois.Poly(encoded_data, field=self.galois_field)
-
-        # Get the coefficients from the polynomial and decode the data
-        decoded_data = self.bch.decode(encoded_poly.coeffs)
-
-        # Ensure that the decoded data has length k (trim any extra bits)
-        decoded_data = decoded_data[:self.k]
-
-        # Return the decoded data
-        return np.array(decoded_data)
-
+        return self.decode_batch(np.asarray(encoded_data)[None, :])[0]
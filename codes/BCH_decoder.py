@@ -0,0 +1,166 @@
+import numpy as np
+
+# Largest code length handled by the table decoder; its tables grow with n * t
+TABLE_MAX_N = 255
+
+
+class TableBCHDecoder:
+    """
+    The TableBCHDecoder class decodes binary primitive BCH codes with plain NumPy, for a whole batch
+    of received words at once.
+
+    GF(2^m) arithmetic uses log/antilog tables. The syndromes are one GF(2) matrix product with a
+    precomputed table of the bits of alpha^(j * power). Only the frames with a nonzero syndrome
+    go through Berlekamp-Massey (run for all of them in lock-step) and the Chien search, which
+    evaluates every error locator at every position in one array operation. At low BER almost
+    every frame takes the zero-syndrome fast path.
+
+    Bit i of a word is the coefficient of x^(n - 1 - i) and the first k bits are the message, as
+    in galois.BCH.
+
+    Attributes:
+        n (int): Length of the codeword (2^m - 1).
+        k (int): Length of the message.
+        t (int): Error correction capability.
+        exp (np.array): Antilog table, exp[i] = alpha^i for i < 2 * (2^m - 1).
+        log (np.array): Log table, log[exp[i]] = i (log[0] is unused).
+    """
+
+    def __init__(self, bch):
+        """
+        Builds the tables of a galois.BCH code.
+
+        Args:
+            bch (galois.BCH): The code; it must be primitive with n <= TABLE_MAX_N.
+        """
+        if not bch.is_primitive or bch.n > TABLE_MAX_N:
+            raise ValueError(f"The table decoder needs a primitive BCH code with n <= {TABLE_MAX_N}")
+
+        self.n = bch.n
+        self.k = bch.k
+        self.t = bch.t
+        n = self.n
+        m = bch.extension_field.degree
+        self.m = m
+
+        # Antilog table over two periods, so that exp[log a + log b] needs no modulo
+        self.exp = np.asarray(bch.alpha ** np.arange(2 * n), dtype=np.int64)
+        self.log = np.zeros(n + 1, dtype=np.int64)
+        self.log[self.exp[:n]] = np.arange(n)
+
+        # Syndrome S_j = r(alpha^(c + j)): bit b of alpha^((c + j) * power) for every position
+        powers = n - 1 - np.arange(n)
+        exponents = (np.outer(powers, bch.c + np.arange(2 * self.t)) % n)
+        elements = self.exp[exponents]  # (n, 2t)
+        self._syndrome_bits = ((elements[:, :, None] >> np.arange(m)) & 1).reshape(n, -1).astype(np.float32)
+        self._bit_weights = 1 << np.arange(m)
+
+        # Chien search: alpha^(-i * power) for locator coefficient i at each position
+        self._chien_exponents = (-np.outer(np.arange(self.t + 1), powers)) % n
+
+    def _mul(self, a, b):
+        """
+        Multiplies field elements elementwise (integer representation).
+        """
+        product = self.exp[self.log[a] + self.log[b]]
+        return np.where((a != 0) & (b != 0), product, 0)
+
+    def syndromes(self, received):
+        """
+        Computes the 2t syndromes of received words.
+
+        Args:
+            received (np.array): 0/1 array of shape (num_words, n).
+
+        Returns:
+            np.array: int64 array of shape (num_words, 2t) of field elements.
+        """
+        # The float product is exact: it counts at most n ones per entry
+        bits = (received.astype(np.float32) @ self._syndrome_bits).astype(np.int64) & 1
+        return bits.reshape(len(received), 2 * self.t, self.m) @ self._bit_weights
+
+    def berlekamp_massey(self, syndromes):
+        """
+        Finds the error-locator polynomial of every word in lock-step.
+
+        Args:
+            syndromes (np.array): (num_words, 2t) syndromes.
+
+        Returns:
+            tuple: The locator coefficients (num_words, 2t + 1), lowest degree first, and the
+            locator degrees L (num_words,).
+        """
+        num_words, num_syndromes = syndromes.shape
+        rows = np.arange(num_words)[:, None]
+        locator = np.zeros((num_words, num_syndromes + 1), dtype=np.int64)
+        locator[:, 0] = 1
+        # Previous locator already multiplied by x^m, its discrepancy and the locator length
+        shifted = np.zeros_like(locator)
+        shifted[:, 1] = 1
+        last_discrepancy = np.ones(num_words, dtype=np.int64)
+        length = np.zeros(num_words, dtype=np.int64)
+
+        for r in range(num_syndromes):
+            # d = sum over i of locator_i * S_(r - i)
+            terms = self._mul(locator[:, :r + 1], syndromes[rows, r - np.arange(r + 1)])
+            discrepancy = np.bitwise_xor.reduce(terms, axis=1)
+
+            update = discrepancy != 0
+            grow = update & (2 * length <= r)
+            inverse = self.exp[(self.n - self.log[last_discrepancy]) % self.n]
+            factor = np.where(update, self._mul(discrepancy, inverse), 0)
+
+            previous = locator.copy()
+            locator ^= self._mul(factor[:, None], shifted)
+
+            length = np.where(grow, r + 1 - length, length)
+            last_discrepancy = np.where(grow, discrepancy, last_discrepancy)
+            shifted = np.where(grow[:, None], previous, shifted)
+            shifted = np.roll(shifted, 1, axis=1)
+            shifted[:, 0] = 0
+
+        return locator, length
+
+    def chien_search(self, locator):
+        """
+        Evaluates error locators at every codeword position.
+
+        Args:
+            locator (np.array): (num_words, >= t + 1) locator coefficients, lowest degree first.
+
+        Returns:
+            np.array: Boolean array of shape (num_words, n), True at the error positions.
+        """
+        coefficients = locator[:, :self.t + 1, None]
+        terms = self.exp[self.log[coefficients] + self._chien_exponents]
+        terms = np.where(coefficients != 0, terms, 0)
+        return np.bitwise_xor.reduce(terms, axis=1) == 0
+
+    def decode(self, received):
+        """
+        Decodes a batch of received words.
+
+        Args:
+            received (np.array): 0/1 array of shape (num_words, n).
+
+        Returns:
+            tuple: The (num_words, k) uint8 messages and a boolean array flagging the words with
+            more errors than the code can correct (their message bits are returned uncorrected).
+        """
+        codewords = np.array(received, dtype=np.uint8).reshape(-1, self.n)
+        failed = np.zeros(len(codewords), dtype=bool)
+
+        syndromes = self.syndromes(codewords)
+        noisy = np.flatnonzero(syndromes.any(axis=1))
+        if len(noisy):
+            locator, length = self.berlekamp_massey(syndromes[noisy])
+            errors = self.chien_search(locator)
+            # A valid locator of degree L <= t has exactly L distinct roots among the positions
+            found = errors.sum(axis=1)
+            correctable = (length <= self.t) & (found == length) & ~locator[:, self.t + 1:].any(axis=1)
+
+            fixed = noisy[correctable]
+            codewords[fixed] ^= errors[correctable].astype(np.uint8)
+            failed[noisy[~correctable]] = True
+
+        return codewords[:, :self.k], failed
@@ -1,73 +1,521 @@
 import numpy as np
-from scipy.sparse import random as sparse_random, csr_matrix
-from scipy.sparse.linalg import lsqr
+from scipy.sparse import csr_matrix
+
+from codes import instrumentation
+from codes.bitvector import BitVector, gf2_matmul, gf2_matvec
+from codes.cache import load_arrays, save_arrays
+
+DECODING_METHODS = ("sum-product", "min-sum", "offset-min-sum", "bit-flipping")
+CONSTRUCTIONS = ("gallager", "peg", "qc")
+
+# Version of the cached H/G/info_positions, part of the cache key: bump it whenever the constructions
+# (peg_matrix, gallager_matrix, qc lifting) or systematic_generator change, so stale files are not loaded
+CACHE_VERSION = 1
+
+
+def gallager_matrix(n, m, column_weight, rng):
+    """
+    Builds a Gallager-style parity-check matrix with a fixed column weight.
+
+    The m rows are split into `column_weight` bands. In every band each column has exactly one 1 and
+    the row weights differ by at most one; the first band is a staircase and the others are random
+    column permutations of their staircase.
+
+    Args:
+        n (int): Number of columns (code length).
+        m (int): Number of rows (parity checks).
+        column_weight (int): Number of 1s per column, at most m.
+        rng (np.random.Generator): Generator for the column permutations.
+
+    Returns:
+        np.array: uint8 array of shape (m, n).
+    """
+    H = np.zeros((m, n), dtype=np.uint8)
+    for band, rows in enumerate(np.array_split(np.arange(m), column_weight)):
+        columns = np.arange(n) if band == 0 else rng.permutation(n)
+        H[rows[np.arange(n) * len(rows) // n], columns] = 1
+    return H
+
+
+def peg_matrix(n, m, column_weight, rng):
+    """
+    Builds a parity-check matrix by progressive edge growth (PEG).
+
+    Edges are added one variable node at a time. Each new edge goes to a check node that is not yet
+    reachable from the variable node, or else to one as far away as possible in the current graph,
+    which keeps short cycles out of the Tanner graph. Ties go to the check of lowest degree, then
+    to a random one.
+
+    Args:
+        n (int): Number of columns (code length).
+        m (int): Number of rows (parity checks).
+        column_weight (int): Number of 1s per column, at most m.
+        rng (np.random.Generator): Generator used to break ties.
+
+    Returns:
+        np.array: uint8 array of shape (m, n).
+    """
+    checks_of_var = [[] for _ in range(n)]
+    vars_of_check = [[] for _ in range(m)]
+    check_degrees = np.zeros(m, dtype=np.int64)
+    all_checks = set(range(m))
+
+    for var in range(n):
+        for edge in range(column_weight):
+            if edge == 0:
+                candidates = all_checks
+            else:
+                # Breadth-first expansion of the checks reachable from `var`
+                reached = set(checks_of_var[var])
+                layer = reached
+                while True:
+                    neighbours = {v for check in layer for v in vars_of_check[check]}
+                    new_layer = {check for v in neighbours for check in checks_of_var[v]} - reached
+                    if not new_layer or len(reached) + len(new_layer) == m:
+                        candidates = all_checks - reached
+                        break
+                    reached = reached | new_layer
+                    layer = new_layer
+
+            candidates = np.fromiter(candidates, dtype=np.int64)
+            lowest = candidates[check_degrees[candidates] == check_degrees[candidates].min()]
+            check = int(rng.choice(np.sort(lowest)))
+
+            checks_of_var[var].append(check)
+            vars_of_check[check].append(var)
+            check_degrees[check] += 1
+
+    H = np.zeros((m, n), dtype=np.uint8)
+    for var, checks in enumerate(checks_of_var):
+        H[checks, var] = 1
+    return H
+
+
+def quasi_cyclic_matrix(base_matrix, lifting):
+    """
+    Lifts a base matrix into a quasi-cyclic parity-check matrix.
+
+    Args:
+        base_matrix (array-like): (mb, nb) integer matrix; -1 gives a zero block and a shift s in
+            [0, lifting) the identity matrix cyclically shifted right by s.
+        lifting (int): Size of the circulant blocks.
+
+    Returns:
+        np.array: uint8 array of shape (mb * lifting, nb * lifting).
+    """
+    base_matrix = np.asarray(base_matrix, dtype=np.int64)
+    if (base_matrix >= lifting).any():
+        raise ValueError("Shifts of the base matrix must be smaller than the lifting factor")
+
+    identity = np.eye(lifting, dtype=np.uint8)
+    blocks = [[np.roll(identity, shift, axis=1) if shift >= 0 else np.zeros_like(identity) for shift in row]
+              for row in base_matrix]
+    return np.block(blocks)
+
+
+def systematic_generator(H):
+    """
+    Derives a systematic generator matrix from a parity-check matrix by GF(2) Gaussian elimination.
+
+    Columns are eliminated from the last one backwards, so the pivot (parity) positions end up
+    towards the end of the codeword and the information positions towards the start.
+
+    Args:
+        H (np.array): 0/1 parity-check matrix of shape (m, n).
+
+    Returns:
+        tuple: The generator matrix (uint8, shape (n - rank, n)) whose row i has a single 1 among the
+        information positions, at `info_positions[i]`, and the sorted information positions.
+    """
+    reduced = np.array(H, dtype=np.uint8) & 1
+    m, n = reduced.shape
+    pivots = []
+    row = 0
+    for column in range(n - 1, -1, -1):
+        if row == m:
+            break
+        candidates = np.flatnonzero(reduced[row:, column])
+        if len(candidates) == 0:
+            continue
+        pivot = row + candidates[0]
+        reduced[[row, pivot]] = reduced[[pivot, row]]
+        # Clear the column in every other row
+        others = np.flatnonzero(reduced[:, column])
+        others = others[others != row]
+        reduced[others] ^= reduced[row]
+        pivots.append(column)
+        row += 1
+
+    pivots = np.array(pivots, dtype=np.int64)
+    info_positions = np.setdiff1d(np.arange(n), pivots)
+
+    # Row `row` of the reduced matrix reads c[pivots[row]] = sum of c[info] over its info columns
+    G = np.zeros((len(info_positions), n), dtype=np.uint8)
+    G[np.arange(len(info_positions)), info_positions] = 1
+    G[:, pivots] = reduced[:len(pivots)][:, info_positions].T
+    return G, info_positions
+
+
+class BeliefPropagationDecoder:
+    """
+    The BeliefPropagationDecoder class implements iterative message-passing decoding of LDPC codes
+    on a batch of received frames at once.
+
+    The Tanner graph is stored as a list of edges (one per non-zero entry of H) plus two padded
+    index tables giving the edges of every check node and of every variable node. Messages live in
+    (frames, edges) arrays, so every iteration is a handful of gathers and reductions. Decoding of a
+    frame stops as soon as its hard decision satisfies all parity checks.
+
+    Attributes:
+        method (str): "sum-product", "min-sum" (normalized by `alpha`), "offset-min-sum"
+            (offset by `beta`) or "bit-flipping".
+        max_iterations (int): Maximum number of iterations per frame.
+        alpha (float): Normalization factor of the min-sum check update.
+        beta (float): Offset of the offset-min-sum check update.
+        edge_checks (np.array): Check node of each edge.
+        edge_vars (np.array): Variable node of each edge.
+        check_edges (np.array): (checks, max check degree) edge indices, padded with `num_edges`.
+        var_edges (np.array): (variables, max variable degree) edge indices, padded with `num_edges`.
+    """
+
+    def __init__(self, H, method="sum-product", max_iterations=50, alpha=0.8, beta=0.15):
+        """
+        Builds the edge-indexed structure of the parity-check matrix.
+
+        Args:
+            H (csr_matrix or np.array): Parity-check matrix.
+            method (str): Decoding algorithm, one of DECODING_METHODS.
+            max_iterations (int): Maximum number of iterations per frame.
+            alpha (float): Normalization factor of the min-sum check update.
+            beta (float): Offset of the offset-min-sum check update.
+        """
+        if method not in DECODING_METHODS:
+            raise ValueError(f"Unknown decoding method {method}, expected one of {DECODING_METHODS}")
+
+        H = csr_matrix(H)
+        self.method = method
+        self.max_iterations = max_iterations
+        self.alpha = alpha
+        self.beta = beta
+        self.num_checks, self.num_vars = H.shape
+
+        # Edges in row-major order, so the edges of each check node are contiguous
+        self.edge_checks, self.edge_vars = H.nonzero()
+        self.num_edges = len(self.edge_checks)
+        self.check_edges = self._padded_table(self.edge_checks, self.num_checks)
+        self.var_edges = self._padded_table(self.edge_vars, self.num_vars)
+
+    def _padded_table(self, nodes, num_nodes):
+        """
+        Groups the edge indices by node into a (num_nodes, max degree) table padded with num_edges.
+        """
+        order = np.argsort(nodes, kind="stable")
+        degrees = np.bincount(nodes, minlength=num_nodes)
+        starts = np.concatenate(([0], np.cumsum(degrees)[:-1]))
+        slots = np.arange(self.num_edges) - np.repeat(starts, degrees)
+
+        table = np.full((num_nodes, max(degrees.max(initial=0), 1)), self.num_edges, dtype=np.int64)
+        table[nodes[order], slots] = order
+        return table
+
+    def syndromes(self, bits):
+        """
+        Computes the parity checks of a batch of hard decisions.
+
+        Args:
+            bits (np.array): 0/1 array of shape (frames, n).
+
+        Returns:
+            np.array: Boolean array of shape (frames, checks), True for unsatisfied checks.
+        """
+        edge_bits = np.zeros((len(bits), self.num_edges + 1), dtype=np.uint8)
+        edge_bits[:, :-1] = bits[:, self.edge_vars]
+        return (edge_bits[:, self.check_edges].sum(axis=2) & 1).astype(bool)
+
+    def _check_update(self, v2c):
+        """
+        Computes the check-to-variable messages from the variable-to-check messages.
+
+        Args:
+            v2c (np.array): (frames, edges + 1) messages, the last column being padding.
+
+        Returns:
+            np.array: (frames, edges + 1) check-to-variable messages, zero in the padding column.
+        """
+        v2c[:, -1] = np.inf  # Padding: positive sign, infinite reliability (neutral for both updates)
+        incoming = v2c[:, self.check_edges]
+        signs = np.where(incoming < 0, -1.0, 1.0)
+        # Sign of each outgoing message: product of the other signs
+        outgoing_signs = signs.prod(axis=2, keepdims=True) * signs
+        magnitudes = np.abs(incoming)
+
+        if self.method == "sum-product":
+            # phi(x) = -log(tanh(x / 2)) is its own inverse; phi(inf) = 0 leaves the sums unchanged
+            phi = -np.log(np.tanh(np.clip(magnitudes, 1e-12, 50.0) / 2))
+            outgoing = np.clip(phi.sum(axis=2, keepdims=True) - phi, 1e-12, 50.0)
+            outgoing = -np.log(np.tanh(outgoing / 2))
+        else:
+            # Minimum of the other magnitudes: the smallest one, or the second smallest for the
+            # edge holding the smallest
+            smallest_slot = magnitudes.argmin(axis=2)[:, :, None]
+            smallest = np.take_along_axis(magnitudes, smallest_slot, axis=2)
+            is_minimum = np.arange(magnitudes.shape[2]) == smallest_slot
+            second_smallest = np.where(is_minimum, np.inf, magnitudes).min(axis=2, keepdims=True)
+            # A degree-1 check has no other edge: its second smallest is the infinite padding. The clip
+            # (as in sum-product) keeps its message finite, so that totals - c2v is not inf - inf = NaN
+            outgoing = np.minimum(np.where(is_minimum, second_smallest, smallest), 50.0)
+            if self.method == "min-sum":
+                outgoing = self.alpha * outgoing
+            else:
+                outgoing = np.maximum(outgoing - self.beta, 0.0)
+
+        c2v = np.zeros_like(v2c)
+        c2v[:, self.check_edges.ravel()] = (outgoing_signs * outgoing).reshape(len(v2c), -1)
+        c2v[:, -1] = 0.0
+        return c2v
+
+    def _flip_step(self, bits):
+        """
+        Runs one bit-flipping iteration: flips, in every frame, the bits in the most unsatisfied checks.
+        """
+        unsatisfied = np.zeros((len(bits), self.num_edges + 1), dtype=np.int64)
+        unsatisfied[:, :-1] = self.syndromes(bits)[:, self.edge_checks]
+        votes = unsatisfied[:, self.var_edges].sum(axis=2)
+        flips = (votes == votes.max(axis=1, keepdims=True)) & (votes > 0)
+        return bits ^ flips.astype(np.uint8)
+
+    def decode(self, llr):
+        """
+        Decodes a batch of frames.
+
+        Args:
+            llr (np.array): (frames, n) channel log-likelihood ratios, positive values favouring 0.
+
+        Returns:
+            tuple: The decoded codewords (uint8 array of shape (frames, n)), the number of
+            iterations run for each frame (0 when the received word was already a codeword) and a
+            boolean array flagging the frames whose final decision satisfies every parity check.
+        """
+        llr = np.atleast_2d(np.asarray(llr, dtype=np.float64))
+        frames = len(llr)
+        decoded = (llr < 0).astype(np.uint8)
+        iterations = np.zeros(frames, dtype=np.int64)
+        converged = ~self.syndromes(decoded).any(axis=1)
+
+        # Only the frames still failing their parity checks are carried through the iterations
+        active = np.flatnonzero(~converged)
+        channel = llr[active]
+        bits = decoded[active]
+        v2c = np.zeros((len(active), self.num_edges + 1))
+        v2c[:, :-1] = channel[:, self.edge_vars]
+
+        for iteration in range(1, self.max_iterations + 1):
+            if len(active) == 0:
+                break
+
+            if self.method == "bit-flipping":
+                bits = self._flip_step(bits)
+            else:
+                c2v = self._check_update(v2c)
+                totals = channel + c2v[:, self.var_edges].sum(axis=2)
+                bits = (totals < 0).astype(np.uint8)
+                v2c[:, :-1] = totals[:, self.edge_vars] - c2v[:, :-1]
+
+            decoded[active] = bits
+            iterations[active] = iteration
+            satisfied = ~self.syndromes(bits).any(axis=1)
+            converged[active[satisfied]] = True
+
+            keep = ~satisfied
+            active, channel, bits, v2c = active[keep], channel[keep], bits[keep], v2c[keep]
+
+        return decoded, iterations, converged
+
 
 class LDPC:
     """
     The LDPC class implements encoding and decoding of binary data using Low-Density Parity-Check codes.
 
+    The parity-check matrix is built deterministically from the construction parameters (and
+    seed), and H, G and the information positions are cached on disk under those parameters, so
+    every LDPC(n, k) with the same arguments is the same code and is only built once.
+
     Attributes:
         n (int): Length of the code (total number of bits in the encoded word).
         k (int): Length of the data (number of information bits).
         H (csr_matrix): Parity-check matrix.
-        G (np.array): Generator matrix.
+        G (np.array): Systematic generator matrix of shape (k, n).
+        info_positions (np.array): Codeword positions carrying the information bits, in order.
+        decoder (BeliefPropagationDecoder): Iterative decoder built on H.
+        hard_llr (float): Reliability given to hard-decision (0/1) inputs before decoding.
+        soft_input (bool): True, the decoder uses channel LLRs directly.
     """
 
-    def __init__(self, n, k):
+    soft_input = True
+
+    def __init__(self, n, k, construction="peg", column_weight=3, seed=0, base_matrix=None, lifting=None,
+                 method="sum-product", max_iterations=50, crossover_probability=0.05, cache=True):
         """
         Initializes an LDPC object with the given code length and data length.
 
         Args:
             n (int): Length of the code (total number of bits in the encoded word).
             k (int): Length of the data (number of information bits).
+            construction (str): "gallager", "peg" or "qc" (quasi-cyclic lifting of `base_matrix`).
+            column_weight (int): Variable node degree of the gallager and peg constructions.
+            seed (int): Seed of the random choices made by the gallager and peg constructions.
+            base_matrix (array-like): Base matrix of the qc construction (-1 for zero blocks).
+            lifting (int): Lifting factor of the qc construction; n must be its multiple.
+            method (str): Decoding algorithm, one of DECODING_METHODS.
+            max_iterations (int): Maximum number of decoder iterations per frame.
+            crossover_probability (float): Bit error probability assumed when hard bits are decoded.
+            cache (bool): Whether to load and store the matrices in the on-disk cache.
         """
+        if construction not in CONSTRUCTIONS:
+            raise ValueError(f"Unknown LDPC construction {construction}, expected one of {CONSTRUCTIONS}")
+
         self.n = n
         self.k = k
-        self.H = sparse_random(n - k, n, density=0.1, format='csr', dtype=float).astype(int)
-        self.G = self.generate_G(self.H)
+
+        if construction == "qc":
+            if base_matrix is None or lifting is None:
+                raise ValueError("The qc construction needs a base matrix and a lifting factor")
+            base_matrix = tuple(map(tuple, np.asarray(base_matrix, dtype=int).tolist()))
+            params = (CACHE_VERSION, construction, n, k, base_matrix, lifting)
+        else:
+            params = (CACHE_VERSION, construction, n, k, column_weight, seed)
+
+        arrays = load_arrays("ldpc", params) if cache else None
+        if arrays is None:
+            H = self.generate_H(construction, column_weight, seed, base_matrix, lifting)
+            G, info_positions = self.generate_G(H)
+            arrays = {"H": H, "G": G, "info_positions": info_positions}
+            if cache:
+                save_arrays("ldpc", params, **arrays)
+
+        self.H = csr_matrix(arrays["H"].astype(int))
+        self.G = arrays["G"]
+        self.info_positions = arrays["info_positions"]
+        self.decoder = BeliefPropagationDecoder(self.H, method=method, max_iterations=max_iterations)
+        self.hard_llr = np.log((1 - crossover_probability) / crossover_probability)
+
+    def generate_H(self, construction, column_weight, seed, base_matrix, lifting):
+        """
+        Builds the parity-check matrix of the requested construction.
+
+        Returns:
+            np.array: uint8 parity-check matrix with n columns.
+        """
+        if construction == "qc":
+            H = quasi_cyclic_matrix(base_matrix, lifting)
+            if H.shape[1] != self.n:
+                raise ValueError(f"The lifted base matrix has {H.shape[1]} columns, expected n={self.n}")
+            return H
+
+        m = self.n - self.k
+        rng = np.random.default_rng(seed)
+        column_weight = min(column_weight, m)
+        if construction == "gallager":
+            return gallager_matrix(self.n, m, column_weight, rng)
+        return peg_matrix(self.n, m, column_weight, rng)
 
     def generate_G(self, H):
         """
-        Generates the generator matrix G from the parity-check matrix H.
+        Generates a systematic generator matrix G from the parity-check matrix H.
+
+        If H is rank deficient the code has more than k dimensions; the extra information positions
+        are then fixed to zero, which still gives codewords of H.
 
         Args:
-            H (csr_matrix): Parity-check matrix.
+            H (np.array): Parity-check matrix.
 
         Returns:
-            np.array: Generator matrix.
+            tuple: The (k, n) generator matrix and the k information positions.
         """
-        I_k = np.eye(self.k, dtype=int)
-        P = H[:, :self.k].toarray()
-        G = np.hstack((I_k, P.T))
-        return G
+        G, info_positions = systematic_generator(H)
+        if len(info_positions) < self.k:
+            raise ValueError(f"H has rank {self.n - len(info_positions)}, too large for k={self.k}")
+        return G[:self.k], info_positions[:self.k]
+
+    @property
+    def rate(self):
+        """float: Code rate k / n."""
+        return self.k / self.n
 
     def encode(self, message):
         """
         Encodes the given binary message using the LDPC code.
 
         Args:
-            message (np.array): A numpy array containing the binary data (information bits).
+            message (np.array or BitVector): Binary data (information bits), shape (k,) or
+                (num_words, k), or packed messages.
 
         Returns:
-            np.array: The encoded array of bits.
+            np.array or BitVector: The encoded bits as uint8 (packed when the input is packed).
         """
-        return np.dot(message, self.G) % 2
+        if isinstance(message, BitVector):
+            return gf2_matvec(BitVector.from_bits(self.G.T), message)
+        return gf2_matmul(message, self.G)
+
+    def encode_batch(self, messages):
+        """
+        Encodes a batch of messages with one GF(2) matrix multiplication.
+
+        Args:
+            messages (np.array or BitVector): Binary messages of shape (num_words, k), or packed messages.
+
+        Returns:
+            np.array or BitVector: The (num_words, n) codewords as uint8 (packed when the input is packed).
+        """
+        if not isinstance(messages, BitVector):
+            messages = np.asarray(messages, dtype=np.uint8).reshape(-1, self.k)
+        return self.encode(messages)
+
+    def channel_llr(self, received):
+        """
+        Converts received hard bits to log-likelihood ratios; soft (float) inputs are returned as is.
+
+        Args:
+            received (np.array): Received bits (0/1 integers) or LLRs (floats), shape (..., n).
+
+        Returns:
+            np.array: float64 LLRs with the same shape.
+        """
+        received = np.asarray(received)
+        if np.issubdtype(received.dtype, np.floating):
+            return received.astype(np.float64)
+        return self.hard_llr * (1.0 - 2.0 * received.astype(np.float64))
+
+    def decode_batch(self, received, return_status=False):
+        """
+        Decodes a batch of received words with the iterative decoder.
+
+        Args:
+            received (np.array): (num_words, n) received bits or channel LLRs.
+            return_status (bool): If True, also return the decoding-failure flags.
+
+        Returns:
+            np.array: uint8 array of shape (num_words, k) with the information bits. If
+            `return_status` is True, a tuple of the information bits and a boolean array flagging
+            the words whose decision does not satisfy all parity checks is returned.
+        """
+        codewords, iterations, converged = self.decoder.decode(self.channel_llr(received).reshape(-1, self.n))
+        if instrumentation.active() is not None:
+            instrumentation.count("decoder_iterations", iterations.sum())
+        decoded = codewords[:, self.info_positions]
+
+        if return_status:
+            return decoded, ~converged
+        return decoded
 
     def decode(self, received):
         """
         Decodes the received binary data and corrects errors using the LDPC code.
 
         Args:
-            received (np.array): A numpy array of received bits (data + parity bits).
+            received (np.array): A numpy array of received bits (data + parity bits), or channel LLRs.
 
         Returns:
             np.array: The original binary data after decoding and correcting errors.
         """
-        received_sparse = csr_matrix(received)
-        syndrome = (received_sparse.dot(self.H.T).toarray() % 2).flatten()
-        if np.count_nonzero(syndrome) == 0:
-            return received[:self.k]
-        else:
-            correction = lsqr(self.H, syndrome)[0]
-            corrected = (received + correction) % 2
-            return corrected[:self.k]
\ No newline at end of file
+        return self.decode_batch(np.asarray(received)[None, :])[0]
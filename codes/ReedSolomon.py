@@ -1,6 +1,212 @@
+import numpy as np
 import reedsolo
 
+# reedsolo codecs built in this process, keyed by their parameters; building one computes the
+# field tables and the generator polynomial
+_CODEC_CACHE = {}
+
+
+def _rs_codec(nsym, nsize, fcr, prim, c_exp):
+    """
+    Returns the reedsolo codec of the given parameters, constructing it once per process.
+
+    Returns:
+        reedsolo.RSCodec: The codec.
+    """
+    key = (nsym, nsize, fcr, prim, c_exp)
+    if key not in _CODEC_CACHE:
+        _CODEC_CACHE[key] = reedsolo.RSCodec(nsym, nsize=nsize, fcr=fcr, prim=prim, c_exp=c_exp)
+    return _CODEC_CACHE[key]
+
+
+def _as_bytes(data):
+    """
+    Returns bytes-like data or a uint8 array as a 1-D uint8 array (without copying when possible).
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(data, dtype=np.uint8)
+    return np.asarray(data, dtype=np.uint8)
+
+
 class ReedSolomon:
+    """
+    The ReedSolomon class is a reusable Reed-Solomon codec over GF(2^8) (by default) working on bytes.
+
+    Messages longer than a codeword are split into chunks of `k` bytes, each protected by `nsym`
+    parity bytes, as in reedsolo. The codec tables are shared by every instance with the same
+    parameters. Decoding never raises: words that cannot be corrected are flagged as failed and
+    their message bytes are returned uncorrected.
+
+    Attributes:
+        nsym (int): Number of parity bytes per chunk; corrects e errors and f erasures when
+            2e + f <= nsym.
+        nsize (int): Maximum length of a chunk (message + parity bytes).
+        k (int): Maximum number of message bytes per chunk.
+        codec (reedsolo.RSCodec): The underlying codec.
+    """
+
+    def __init__(self, nsym, nsize=255, fcr=0, prim=0x11d, c_exp=8):
+        """
+        Initializes the codec.
+
+        Args:
+            nsym (int): Number of parity bytes per chunk.
+            nsize (int): Maximum length of a chunk, at most 2^c_exp - 1.
+            fcr (int): First consecutive root of the generator polynomial.
+            prim (int): Primitive polynomial of the field.
+            c_exp (int): Field exponent (symbols of c_exp bits).
+        """
+        if not 0 < nsym < nsize:
+            raise ValueError(f"nsym must be between 1 and nsize - 1, got {nsym}")
+
+        self.nsym = nsym
+        self.nsize = nsize
+        self.k = nsize - nsym
+        self.codec = _rs_codec(nsym, nsize, fcr, prim, c_exp)
+
+    def encoded_length(self, message_length):
+        """
+        Returns the number of bytes of an encoded message of the given length.
+        """
+        return message_length + self.nsym * -(-message_length // self.k)
+
+    def message_length(self, encoded_length):
+        """
+        Returns the number of message bytes in an encoded word of the given length.
+        """
+        chunks = -(-encoded_length // self.nsize)
+        return encoded_length - self.nsym * chunks
+
+    def encode(self, data):
+        """
+        Encodes a message.
+
+        Args:
+            data (bytes, memoryview or np.array): The message bytes.
+
+        Returns:
+            bytes: The encoded message (each chunk followed by its parity bytes).
+        """
+        return bytes(self.codec.encode(bytearray(_as_bytes(data).tobytes())))
+
+    def decode(self, data, erasures=None):
+        """
+        Decodes an encoded message.
+
+        Args:
+            data (bytes, memoryview or np.array): The received bytes.
+            erasures (array-like, optional): Positions of bytes known (or assumed) to be wrong.
+
+        Returns:
+            tuple: The message bytes, a sorted int64 array of the corrected (errata) positions and
+            a bool that is True when some chunk could not be corrected.
+        """
+        received = _as_bytes(data)
+        erasures = np.asarray([] if erasures is None else erasures, dtype=np.int64)
+
+        message = bytearray()
+        errata = []
+        failed = False
+        for start in range(0, len(received), self.nsize):
+            chunk = received[start:start + self.nsize]
+            chunk_erasures = erasures[(erasures >= start) & (erasures < start + len(chunk))] - start
+            try:
+                chunk_message, _, chunk_errata = self.codec.decode(bytearray(chunk.tobytes()),
+                                                                   erase_pos=chunk_erasures.tolist() or None)
+                errata.extend(start + position for position in chunk_errata)
+            except reedsolo.ReedSolomonError:
+                chunk_message = chunk[:len(chunk) - self.nsym].tobytes()
+                failed = True
+            message.extend(chunk_message)
+
+        return bytes(message), np.sort(np.asarray(errata, dtype=np.int64)), failed
+
+    def encode_batch(self, messages):
+        """
+        Encodes a batch of equal-length messages.
+
+        Args:
+            messages (np.array): uint8 array of shape (num_words, message_length).
+
+        Returns:
+            np.array: uint8 array of shape (num_words, encoded_length).
+        """
+        messages = np.asarray(messages, dtype=np.uint8).reshape(-1, np.shape(messages)[-1])
+        encoded = np.empty((len(messages), self.encoded_length(messages.shape[1])), dtype=np.uint8)
+        for row, message in zip(encoded, messages):
+            row[:] = np.frombuffer(self.encode(message), dtype=np.uint8)
+        return encoded
+
+    def decode_batch(self, received, erasures=None, return_status=False, return_errata=False):
+        """
+        Decodes a batch of equal-length encoded messages.
+
+        Only the words with a nonzero syndrome go through the full decoder.
+
+        Args:
+            received (np.array): uint8 array of shape (num_words, encoded_length).
+            erasures (np.array, optional): Boolean array of the same shape, True at the bytes to
+                treat as erasures.
+            return_status (bool): If True, also return the decoding-failure flags.
+            return_errata (bool): If True, also return a boolean (num_words, encoded_length) mask
+                of the corrected bytes.
+
+        Returns:
+            np.array: uint8 array of shape (num_words, message_length) with the message bytes,
+            followed, as requested, by the failure flags and the errata mask.
+        """
+        received = np.asarray(received, dtype=np.uint8).reshape(-1, np.shape(received)[-1])
+        num_words, length = received.shape
+
+        # The message bytes are the received ones minus the parity bytes after every chunk
+        positions = np.arange(length)
+        chunk_lengths = np.minimum(self.nsize, length - positions // self.nsize * self.nsize)
+        parity = positions % self.nsize >= chunk_lengths - self.nsym
+        messages = received[:, ~parity].copy()
+        failed = np.zeros(num_words, dtype=bool)
+        errata = np.zeros((num_words, length), dtype=bool)
+
+        for word in range(num_words):
+            word_erasures = None if erasures is None else np.flatnonzero(erasures[word])
+            if word_erasures is None or len(word_erasures) == 0:
+                if all(self.codec.check(bytearray(received[word].tobytes()))):
+                    continue  # Zero syndrome: nothing to correct
+            message, positions, failed[word] = self.decode(received[word], word_erasures)
+            messages[word] = np.frombuffer(message, dtype=np.uint8)
+            errata[word, positions] = True
+
+        outputs = (messages,)
+        if return_status:
+            outputs += (failed,)
+        if return_errata:
+            outputs += (errata,)
+        return outputs if len(outputs) > 1 else messages
+
+    def encode_bits(self, bits):
+        """
+        Encodes a message given as bits (padded with zeros to whole bytes).
+
+        Args:
+            bits (np.array): 0/1 array of message bits.
+
+        Returns:
+            np.array: uint8 array of the encoded bits.
+        """
+        return np.unpackbits(np.frombuffer(self.encode(np.packbits(np.asarray(bits, dtype=np.uint8))), dtype=np.uint8))
+
+    def decode_bits(self, bits):
+        """
+        Decodes an encoded message given as bits.
+
+        Args:
+            bits (np.array): 0/1 array of received bits.
+
+        Returns:
+            np.array: uint8 array of the message bits (uncorrected if decoding fails).
+        """
+        message, _, _ = self.decode(np.packbits(np.asarray(bits, dtype=np.uint8)))
+        return np.unpackbits(np.frombuffer(message, dtype=np.uint8))
+
     @staticmethod
     def encode_text_rs(bits, nsym):
         """
@@ -11,16 +217,9 @@ class ReedSolomon:
         nsym (int): Number of error correction symbols.
 
         Returns:
-        list[int]: Encoded data as a list of bits.
+        np.array: Encoded data as a uint8 array of bits.
         """
-        # Convert bits to bytes
-        byte_data = bytes(int(''.join(map(str, bits[i:i + 8])), 2) for i in range(0, len(bits), 8))
-        rs = reedsolo.RSCodec(nsym)
-        encoded_data = rs.encode(byte_data)
-
-        # Convert encoded bytes to bits
-        encoded_bits = [int(bit) for byte in encoded_data for bit in format(byte, '08b')]
-        return encoded_bits
+        return ReedSolomon(nsym).encode_bits(bits)
 
     @staticmethod
     def decode_text_rs(encoded_bits, nsym):
@@ -32,13 +231,6 @@ class ReedSolomon:
         nsym (int): Number of error correction symbols.
 
         Returns:
-        list[int]: Original data as a list of bits.
+        np.array: Original data as a uint8 array of bits.
         """
-        # Convert bits back to bytes
-        encoded_data = bytes(int(''.join(map(str, encoded_bits[i:i + 8])), 2) for i in range(0, len(encoded_bits), 8))
-        rs = reedsolo.RSCodec(nsym)
-        decoded_data = rs.decode(encoded_data)[0]  # Returns a tuple, first element is the data
-
-        # Convert decoded bytes back to bits
-        decoded_bits = [int(bit) for byte in decoded_data for bit in format(byte, '08b')]
-        return decoded_bits
\ No newline at end of file
+        return ReedSolomon(nsym).decode_bits(encoded_bits)
@@ -0,0 +1,200 @@
+import numpy as np
+
+WORD_BITS = 64
+
+
+class BitVector:
+    """
+    The BitVector class stores one or more bit vectors packed into uint64 words.
+
+    Bits are packed most significant bit first: bit `i` of a vector is bit `63 - i % 64` of word
+    `i // 64`, so the big-endian bytes of the words are exactly what `np.packbits` produces. The
+    padding bits after `length` are always zero, which keeps popcounts exact.
+
+    A BitVector can hold a batch: `words` has shape (..., num_words) and every leading index is
+    one vector of `length` bits.
+
+    Attributes:
+        words (np.array): uint64 array of shape (..., num_words).
+        length (int): Number of valid bits per vector.
+    """
+
+    def __init__(self, words, length):
+        """
+        Wraps already packed words.
+
+        Args:
+            words (np.array): uint64 array of shape (..., ceil(length / 64)) with zero padding bits.
+            length (int): Number of valid bits per vector.
+        """
+        words = np.asarray(words, dtype=np.uint64)
+        if words.ndim == 0 or words.shape[-1] != -(-length // WORD_BITS):
+            raise ValueError(f"{length} bits need {-(-length // WORD_BITS)} words, got shape {words.shape}")
+        self.words = words
+        self.length = length
+
+    @classmethod
+    def from_bits(cls, bits):
+        """
+        Packs an array of bits.
+
+        Args:
+            bits (np.array): 0/1 array of shape (..., length).
+
+        Returns:
+            BitVector: The packed vectors.
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        length = bits.shape[-1]
+        num_words = -(-length // WORD_BITS)
+        packed = np.packbits(bits, axis=-1)
+        padded = np.zeros(bits.shape[:-1] + (num_words * 8,), dtype=np.uint8)
+        padded[..., :packed.shape[-1]] = packed
+        return cls(padded.view(">u8").astype(np.uint64), length)
+
+    @classmethod
+    def from_bytes(cls, data, length=None):
+        """
+        Packs a bytes-like object (or a uint8 array of shape (..., num_bytes)).
+
+        Args:
+            data (bytes or np.array): The bytes, most significant bit first.
+            length (int, optional): Number of valid bits, defaults to 8 bits per byte.
+
+        Returns:
+            BitVector: The packed vectors.
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = np.frombuffer(data, dtype=np.uint8)
+        data = np.asarray(data, dtype=np.uint8)
+        length = 8 * data.shape[-1] if length is None else length
+        return cls.from_bits(np.unpackbits(data, axis=-1, count=length))
+
+    def to_bits(self):
+        """
+        Unpacks the vectors.
+
+        Returns:
+            np.array: uint8 array of shape (..., length).
+        """
+        return np.unpackbits(self.to_bytes(), axis=-1, count=self.length)
+
+    def to_bytes(self):
+        """
+        Returns the packed bytes (most significant bit first, as `np.packbits`).
+
+        Returns:
+            np.array: uint8 array of shape (..., ceil(length / 8)).
+        """
+        as_bytes = self.words.astype(">u8").view(np.uint8).reshape(self.shape + (-1,))
+        return as_bytes[..., :-(-self.length // 8)]
+
+    @property
+    def shape(self):
+        """tuple: Batch shape (the shape of `words` without the word axis)."""
+        return self.words.shape[:-1]
+
+    def __repr__(self):
+        return f"BitVector(shape={self.shape}, length={self.length})"
+
+    def __getitem__(self, index):
+        """
+        Selects vectors of the batch (the bits of every selected vector are kept).
+        """
+        if self.words.ndim == 1:
+            raise IndexError("A single BitVector has no batch axis; use slice_bits to select bits")
+        return BitVector(self.words[index], self.length)
+
+    def _check(self, other):
+        if not isinstance(other, BitVector) or other.length != self.length:
+            raise ValueError("Bitwise operations need BitVectors of the same length")
+
+    def __xor__(self, other):
+        self._check(other)
+        return BitVector(self.words ^ other.words, self.length)
+
+    def __and__(self, other):
+        self._check(other)
+        return BitVector(self.words & other.words, self.length)
+
+    def __or__(self, other):
+        self._check(other)
+        return BitVector(self.words | other.words, self.length)
+
+    def __eq__(self, other):
+        if not isinstance(other, BitVector):
+            return NotImplemented
+        return self.length == other.length and np.array_equal(self.words, other.words)
+
+    def popcount(self):
+        """
+        Counts the set bits of every vector.
+
+        Returns:
+            np.array: int64 array with the batch shape.
+        """
+        return np.bitwise_count(self.words).sum(axis=-1, dtype=np.int64)
+
+    def hamming_distance(self, other):
+        """
+        Counts the positions where two (batches of) vectors differ.
+
+        Returns:
+            np.array: int64 array with the broadcast batch shape.
+        """
+        return (self ^ other).popcount()
+
+    def slice_bits(self, start, stop):
+        """
+        Extracts the bits [start, stop) of every vector.
+
+        Args:
+            start (int): First bit to keep.
+            stop (int): One past the last bit to keep.
+
+        Returns:
+            BitVector: Vectors of `stop - start` bits.
+        """
+        start, stop, _ = slice(start, stop).indices(self.length)
+        stop = max(start, stop)
+        if start % WORD_BITS == 0:
+            # Word-aligned: take the words and clear the bits past the new end
+            words = self.words[..., start // WORD_BITS:-(-stop // WORD_BITS)].copy()
+            tail = (stop - start) % WORD_BITS
+            if tail:
+                words[..., -1] &= np.uint64((1 << WORD_BITS) - (1 << (WORD_BITS - tail)))
+            return BitVector(words, stop - start)
+        return BitVector.from_bits(self.to_bits()[..., start:stop])
+
+
+def gf2_matvec(matrix, vectors):
+    """
+    Multiplies packed vectors by a GF(2) matrix: result bit i is the parity of (row i AND vector).
+
+    Args:
+        matrix (BitVector): The matrix rows, shape (rows,) with `length` equal to the column count.
+        vectors (BitVector): Vectors of the same length, any batch shape.
+
+    Returns:
+        BitVector: The products, batch shape of `vectors` and `rows` bits each.
+    """
+    if matrix.length != vectors.length or matrix.words.ndim != 2:
+        raise ValueError("gf2_matvec needs a (rows, words) matrix with the vectors' length")
+
+    products = vectors.words[..., None, :] & matrix.words
+    parities = (np.bitwise_count(products).sum(axis=-1) & 1).astype(np.uint8)
+    return BitVector.from_bits(parities)
+
+
+def gf2_matmul(left, right):
+    """
+    Multiplies two unpacked GF(2) matrices (or a batch of row vectors by a matrix).
+
+    Args:
+        left (np.array): 0/1 array of shape (..., m).
+        right (np.array): 0/1 array of shape (m, n).
+
+    Returns:
+        np.array: uint8 array of shape (..., n).
+    """
+    return (np.matmul(np.asarray(left, dtype=np.uint8), np.asarray(right, dtype=np.uint8), dtype=np.int64) & 1).astype(np.uint8)
@@ -0,0 +1,60 @@
+import hashlib
+import os
+
+import numpy as np
+
+# Directory of the on-disk cache of constructed code matrices and tables
+CACHE_DIR = os.environ.get("FEC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "rdds-fec"))
+
+
+def cache_path(kind, params):
+    """
+    Returns the cache file of an object, keyed by its kind and construction parameters.
+
+    Args:
+        kind (str): Kind of cached object, e.g. "ldpc".
+        params (tuple): Construction parameters; their repr is hashed into the file name.
+
+    Returns:
+        str: Path of the .npz file.
+    """
+    digest = hashlib.sha256(repr(params).encode()).hexdigest()[:24]
+    return os.path.join(CACHE_DIR, kind, f"{digest}.npz")
+
+
+def load_arrays(kind, params):
+    """
+    Loads cached arrays.
+
+    Args:
+        kind (str): Kind of cached object.
+        params (tuple): Construction parameters.
+
+    Returns:
+        dict: The arrays by name, or None when nothing (readable) is cached.
+    """
+    path = cache_path(kind, params)
+    try:
+        with np.load(path) as data:
+            if str(data["__params__"]) != repr(params):  # Hash collision or stale file
+                return None
+            return {name: data[name] for name in data.files if name != "__params__"}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_arrays(kind, params, **arrays):
+    """
+    Stores arrays in the cache. The file is written atomically, so concurrent workers building the
+    same object never read a partial file.
+
+    Args:
+        kind (str): Kind of cached object.
+        params (tuple): Construction parameters.
+        **arrays: The arrays to store.
+    """
+    path = cache_path(kind, params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(temporary, __params__=np.array(repr(params)), **arrays)
+    os.replace(temporary, path)
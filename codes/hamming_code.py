@@ -1,5 +1,10 @@
 import numpy as np
 
+from codes.bitvector import BitVector, gf2_matmul, gf2_matvec
+from codes.syndrome_decoder import SyndromeTableDecoder
+
+BACKENDS = ("position", "syndrome")
+
 
 class HammingCode:
     """
@@ -8,17 +13,25 @@ class HammingCode:
 
     Attributes:
         m (int): Length of the data (number of information bits).
+        k (int): Alias of `m`, matching the (n, k) naming of the other codes.
         n (int): Length of the code (total number of bits in the encoded word).
+        backend (str): Batch corrector of unpacked words, "position" or "syndrome".
     """
 
-    def __init__(self, m):
+    def __init__(self, m, backend="position"):
         """
         Initializes a HammingCode object based on the number of data bits.
 
         Args:
             m (int): Number of data bits, e.g., 4 for (7,4) code or 11 for (15,11).
+            backend (str): "position" reads the error position from the syndrome value; "syndrome"
+                looks up a coset-leader table (SyndromeTableDecoder) of weight-1 patterns. Both
+                correct single errors and flag the same uncorrectable words.
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown Hamming backend {backend}, expected one of {BACKENDS}")
         self.m = m
+        self.k = m
         r = 1
         # Calculate the number of parity bits `r` such that 2^r >= m + r + 1
         while 2 ** r < m + r + 1:
@@ -27,6 +40,41 @@ class HammingCode:
         self.r = r
         self.n = m + r  # Total bits = data bits + parity bits
 
+        # Precompute the matrix form of the code used by the batched methods.
+        # Bit positions are 1-indexed as in the per-word methods: parity bits sit at
+        # powers of 2, data bits fill the remaining positions in order.
+        positions = np.arange(1, self.n + 1)
+        is_parity = (positions & (positions - 1)) == 0
+        self.parity_positions = np.flatnonzero(is_parity)  # 0-indexed parity bit positions
+        self.data_positions = np.flatnonzero(~is_parity)  # 0-indexed data bit positions
+
+        # Parity-check matrix: column j is the binary representation of position j + 1
+        self.H = ((positions[None, :] >> np.arange(r)[:, None]) & 1).astype(np.uint8)
+
+        # Generator matrix: each data bit lands at its position and feeds every parity
+        # bit whose check covers that position
+        self.G = np.zeros((m, self.n), dtype=np.uint8)
+        self.G[np.arange(m), self.data_positions] = 1
+        self.G[:, self.parity_positions] = self.H[:, self.data_positions].T
+
+        # Syndrome lookup: syndrome value -> 0-indexed error position, -1 for "no error"
+        # and -2 for syndromes pointing outside the codeword (uncorrectable)
+        syndromes = np.arange(2 ** r)
+        self.syndrome_table = np.where(syndromes <= self.n, syndromes - 1, -2)
+        self._syndrome_weights = (1 << np.arange(r)).astype(np.int64)
+
+        # Packed rows for BitVector inputs: codeword bit j is the parity of (data AND column j of G)
+        self._packed_generator = BitVector.from_bits(self.G.T)
+        self._packed_parity_check = BitVector.from_bits(self.H)
+
+        self.backend = backend
+        self.decoder = SyndromeTableDecoder(self.H, max_weight=1) if backend == "syndrome" else None
+
+    @property
+    def rate(self):
+        """float: Code rate k / n."""
+        return self.k / self.n
+
     def encode(self, data):
         """
         Encodes the given binary data using the Hamming code algorithm.
@@ -72,12 +120,13 @@ class HammingCode:
             encoded_data (np.array): A numpy array of encoded bits (data + parity bits).
 
         Returns:
-            np.array: The original binary data after decoding and correcting errors
+            np.array: The original binary data after decoding and correcting errors. Words with too
+            many errors keep their received data bits, as in `decode_batch`.
         """
         corrected_data = self.correct_error(encoded_data) # Correct any errors in the encoded data if possible
 
-        if corrected_data is None: # If there are too many errors to correct
-            return encoded_data
+        if corrected_data is None: # If there are too many errors to correct, keep the received data bits
+            corrected_data = encoded_data
         # Extract the original data bits from the corrected encoded_data
         original_data = []
         for bit in range(1, self.n + 1):
@@ -121,4 +170,83 @@ class HammingCode:
             encoded_data[error_position - 1] ^= 1
             return encoded_data
         else:   # Error position is out of bounds, meaning too many errors
-            return None
\ No newline at end of file
+            return None
+
+
+    def encode_batch(self, data):
+        """
+        Encodes a batch of data words with a single GF(2) matrix multiplication.
+
+        Args:
+            data (np.array or BitVector): Array of shape (num_words, m) containing the information
+                bits, or packed data words.
+
+        Returns:
+            np.array or BitVector: uint8 array of shape (num_words, n) with the encoded words (packed
+            when the input is packed). Each row is identical to what `encode` returns for that word.
+        """
+        if isinstance(data, BitVector):
+            return gf2_matvec(self._packed_generator, data)
+
+        data = np.asarray(data, dtype=np.uint8).reshape(-1, self.m)
+        return gf2_matmul(data, self.G)
+
+    def correct_error_batch(self, encoded_data):
+        """
+        Detects and corrects single-bit errors in a batch of encoded words.
+
+        Args:
+            encoded_data (np.array or BitVector): Array of shape (num_words, n) of encoded bits, or
+                a (num_words,) batch of packed words.
+
+        Returns:
+            tuple: A tuple containing the corrected words (uint8 array of shape (num_words, n), or
+            packed when the input is packed) and a boolean array flagging the words whose syndrome
+            points outside the codeword (too many errors). Flagged words are returned unchanged.
+        """
+        if self.decoder is not None and not isinstance(encoded_data, BitVector):
+            return self.decoder.decode(encoded_data)
+
+        if isinstance(encoded_data, BitVector):
+            syndrome_bits = gf2_matvec(self._packed_parity_check, encoded_data).to_bits()
+        else:
+            corrected = np.array(encoded_data, dtype=np.uint8).reshape(-1, self.n)
+            syndrome_bits = gf2_matmul(corrected, self.H.T)
+
+        # The syndrome value is the 1-indexed error position
+        error_positions = self.syndrome_table[syndrome_bits @ self._syndrome_weights]
+        rows = np.flatnonzero(error_positions >= 0)
+
+        if isinstance(encoded_data, BitVector):
+            errors = np.zeros((len(error_positions), self.n), dtype=np.uint8)
+            errors[rows, error_positions[rows]] = 1
+            corrected = encoded_data ^ BitVector.from_bits(errors)
+        else:
+            corrected[rows, error_positions[rows]] ^= 1
+
+        return corrected, error_positions == -2
+
+    def decode_batch(self, encoded_data, return_status=False):
+        """
+        Decodes a batch of encoded words, correcting single-bit errors.
+
+        Args:
+            encoded_data (np.array or BitVector): Array of shape (num_words, n) of encoded bits, or
+                a (num_words,) batch of packed words.
+            return_status (bool): If True, also return the uncorrectable-word flags.
+
+        Returns:
+            np.array or BitVector: uint8 array of shape (num_words, m) with the data bits (packed
+            when the input is packed). Words with too many errors keep their received data bits.
+            If `return_status` is True, a tuple of the data bits and a boolean array of
+            uncorrectable words is returned.
+        """
+        corrected, uncorrectable = self.correct_error_batch(encoded_data)
+        if isinstance(corrected, BitVector):
+            decoded = BitVector.from_bits(corrected.to_bits()[:, self.data_positions])
+        else:
+            decoded = corrected[:, self.data_positions]
+
+        if return_status:
+            return decoded, uncorrectable
+        return decoded
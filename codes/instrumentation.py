@@ -0,0 +1,175 @@
+import contextlib
+import json
+import time
+
+# Metrics collecting in this process, or None while instrumentation is disabled (the default)
+_ACTIVE = None
+
+# Returned by `stage` while disabled, so that an uninstrumented run only pays for one global lookup
+_NO_STAGE = contextlib.nullcontext()
+
+# Description of the counters in the Prometheus dump; other counters are dumped without one
+COUNTER_HELP = {
+    "frames": "Frames (codewords) simulated.",
+    "bits": "Information bits compared after decoding.",
+    "samples": "Transmitted words simulated.",
+    "batches": "Batches simulated.",
+    "decoder_iterations": "Iterations run by the iterative decoders.",
+    "decode_failures": "Frames the decoder flagged as not corrected.",
+}
+
+
+def _escape_label(value):
+    """
+    Escapes a Prometheus label value (backslashes, double quotes and newlines).
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    Wall-clock timers of the pipeline stages and event counters of one run.
+
+    Metrics gathered in worker processes are sent back as `as_dict()` and combined with `merge`.
+
+    Attributes:
+        timers (dict): Total seconds and number of calls of each stage, as [seconds, calls].
+        counters (dict): Value of each counter.
+    """
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as one call of the stage `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds, calls=1):
+        """
+        Adds time spent in a stage.
+        """
+        timer = self.timers.setdefault(name, [0.0, 0])
+        timer[0] += seconds
+        timer[1] += calls
+
+    def count(self, name, value=1):
+        """
+        Increments a counter.
+        """
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def merge(self, other):
+        """
+        Adds the timers and counters of other metrics (a Metrics or its `as_dict()`) to these.
+        """
+        other = other.as_dict() if isinstance(other, Metrics) else other
+        for name, timer in other["timers"].items():
+            self.add_time(name, timer["seconds"], timer["calls"])
+        for name, value in other["counters"].items():
+            self.count(name, value)
+
+    def as_dict(self):
+        """
+        Returns the metrics as plain (JSON-serializable, picklable) data.
+        """
+        return {"timers": {name: {"seconds": seconds, "calls": calls}
+                           for name, (seconds, calls) in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items()))}
+
+    def to_json_line(self, **labels):
+        """
+        Returns the metrics as one JSON line (without the newline), with a timestamp and the labels.
+        """
+        return json.dumps({"timestamp": time.time(), **labels, **self.as_dict()})
+
+    def to_prometheus(self, prefix="fec", **labels):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Stage times become `<prefix>_stage_seconds_total{stage="..."}` and
+        `<prefix>_stage_calls_total{stage="..."}`; every counter becomes `<prefix>_<name>_total`.
+
+        Args:
+            prefix (str): Prefix of the metric names.
+            **labels: Labels added to every sample.
+
+        Returns:
+            str: The dump, ending with a newline.
+        """
+        def label_text(extra=None):
+            """
+            Formats the labels of a sample, escaping the values.
+            """
+            items = {**labels, **(extra or {})}
+            if not items:
+                return ""
+            return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in items.items()) + "}"
+
+        lines = []
+        for metric, index, text in (("stage_seconds_total", 0, "Wall-clock time spent in each stage."),
+                                    ("stage_calls_total", 1, "Number of times each stage ran.")):
+            if self.timers:
+                lines += [f"# HELP {prefix}_{metric} {text}", f"# TYPE {prefix}_{metric} counter"]
+                lines += [f"{prefix}_{metric}{label_text({'stage': name})} {timer[index]}"
+                          for name, timer in sorted(self.timers.items())]
+        for name, value in sorted(self.counters.items()):
+            if name in COUNTER_HELP:
+                lines.append(f"# HELP {prefix}_{name}_total {COUNTER_HELP[name]}")
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total{label_text()} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def enable(metrics=None):
+    """
+    Starts collecting metrics in this process.
+
+    Args:
+        metrics (Metrics, optional): Metrics to add to; new ones by default.
+
+    Returns:
+        Metrics: The metrics being collected.
+    """
+    global _ACTIVE
+    _ACTIVE = metrics if metrics is not None else Metrics()
+    return _ACTIVE
+
+
+def disable():
+    """
+    Stops collecting metrics and returns the ones collected (None if instrumentation was disabled).
+    """
+    global _ACTIVE
+    metrics, _ACTIVE = _ACTIVE, None
+    return metrics
+
+
+def active():
+    """
+    Returns the metrics being collected in this process, or None while instrumentation is disabled.
+    """
+    return _ACTIVE
+
+
+def stage(name):
+    """
+    Returns a context manager timing the enclosed block as the stage `name` (a no-op when disabled).
+    """
+    if _ACTIVE is None:
+        return _NO_STAGE
+    return _ACTIVE.stage(name)
+
+
+def count(name, value=1):
+    """
+    Increments a counter of the active metrics (a no-op when disabled).
+    """
+    if _ACTIVE is not None:
+        _ACTIVE.count(name, value)
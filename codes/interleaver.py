@@ -0,0 +1,142 @@
+import numpy as np
+
+# Permutations of the random interleaver, keyed by (length, seed)
+_PERMUTATION_CACHE = {}
+
+
+class Interleaver:
+    """
+    Base class of the interleavers: a fixed index map applied to the last axis of a batch.
+
+    An interleaver spans `depth` codewords of `n` bits. `interleave` takes frames of depth * n bits
+    (the codewords one after another) and returns the channel frames; `deinterleave` undoes it on
+    the received bits or LLRs. Both are a single fancy-indexing operation with precomputed indices.
+
+    Attributes:
+        depth (int): Number of codewords spread over one channel frame.
+        n (int): Codeword length.
+        length (int): Number of bits per input frame (depth * n).
+        interleaved_length (int): Number of bits per channel frame.
+        latency (int): Bits the receiver has to buffer before it can decode the first codeword.
+    """
+
+    def __init__(self, depth, n, forward, inverse):
+        """
+        Stores the index maps.
+
+        Args:
+            depth (int): Number of codewords per frame.
+            n (int): Codeword length.
+            forward (np.array): Input index of each channel bit (-1 for filler bits).
+            inverse (np.array): Channel index of each input bit.
+        """
+        if depth < 1:
+            raise ValueError(f"Interleaver depth must be at least 1, got {depth}")
+        self.depth = depth
+        self.n = n
+        self.length = depth * n
+        self.interleaved_length = len(forward)
+        self._forward = forward
+        self._inverse = inverse
+        self.latency = self.length
+
+    def interleave(self, frames):
+        """
+        Interleaves a batch of frames.
+
+        Args:
+            frames (np.array): Array of shape (..., depth * n).
+
+        Returns:
+            np.array: Array of shape (..., interleaved_length); filler bits are 0.
+        """
+        frames = np.asarray(frames)
+        if frames.shape[-1] != self.length:
+            raise ValueError(f"Frames must have {self.length} bits, got {frames.shape[-1]}")
+        out = frames[..., np.maximum(self._forward, 0)]
+        if (self._forward < 0).any():
+            out[..., self._forward < 0] = 0
+        return out
+
+    def deinterleave(self, frames):
+        """
+        Restores the original bit order of a batch of received frames.
+
+        Args:
+            frames (np.array): Bits or LLRs of shape (..., interleaved_length).
+
+        Returns:
+            np.array: Array of shape (..., depth * n).
+        """
+        return np.asarray(frames)[..., self._inverse]
+
+
+class BlockInterleaver(Interleaver):
+    """
+    Row-column block interleaver: the depth codewords are written as the rows of a depth x n array
+    and sent column by column, so a burst of b bits hits each codeword at most ceil(b / depth) times.
+    """
+
+    def __init__(self, depth, n):
+        """
+        Args:
+            depth (int): Number of codewords (rows).
+            n (int): Codeword length (columns).
+        """
+        forward = np.arange(depth * n).reshape(depth, n).T.ravel()
+        super().__init__(depth, n, forward, np.argsort(forward))
+
+
+class RandomInterleaver(Interleaver):
+    """
+    Pseudo-random interleaver over depth codewords. The permutation depends only on the length and
+    the seed and is computed once per process.
+    """
+
+    def __init__(self, depth, n, seed=0):
+        """
+        Args:
+            depth (int): Number of codewords per frame.
+            n (int): Codeword length.
+            seed (int): Seed of the permutation.
+        """
+        key = (depth * n, seed)
+        if key not in _PERMUTATION_CACHE:
+            _PERMUTATION_CACHE[key] = np.random.default_rng(seed).permutation(depth * n)
+        forward = _PERMUTATION_CACHE[key]
+        super().__init__(depth, n, forward, np.argsort(forward))
+        self.seed = seed
+
+
+class ConvolutionalInterleaver(Interleaver):
+    """
+    Convolutional (Forney) interleaver with `depth` branches: bit t goes through branch t % depth,
+    which delays it by (t % depth) * delay * depth positions. The deinterleaver applies the
+    complementary delays, so the end-to-end delay is (depth - 1) * delay * depth bits, about half
+    of a block interleaver spreading bursts as far.
+
+    On a finite frame the delay lines start and end empty: the channel frame is longer than the
+    input by the end-to-end delay and the extra positions carry filler bits.
+    """
+
+    def __init__(self, depth, n, delay=None):
+        """
+        Args:
+            depth (int): Number of branches (and of codewords per frame).
+            n (int): Codeword length.
+            delay (int, optional): Cells per branch step; defaults to ceil(n / depth), which puts
+                consecutive channel bits about a codeword apart.
+        """
+        delay = delay or -(-n // depth)
+        length = depth * n
+        total_delay = (depth - 1) * delay * depth
+
+        positions = np.arange(length + total_delay)
+        forward = positions - (positions % depth) * delay * depth
+        forward[forward >= length] = -1  # The end of a branch is past the input: filler
+        inputs = np.arange(length)
+        inverse = inputs + (inputs % depth) * delay * depth
+
+        super().__init__(depth, n, forward, inverse)
+        self.delay = delay
+        self.latency = total_delay + n
@@ -0,0 +1,217 @@
+import importlib
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+# Codes by spec name, as "module:class". They are imported on first use, so building a Hamming
+# codec never loads galois (BCH) or scipy (LDPC)
+CODECS = {
+    "hamming": "codes.hamming_code:HammingCode",
+    "bch": "codes.BCH_code:BCHCode",
+    "ldpc": "codes.LDPC:LDPC",
+    "rs": "codes.ReedSolomon:ReedSolomon",
+}
+
+# Codes available to `fit_spec`, smallest first: (n, k) of the BCH codes and n of the LDPC codes
+BCH_CODES = [(15, 7), (63, 57), (127, 113), (255, 223)]
+LDPC_LENGTHS = [15, 63, 127, 255]
+
+# Codecs built in this process, keyed by their canonical spec
+_CODEC_CACHE = {}
+
+
+@runtime_checkable
+class Codec(Protocol):
+    """
+    Common batched interface of the codes: every codec built by the registry satisfies it.
+
+    Messages and codewords are uint8 bit arrays of shape (num_words, k) and (num_words, n).
+    `decode_batch(received, return_status=True)` also returns a boolean array flagging the words
+    the decoder could not correct.
+    """
+
+    n: int
+    k: int
+
+    @property
+    def rate(self) -> float: ...
+
+    def encode_batch(self, data): ...
+
+    def decode_batch(self, received, return_status=False): ...
+
+
+class ByteCodecAdapter:
+    """
+    Exposes a byte-native codec (ReedSolomon) through the bit-level Codec interface.
+
+    A message of k bits is packed into k / 8 bytes, encoded as one (possibly shortened) codeword
+    and unpacked into n = 8 * (message bytes + parity bytes) bits.
+
+    Attributes:
+        codec: The byte codec, with `encode_batch`, `decode_batch` and `encoded_length`.
+        k (int): Number of message bits.
+        n (int): Number of codeword bits.
+    """
+
+    def __init__(self, codec, message_bytes):
+        """
+        Args:
+            codec: The byte codec.
+            message_bytes (int): Number of message bytes per codeword.
+        """
+        self.codec = codec
+        self.k = 8 * message_bytes
+        self.n = 8 * codec.encoded_length(message_bytes)
+
+    @property
+    def rate(self):
+        """float: Code rate k / n."""
+        return self.k / self.n
+
+    def encode_batch(self, data):
+        """
+        Encodes a (num_words, k) array of message bits into (num_words, n) codeword bits.
+        """
+        messages = np.packbits(np.asarray(data, dtype=np.uint8).reshape(-1, self.k), axis=1)
+        return np.unpackbits(self.codec.encode_batch(messages), axis=1)
+
+    def decode_batch(self, received, return_status=False):
+        """
+        Decodes a (num_words, n) array of received bits (LLRs are sliced to hard bits).
+
+        Returns:
+            np.array: uint8 array of shape (num_words, k), and the failure flags if `return_status`.
+        """
+        received = np.asarray(received)
+        if np.issubdtype(received.dtype, np.floating):
+            received = received < 0  # Positive LLRs are 0 bits
+        words = np.packbits(received.astype(np.uint8).reshape(-1, self.n), axis=1)
+        messages, failed = self.codec.decode_batch(words, return_status=True)
+        decoded = np.unpackbits(messages, axis=1)
+        if return_status:
+            return decoded, failed
+        return decoded
+
+
+def parse_spec(spec):
+    """
+    Splits a codec spec such as "bch:127,113" or "ldpc:63,32,construction=gallager".
+
+    Positional values and keyword values are converted to int or float when possible.
+
+    Args:
+        spec (str): The spec, "name:arg,...,key=value,...".
+
+    Returns:
+        tuple: The name, the positional arguments (tuple) and the keyword arguments (dict).
+    """
+    def convert(value):
+        """
+        Converts a spec value to int or float when it is a number.
+        """
+        for kind in (int, float):
+            try:
+                return kind(value)
+            except ValueError:
+                pass
+        return value
+
+    name, _, arguments = spec.strip().partition(":")
+    name = name.lower()
+    if name not in CODECS:
+        raise ValueError(f"Unknown code '{name}' in spec '{spec}', expected one of {sorted(CODECS)}")
+
+    args, kwargs = [], {}
+    for item in filter(None, (item.strip() for item in arguments.split(","))):
+        key, equals, value = item.partition("=")
+        if equals:
+            kwargs[key.strip()] = convert(value.strip())
+        elif kwargs:
+            raise ValueError(f"Positional argument '{item}' after keyword arguments in spec '{spec}'")
+        else:
+            args.append(convert(item))
+    return name, tuple(args), kwargs
+
+
+def codec_spec(name, *args, **kwargs):
+    """
+    Returns the canonical spec string of a codec, e.g. codec_spec("bch", 127, 113) -> "bch:127,113".
+    """
+    items = [str(arg) for arg in args] + [f"{key}={value}" for key, value in sorted(kwargs.items())]
+    return f"{name}:{','.join(items)}"
+
+
+def build_codec(spec):
+    """
+    Constructs a new codec from its spec.
+
+    "rs:nsym,nsize" builds a Reed-Solomon codec with nsym parity bytes and codewords of nsize bytes
+    (255 by default; smaller values give shortened codes) behind a ByteCodecAdapter.
+
+    Args:
+        spec (str): The codec spec.
+
+    Returns:
+        Codec: The codec.
+    """
+    name, args, kwargs = parse_spec(spec)
+    module, attribute = CODECS[name].split(":")
+    factory = getattr(importlib.import_module(module), attribute)
+    if name == "rs":
+        nsym, nsize = (args + (255,))[:2]
+        return ByteCodecAdapter(factory(nsym, nsize=nsize, **kwargs), nsize - nsym)
+    return factory(*args, **kwargs)
+
+
+def get_codec(spec):
+    """
+    Returns the codec of a spec, constructing it once per process.
+
+    Specs that differ only in spacing or keyword order share one instance. Being a module-level
+    function of a string, `get_codec` can serve as the code factory of sweep work units.
+
+    Args:
+        spec (str): The codec spec, e.g. "hamming:11", "bch:127,113", "ldpc:63,32" or "rs:16".
+
+    Returns:
+        Codec: The codec.
+    """
+    name, args, kwargs = parse_spec(spec)
+    key = codec_spec(name, *args, **kwargs)
+    if key not in _CODEC_CACHE:
+        _CODEC_CACHE[key] = build_codec(key)
+    return _CODEC_CACHE[key]
+
+
+def fit_spec(name, message_bits, nsym=None):
+    """
+    Returns the spec of the smallest code of a family that carries a message in a single codeword.
+
+    Args:
+        name (str): Code family: "hamming", "bch", "ldpc" or "rs".
+        message_bits (int): Number of message bits.
+        nsym (int, optional): Number of parity bytes, required for "rs".
+
+    Returns:
+        str: The codec spec.
+    """
+    if name == "hamming":
+        return codec_spec("hamming", message_bits)
+    if name == "bch":
+        for n, k in BCH_CODES:
+            if message_bits <= k:
+                return codec_spec("bch", n, k)
+    elif name == "ldpc":
+        for n in LDPC_LENGTHS:
+            if message_bits < n:
+                return codec_spec("ldpc", n, message_bits)
+    elif name == "rs":
+        if nsym is None:
+            raise ValueError("A Reed-Solomon spec needs the number of parity bytes (nsym)")
+        message_bytes = -(-message_bits // 8)
+        if message_bytes + nsym <= 255:
+            return codec_spec("rs", nsym, message_bytes + nsym)
+    else:
+        raise ValueError(f"Unknown code '{name}', expected one of {sorted(CODECS)}")
+    raise ValueError(f"Input size of {message_bits} bits too large for {name.upper()} coding")
@@ -0,0 +1,141 @@
+import numpy as np
+
+from codes.bitvector import gf2_matmul
+from codes.cache import load_arrays, save_arrays
+
+# Largest redundancy n - k for which a table is built: 2^20 syndromes
+MAX_REDUNDANCY = 20
+
+# Weight marking syndromes without a coset leader in the table
+NO_LEADER = 255
+
+# Number of coset syndromes expanded at a time while building the table
+_BUILD_CHUNK = 1 << 14
+
+# Version of the cached tables, part of the cache key: bump it whenever `coset_leader_table` or the
+# table layout changes, so stale files are not loaded
+CACHE_VERSION = 1
+
+
+def coset_leader_table(columns, n, max_weight=None):
+    """
+    Finds a minimum-weight error pattern (coset leader) for every syndrome.
+
+    The cosets are visited breadth-first by weight: the syndromes of weight w + 1 are those not
+    seen yet among s ^ column_j, for every syndrome s of weight w and every position j. Each new
+    syndrome records its parent syndrome and the added position; the leaders are then rebuilt
+    level by level as the parent's leader with one more bit set.
+
+    Args:
+        columns (np.array): Syndrome of each of the n single-bit errors, as integers below 2^r.
+        n (int): Code length.
+        max_weight (int, optional): Stop after the cosets of this weight (bounded-distance table).
+
+    Returns:
+        tuple: The packed leaders (uint8 array of shape (2^r, ceil(n / 8))) and the leader weights
+        (uint8 array of length 2^r, NO_LEADER where no leader of weight <= max_weight exists).
+    """
+    size = 1 << int(np.max(columns, initial=0)).bit_length()
+    weights = np.full(size, NO_LEADER, dtype=np.uint8)
+    parents = np.zeros(size, dtype=np.int64)
+    positions = np.zeros(size, dtype=np.int64)
+    weights[0] = 0
+
+    levels = [np.zeros(1, dtype=np.int64)]
+    while len(levels[-1]) and (max_weight is None or len(levels) <= max_weight):
+        found = []
+        for start in range(0, len(levels[-1]), _BUILD_CHUNK):
+            frontier = levels[-1][start:start + _BUILD_CHUNK]
+            candidates = (frontier[:, None] ^ columns[None, :]).ravel()
+            new, first = np.unique(candidates, return_index=True)
+            unseen = weights[new] == NO_LEADER
+            new, first = new[unseen], first[unseen]
+            weights[new] = len(levels)
+            parents[new] = frontier[first // n]
+            positions[new] = first % n
+            found.append(new)
+        levels.append(np.concatenate(found))
+
+    # Built packed: bit j of a leader is bit 7 - j % 8 of byte j // 8
+    leaders = np.zeros((size, -(-n // 8)), dtype=np.uint8)
+    for level in levels[1:]:
+        leaders[level] = leaders[parents[level]]
+        leaders[level, positions[level] // 8] |= (0x80 >> (positions[level] % 8)).astype(np.uint8)
+    return leaders, weights
+
+
+class SyndromeTableDecoder:
+    """
+    Syndrome decoder of any binary linear code from its parity-check matrix.
+
+    The coset-leader table maps each of the 2^(n-k) syndromes to a minimum-weight error pattern,
+    so decoding a batch is one matrix product for the syndromes and one gather. The complete table
+    gives maximum-likelihood decoding on the BSC; with `max_weight` it is a bounded-distance
+    decoder that flags the words with heavier error patterns. Tables are cached on disk.
+
+    Attributes:
+        H (np.array): Binary parity-check matrix of shape (r, n).
+        n (int): Code length.
+        max_weight (int): Largest corrected error weight, or None for complete decoding.
+        leaders (np.array): Packed coset leaders, indexed by syndrome.
+        weights (np.array): Weight of each coset leader (NO_LEADER when not tabulated).
+    """
+
+    def __init__(self, H, max_weight=None, cache=True):
+        """
+        Builds (or loads) the table.
+
+        Args:
+            H (np.array): Binary parity-check matrix; its rows need not be independent.
+            max_weight (int, optional): Largest error weight to correct; None for all cosets.
+            cache (bool): Whether to load and store the table in the on-disk cache.
+        """
+        self.H = np.asarray(H, dtype=np.uint8)
+        r, self.n = self.H.shape
+        if r > MAX_REDUNDANCY:
+            raise ValueError(f"A syndrome table needs n - k <= {MAX_REDUNDANCY}, got {r} parity checks")
+        self.max_weight = max_weight
+
+        # Syndromes are the integers whose bit i is parity check i
+        self._syndrome_weights = (1 << np.arange(r)).astype(np.int64)
+        columns = self._syndrome_weights @ self.H.astype(np.int64)
+
+        params = (CACHE_VERSION, self.n, tuple(columns.tolist()), max_weight)
+        arrays = load_arrays("syndrome", params) if cache else None
+        if arrays is None:
+            leaders, weights = coset_leader_table(columns, self.n, max_weight)
+            arrays = {"leaders": leaders, "weights": weights}
+            if cache:
+                save_arrays("syndrome", params, **arrays)
+        self.leaders = arrays["leaders"]
+        self.weights = arrays["weights"]
+
+    def syndromes(self, words):
+        """
+        Returns the syndrome of each word as an integer.
+
+        Args:
+            words (np.array): Bits of shape (num_words, n).
+
+        Returns:
+            np.array: int64 array of shape (num_words,).
+        """
+        return gf2_matmul(words, self.H.T) @ self._syndrome_weights
+
+    def decode(self, words):
+        """
+        Corrects a batch of received words.
+
+        Args:
+            words (np.array): Bits of shape (num_words, n).
+
+        Returns:
+            tuple: The corrected uint8 words of shape (num_words, n) and a boolean array flagging
+            the words whose syndrome has no tabulated leader (left uncorrected).
+        """
+        words = np.asarray(words, dtype=np.uint8).reshape(-1, self.n)
+        syndromes = self.syndromes(words)
+        failed = self.weights[syndromes] == NO_LEADER
+        errors = np.unpackbits(self.leaders[syndromes], axis=1, count=self.n)
+        errors[failed] = 0
+        return words ^ errors, failed
@@ -1,21 +1,74 @@
+import argparse
+
 import numpy as np
 from simulation.scripts.inputs import choose_channel, choose_correction_code, initialize_input
 from simulation.scripts.string_modification import string_to_bits, bits_to_string
 from channels.BSC_channel import bsc_channel
 from channels.GE_channel import gilbert_elliott_channel
-from codes.BCH_code import BCHCode
-from codes.hamming_code import HammingCode
-from codes.ReedSolomon import ReedSolomon
-from codes.LDPC import LDPC
+from codes.registry import fit_spec, get_codec
+
+# Command-line names of the channels and codes, in the order of the interactive choices, and the
+# registry family of each code
+CHANNEL_NAMES = ["bsc", "ge"]
+CHANNEL_PARAMETERS = {"bsc": "BER", "ge": "p_gb p_bg p_g p_b"}
+CODE_NAMES = ["rs", "h", "bch", "ldpc"]
+CODE_FAMILIES = ["rs", "hamming", "bch", "ldpc"]
+
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line. Every setting left out is asked for interactively.
+
+    Parameters:
+    argv (list[str], optional): Arguments; defaults to the command line.
 
-def main():
+    Returns:
+    argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Sends a text through an error correction code and a channel. Settings that are "
+                    "not given are asked for interactively; --config runs batch simulations instead.")
+    parser.add_argument("--config", nargs="+", metavar="PATH",
+                        help="run these JSON/TOML/YAML configs headlessly (see simulation/scripts/runner.py)")
+    parser.add_argument("--text", help="text to transmit")
+    parser.add_argument("--channel", choices=CHANNEL_NAMES, help="transmission channel")
+    parser.add_argument("--channel-params", type=float, nargs="+", metavar="P",
+                        help="BER for BSC, or p_gb p_bg p_g p_b for GE")
+    parser.add_argument("--code", choices=CODE_NAMES, help="error correction code")
+    parser.add_argument("--nsym", type=int, help="number of RS correction symbols")
+    parser.add_argument("--spec", help="codec spec such as bch:127,113 or ldpc:63,32 (overrides --code)")
+    args = parser.parse_args(argv)
+
+    # The channel parameters are checked here, so that a wrong count is reported like any usage error
+    if args.channel_params is not None:
+        if args.channel is None:
+            parser.error("--channel-params needs --channel")
+        names = CHANNEL_PARAMETERS[args.channel].split()
+        if len(args.channel_params) != len(names):
+            parser.error(f"--channel {args.channel} takes {len(names)} parameter(s) ({' '.join(names)}), "
+                         f"got {len(args.channel_params)}")
+        if not all(0.0 <= value <= 1.0 for value in args.channel_params):
+            parser.error("channel parameters are probabilities and must be between 0 and 1")
+    return args
+
+
+def main(argv=None):
     """
     Main function to run the data transmission simulation.
+
+    Parameters:
+    argv (list[str], optional): Command-line arguments; defaults to the command line.
     """
+    args = parse_arguments(argv)
+    if args.config:
+        from simulation.scripts.runner import main as run_configs
+        run_configs(args.config)
+        return
+
     print("=== Data Transmission Simulation ===")
 
     # 1. Get user input
-    input_text = initialize_input()
+    input_text = args.text if args.text is not None else initialize_input()
     input_bits = string_to_bits(input_text)
     m = len(input_bits)  # m is the number of data bits (length of input bits)
 
@@ -23,97 +76,51 @@ def main():
     print(f"Original data: {input_bits}")
 
     # 2. Choose transmission channel
-    channel_choice = choose_channel()
-
-    # 3. Choose error correction code
-    code_choice = choose_correction_code()
-
-    # 4. Set up simulation parameters
-    if code_choice == 0:  # Reed-Solomon
-        nsym = int(input("\nEnter the number of correction symbols for RS: "))
-        encode_fn = lambda b: ReedSolomon.encode_text_rs(b, nsym)
-        decode_fn = lambda eb: ReedSolomon.decode_text_rs(eb, nsym)
-    elif code_choice == 1:  # Hamming
-        hamming = HammingCode(m)  # Create HammingCode object with m (data bits)
-        encode_fn = hamming.encode
-        decode_fn = hamming.decode
-    elif code_choice == 2:  # BCH
-        # Calculate BCH parameters based on the number of data bits
-        if m <= 7:
-            n = 15
-            k = 7
-            t = 1  # Error correction capability
-        elif m <= 63:
-            n = 63
-            k = 57
-            t = 2
-        elif m <= 127:
-            n = 127
-            k = 113
-            t = 3
-        elif m <= 255:
-            n = 255
-            k = 223
-            t = 4
-        else:
-            print("Error: Input size too large for BCH coding.")
-            return
-
-        bch = BCHCode(n, k, t)
-        encode_fn = bch.encode
-        decode_fn = bch.decode
-        print(f"Using BCH code with n={n}, k={m}, t={t}.")
-
-    elif code_choice == 3:  # LDPC
-        # LDPC code parameters based on the length of the input text (m)
-        if m <= 7:
-            n = 15
-        elif m <= 63:
-            n = 63
-        elif m <= 127:
-            n = 127
-        elif m <= 255:
-            n = 255
-        else:
-            print("Error: Input size too large for LDPC coding.")
+    channel_choice = CHANNEL_NAMES.index(args.channel) if args.channel else choose_channel()
+
+    # 3. Choose error correction code (a full codec spec skips the choice)
+    spec = args.spec
+    if spec is None:
+        code_choice = CODE_NAMES.index(args.code) if args.code else choose_correction_code()
+        nsym = None
+        if code_choice == 0:  # Reed-Solomon
+            nsym = args.nsym if args.nsym is not None else int(input("\nEnter the number of correction symbols for RS: "))
+
+        # 4. Set up simulation parameters: the smallest code of the family that fits the m data bits
+        try:
+            spec = fit_spec(CODE_FAMILIES[code_choice], m, nsym=nsym)
+        except ValueError as error:
+            print(f"Error: {error}.")
             return
 
-        print(f"Calculated code length n: {n}")
-        print(f"Using LDPC code with m={m} and n={n}")
-
-        # Create LDPC object
-        ldpc = LDPC(n, m)  # Assuming LDPC needs only n (code length) and m (data length)
-        encode_fn = ldpc.encode
-        decode_fn = ldpc.decode
-    else:
-        print("Unsupported correction code!")
-        return
+    codec = get_codec(spec)
+    print(f"Using code {spec} with n={codec.n}, k={codec.k} (rate {codec.rate:.3f}) for m={m} data bits.")
 
-    # 5. Encode data
-    encoded_bits = encode_fn(input_bits)
+    # 5. Encode data, split into k-bit frames (the last one zero-padded)
+    frames = -(-m // codec.k)
+    messages = np.zeros(frames * codec.k, dtype=np.uint8)
+    messages[:m] = input_bits
+    encoded_bits = codec.encode_batch(messages.reshape(frames, codec.k)).ravel()
     print("\nEncoded data: ", encoded_bits)
 
     # 6. Transmit through the chosen channel
     if channel_choice == 0:  # BSC
-        transmitted_bits = bsc_channel(encoded_bits)
+        transmitted_bits, flipped_bits_count = bsc_channel(encoded_bits, *(args.channel_params or ()))
     elif channel_choice == 1:  # Gilbert-Elliot
-        transmitted_bits = gilbert_elliott_channel(encoded_bits)
+        transmitted_bits, flipped_bits_count = gilbert_elliott_channel(encoded_bits, args.channel_params)
     else:
         print("Unsupported transmission channel!")
         return
 
     print("\nData after channel transmission: ", transmitted_bits)
+    print(f"Bits flipped by the channel: {flipped_bits_count}")
 
     # 7. Decode data
-    # If transmitted_bits is a tuple (which can happen in some channels), take the first element
-    if isinstance(transmitted_bits, tuple):
-        transmitted_bits = transmitted_bits[0]  # Take the array part of the tuple
-
-    transmitted_bits = np.array(transmitted_bits, dtype=int).tolist()
-    decoded_bits = decode_fn(transmitted_bits)
-    if decoded_bits[0] != input_bits[0]:
-        decoded_bits = np.insert(decoded_bits, 0, 0)
+    decoded_frames, failed = codec.decode_batch(np.asarray(transmitted_bits).reshape(frames, codec.n), return_status=True)
+    decoded_bits = decoded_frames.ravel()[:m]  # Drop the zero padding of the message
     print("\nDecoded data: ", decoded_bits)
+    if failed.any():
+        print(f"Frames the decoder could not correct: {failed.sum()} of {frames}")
 
     # 8. Convert to text
     try:
@@ -1,141 +1,138 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import csv
+import os
+from codes import instrumentation
 from codes.BCH_code import BCHCode
+from codes.interleaver import BlockInterleaver, ConvolutionalInterleaver, RandomInterleaver
+from channels.AWGN_channel import AWGNChannel
+from channels.BSC_channel import BSCChannel
+from channels.GE_channel import GilbertElliottChannel
+from simulation.scripts.importance_sampling import importance_channel_args
+from simulation.scripts.report import render_report
+from simulation.scripts.result_store import ResultStore
+from simulation.scripts.sweep import StoppingRule, WorkUnit, point_channel_args, run_sweep
 
-# Functions simulating transmission channels
-def bsc_channel(bits, ber):
+# Function to simulate and save results
+def simulate_and_save_results(channel_factory, channel_name, bch_params, input_bits, bers,
+                              output_dir_csv, *channel_args, point_name="BER"):
     """
-    Simulates a Binary Symmetric Channel (BSC) by flipping bits with a given Bit Error Rate (BER).
+    Simulates data transmission through a given channel and saves the results to a CSV file.
+
+    The (BER, code) points are run in parallel by the shared sweep engine. For the AWGN channel
+    the swept values are Eb/N0 in dB instead of BERs. BSC points below `importance_below` are
+    estimated by importance sampling at about t + 1 flips per frame.
 
     Parameters:
-    bits (list): List of bits to be transmitted.
-    ber (float): Bit Error Rate.
+    channel_factory (class): Channel class (BSCChannel, GilbertElliottChannel or AWGNChannel).
+    channel_name (str): Name of the channel.
+    bch_params (list): List of BCH code parameters (n, k, t).
+    input_bits (list): List of input bits to be transmitted.
+    bers (list): List of Bit Error Rates (or Eb/N0 values in dB) to simulate.
+    output_dir_csv (str): Directory to save the CSV file.
+    *channel_args: Channel parameters; the BER (or Eb/N0 and code rate) is used when none are given.
+    point_name (str): Header of the swept-value column in the CSV file.
 
     Returns:
-    list: List of bits after transmission through the BSC.
+    list: List of all simulation results.
     """
-    return [bit if np.random.rand() > ber else 1 - bit for bit in bits]
+    csv_file = f"{output_dir_csv}/{channel_name}_results_combined.csv"
 
-def gilbert_elliott_channel(bits, p, r, h, k):
-    """
-    Simulates a Gilbert-Elliott channel with given parameters.
+    # The file is shared by every word size: the header is only written when it is created
+    if not os.path.exists(csv_file):
+        with open(csv_file, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Word Size", point_name, "n", "k", "t", "Average Bit Errors", "Bit Error Rate",
+                             "CI Lower", "CI Upper", "BER Variance", "Trials", "Estimator"])
 
-    Parameters:
-    bits (list): List of bits to be transmitted.
-    p (float): Probability of transitioning from Good to Bad state.
-    r (float): Probability of transitioning from Bad to Good state.
-    h (float): Error probability in Good state.
-    k (float): Error probability in Bad state.
+    units = []
+    for ber in bers:
+        for n, k, t in bch_params:
+            args = point_channel_args(channel_factory, ber, n, k, channel_args)
+            units.append(WorkUnit(BCHCode, (n, k, t), channel_factory, args, input_bits, key=(ber, n, k, t),
+                                  biased_channel_args=importance_channel_args(channel_factory, args, n, t + 1,
+                                                                              importance_below)))
+
+    def result_row(unit, unit_counts):
+        """
+        Returns the result tuple of a finished point.
+        """
+        return unit.key + (unit_counts.average_bit_errors, unit_counts.bit_error_rate,
+                           *unit_counts.confidence_interval(stopping.confidence, stopping.ci_method),
+                           unit_counts.bit_error_variance, unit_counts.samples,
+                           "importance" if unit.biased_channel_args is not None else "monte-carlo")
+
+    # Append each point to the CSV file as soon as it is finished
+    with open(csv_file, mode='a', newline='') as file:
+        writer = csv.writer(file)
 
-    Returns:
-    list: List of bits after transmission through the Gilbert-Elliott channel.
-    """
-    state = 0  # Start in Good state
-    transmitted_bits = []
-
-    for bit in bits:
-        if state == 0:
-            if np.random.rand() < p:
-                state = 1
-            error_prob = h
-        else:
-            if np.random.rand() < r:
-                state = 0
-            error_prob = k
-
-        if np.random.rand() < error_prob:
-            transmitted_bits.append(1 - bit)
-        else:
-            transmitted_bits.append(bit)
-
-    return transmitted_bits
+        def save_row(unit, unit_counts):
+            """
+            Appends the CSV row of a finished point.
+            """
+            with instrumentation.stage("csv"):
+                writer.writerow((len(input_bits),) + result_row(unit, unit_counts))
+                file.flush()
 
-# Function to simulate and save results
-def simulate_and_save_results(channel_fn, channel_name, bch_params, input_bits, bers,
-                              output_dir_csv, *channel_args):
+        print(f"Simulating {channel_name} channel: {len(units)} points")
+        counts = run_sweep(units, stopping=stopping, seed=seed, max_workers=max_workers, callback=save_row,
+                           store=store)
+
+    return [result_row(unit, unit_counts) for unit, unit_counts in zip(units, counts)]
+
+def simulate_interleaver_depths(channel_factory, channel_name, bch_params, input_bits, ber, depths, output_dir_csv,
+                                *channel_args):
     """
-    Simulates data transmission through a given channel and saves the results to a CSV file.
+    Simulates every code behind each interleaver type and depth and saves the results to a CSV file.
+
+    Throughput is the code rate times the fraction of frames decoded correctly; dividing it by the
+    interleaver latency (in bits) ranks the depths by throughput per unit latency.
 
     Parameters:
-    channel_fn (function): Function to simulate the transmission channel.
+    channel_factory (class): Channel class (BSCChannel or GilbertElliottChannel).
     channel_name (str): Name of the channel.
     bch_params (list): List of BCH code parameters (n, k, t).
     input_bits (list): List of input bits to be transmitted.
-    bers (list): List of Bit Error Rates to simulate.
+    ber (float): Bit Error Rate, used when no channel parameters are given.
+    depths (list): Interleaver depths (codewords per interleaver frame) to simulate.
     output_dir_csv (str): Directory to save the CSV file.
-    *channel_args: Additional arguments for the channel function.
+    *channel_args: Channel parameters; the BER is used when none are given.
 
     Returns:
     list: List of all simulation results.
     """
-    csv_file = f"{output_dir_csv}/{channel_name}_results_combined.csv"
-
-    # Create CSV file with header
-    with open(csv_file, mode='w', newline='') as file:
+    units = [WorkUnit(BCHCode, (n, k, t), channel_factory, channel_args or (ber,), input_bits,
+                      key=(name, depth, n, k, t), interleaver=interleaver_factory(depth, n))
+             for name, interleaver_factory in interleavers.items() for depth in depths for n, k, t in bch_params]
+
+    print(f"Simulating {channel_name} channel with interleavers: {len(units)} points")
+    counts = run_sweep(units, stopping=stopping, seed=seed, max_workers=max_workers, store=store)
+    results = []
+    for unit, unit_counts in zip(units, counts):
+        n, k = unit.key[2], unit.key[3]
+        throughput = k / n * (1.0 - unit_counts.frame_error_rate)
+        results.append(unit.key + (unit_counts.frame_error_rate, unit_counts.bit_error_rate, throughput,
+                                   unit.interleaver.latency, throughput / unit.interleaver.latency))
+
+    with open(f"{output_dir_csv}/{channel_name}_interleaver_results.csv", mode='w', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow(["BER", "n", "k", "t", "Average Bit Errors"])
-
-    num_samples = 500  # Number of samples for each BER
-    all_results = []  # List to return all results
-
-    for ber in bers:
-        print(f"Simulating {channel_name} channel with BER={ber}")
-        results_for_ber = []  # Results for a single BER
-
-        for n, k, t in bch_params:
-            bch = BCHCode(n, k, t)
-            input_chunks = [input_bits[i:i + k] for i in range(0, len(input_bits), k)]
-            total_bit_errors = 0  # Number of errors for averaging
-
-            for _ in range(num_samples):  # Multiple simulations
-                bit_errors = 0
-                for chunk in input_chunks:
-                    # Pad with zeros if necessary
-                    if len(chunk) < k:
-                        chunk.extend([0] * (k - len(chunk)))
-                    encoded_bits = bch.encode(chunk)
-                    if channel_name == "GE":
-                        transmitted_bits = channel_fn(encoded_bits, *channel_args)
-                    else:
-                        transmitted_bits = channel_fn(encoded_bits, ber)
-                    decoded_bits = bch.decode(transmitted_bits)
-
-                    # Correctly compare errors
-                    if len(decoded_bits) < len(chunk):
-                        decoded_bits = np.pad(decoded_bits, (0, len(chunk) - len(decoded_bits)), 'constant')
-                    elif len(decoded_bits) > len(chunk):
-                        decoded_bits = decoded_bits[:len(chunk)]
-
-                    bit_errors += np.sum(np.array(chunk) != np.array(decoded_bits))
-
-                total_bit_errors += bit_errors
-
-            # Calculate the average number of errors for the given BER
-            avg_bit_errors = total_bit_errors / num_samples
-            result = (ber, n, k, t, avg_bit_errors)
-            results_for_ber.append(result)
-            all_results.append(result)
-
-        # Save results for the current BER to the CSV file
-        with open(csv_file, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerows(results_for_ber)
+        writer.writerow(["Interleaver", "Depth", "n", "k", "t", "Frame Error Rate", "Bit Error Rate", "Throughput",
+                         "Latency", "Throughput per Latency"])
+        writer.writerows(results)
 
-    return all_results
+    return results
 
-# BCH parameters
+# BCH parameters (n, k, t); t must be the capability of the (n, k) code
 bch_params = [
     (7, 4, 1),
     (15, 11, 1),
     (15, 7, 2),
     (15, 5, 3),
     (31, 26, 1),
-    (31, 11, 4),
+    (31, 11, 5),
     (63, 57, 1),
-    (63, 39, 5),
+    (63, 39, 4),
     (127, 120, 1),
-    (127, 50, 6)
+    (127, 50, 13)
 ]
 
 # Word sizes to iterate over (limited to 120 or less)
@@ -144,72 +141,78 @@ word_sizes = [4, 5, 7, 11, 26, 39, 50, 57, 120]
 # BER range
 bers = np.logspace(-6, -2, 20)
 
-# Output directories
-output_dir_figures = "../figures"
-output_dir_csv = "../CSV"
-
-# Gilbert-Elliott channel parameters
-p, r, h, k = 0.01, 0.1, 0.001, 0.8
-
-# Create a plot grid with enough subplots for BSC channel
-fig_bsc, axes_bsc = plt.subplots(len(word_sizes), 1, figsize=(12, 5 * len(word_sizes)))
-axes_bsc = axes_bsc.flatten()  # Flatten axes for easier iteration
+# BSC points below this BER see no errors in 50000 plain Monte Carlo samples; they are
+# importance-sampled instead
+importance_below = 1e-4
 
-# Create a plot grid with enough subplots for GE channel
-fig_ge, axes_ge = plt.subplots(len(word_sizes), 1, figsize=(12, 5 * len(word_sizes)))
-axes_ge = axes_ge.flatten()  # Flatten axes for easier iteration
+# Eb/N0 range (dB) of the soft-decision AWGN channel
+ebn0s = np.arange(0.0, 10.5, 1.0)
 
-# Loop over the desired word sizes and run the simulation for each
-for i, word_size in enumerate(word_sizes):
-    print(f"Simulating for word size {word_size}")
-    input_bits = np.random.randint(0, 2, word_size).tolist()
+# Interleavers placed between the encoder and the GE channel, and the depths to compare
+interleavers = {"block": BlockInterleaver, "random": RandomInterleaver, "convolutional": ConvolutionalInterleaver}
+interleaver_depths = [1, 2, 4, 8, 16, 32]
 
-    # Simulate for BSC channel
-    results_bsc = simulate_and_save_results(bsc_channel, "BSC", bch_params, input_bits, bers, output_dir_csv)
-
-    # Simulate for Gilbert-Elliott channel
-    results_ge = simulate_and_save_results(gilbert_elliott_channel, "GE", bch_params, input_bits, bers, output_dir_csv, p, r, h, k)
+# Output directories
+output_dir_figures = "../figures"
+output_dir_csv = "../CSV"
 
-    # Get the current axis for plotting for BSC
-    ax_bsc = axes_bsc[i]
-    # Plot results for BSC
-    for n, k, t in bch_params:
-        errors_bsc = [r[4] for r in results_bsc if r[1] == n and r[2] == k and r[3] == t]
-        ax_bsc.plot(bers, errors_bsc, label=f"BCH (n={n}, k={k}, t={t})", marker='o')
-
-    ax_bsc.set_xscale('log')
-    ax_bsc.set_xlabel("BER")
-    ax_bsc.set_ylabel("Bit Errors")
-    ax_bsc.set_title(f"BSC Channel - Word Size {word_size}")
-    ax_bsc.grid(True)
-    ax_bsc.legend(loc='upper left', bbox_to_anchor=(1.05, 1), ncol=1)  # Add legend for each plot
-
-    # Get the current axis for plotting for GE
-    ax_ge = axes_ge[i]
-    # Plot results for GE
+# Gilbert-Elliott channel parameters (p, r, h, k)
+ge_params = (0.01, 0.1, 0.001, 0.8)
+
+# Stopping rule for each BER point: 100 frame errors, a +-10 % confidence interval or 50000 samples,
+# whichever comes first. Root seed of the sweep and number of worker processes
+stopping = StoppingRule(min_frame_errors=100, ci_width=0.2, max_trials=50000)
+seed = 0
+max_workers = None  # One worker per CPU
+
+# Every finished batch is checkpointed in this database; rerunning the script resumes the sweep
+results_db = f"{output_dir_csv}/BCH_results.sqlite"
+store = None
+
+# Stage timers and counters (encode, channel, decode, chunking, CSV) of each run, one JSON line per run
+metrics_file = f"{output_dir_csv}/BCH_metrics.jsonl"
+
+if __name__ == "__main__":
+    store = ResultStore(results_db)
+    instrumentation.enable()
+
+    # The CSV files are rebuilt on every run (points already in the store are not simulated again)
+    for channel_name in ("BSC", "GE", "AWGN"):
+        if os.path.exists(f"{output_dir_csv}/{channel_name}_results_combined.csv"):
+            os.remove(f"{output_dir_csv}/{channel_name}_results_combined.csv")
+
+    # Loop over the desired word sizes and run the simulation for each; the words are drawn from
+    # the seed so that a resumed run sends the same words
+    word_rng = np.random.default_rng(seed)
+    for word_size in word_sizes:
+        print(f"Simulating for word size {word_size}")
+        input_bits = word_rng.integers(0, 2, word_size).tolist()
+
+        # Simulate for BSC channel
+        simulate_and_save_results(BSCChannel, "BSC", bch_params, input_bits, bers, output_dir_csv)
+
+        # Simulate for Gilbert-Elliott channel
+        simulate_and_save_results(GilbertElliottChannel, "GE", bch_params, input_bits, bers, output_dir_csv, *ge_params)
+
+        # Simulate for the soft-decision AWGN channel over the Eb/N0 range
+        simulate_and_save_results(AWGNChannel, "AWGN", bch_params, input_bits, ebn0s, output_dir_csv, point_name="Eb/N0 (dB)")
+
+    # Interleaver depth sweep on the GE channel with a word of the longest size, drawn after the
+    # word-size loop so that it is the same on every run
+    interleaver_word_size = max(word_sizes)
+    interleaver_bits = word_rng.integers(0, 2, interleaver_word_size).tolist()
+    results_interleaver = simulate_interleaver_depths(GilbertElliottChannel, "GE", bch_params, interleaver_bits,
+                                                      bers[0], interleaver_depths, output_dir_csv, *ge_params)
     for n, k, t in bch_params:
-        errors_ge = [r[4] for r in results_ge if r[1] == n and r[2] == k and r[3] == t]
-        ax_ge.plot(bers, errors_ge, label=f"BCH (n={n}, k={k}, t={t})", marker='x')
-
-    ax_ge.set_xscale('log')
-    ax_ge.set_xlabel("BER")
-    ax_ge.set_ylabel("Bit Errors")
-    ax_ge.set_title(f"GE Channel - Word Size {word_size}")
-    ax_ge.grid(True)
-    ax_ge.legend(loc='upper left', bbox_to_anchor=(1.05, 1), ncol=1)  # Add legend for each plot
-
-# Adjust layout to prevent overlap for BSC and GE and add more space for the legend
-fig_bsc.tight_layout(pad=4.0)
-fig_ge.tight_layout(pad=4.0)
-
-# Increase figure width for better visibility of the legend
-fig_bsc.set_figwidth(15)
-fig_ge.set_figwidth(15)
-
-# Save the BSC and GE plots separately
-fig_bsc.savefig(f"{output_dir_figures}/bsc_performance_combined.png")
-fig_ge.savefig(f"{output_dir_figures}/ge_performance_combined.png")
-
-# Show both plots separately
-fig_bsc.show()
-fig_ge.show()
\ No newline at end of file
+        rows = [r for r in results_interleaver if r[2] == n and r[3] == k]
+        best = max(rows, key=lambda r: r[9])
+        print(f"BCH ({n}, {k}, {t}): best throughput per latency with the {best[0]} interleaver of depth {best[1]}")
+
+    # Draw the BER/FER panels of every channel and word size from the store (unchanged panels are
+    # kept); `python -m simulation.scripts.report` redraws them while a sweep is running
+    for path in render_report(store, output_dir_figures, stopping.confidence, stopping.ci_method):
+        print(f"Rendered {path}")
+    store.close()
+
+    with open(metrics_file, "a") as file:
+        file.write(instrumentation.disable().to_json_line(script="BCH_errors") + "\n")
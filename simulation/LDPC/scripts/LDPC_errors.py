@@ -1,117 +1,82 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import csv
+import os
 from codes.LDPC import LDPC
-
-# Functions simulating transmission channels
-def bsc_channel(bits, ber):
-    """
-    Simulates a Binary Symmetric Channel (BSC) by flipping bits with a given Bit Error Rate (BER).
-
-    Parameters:
-    bits (list): List of bits to be transmitted.
-    ber (float): Bit Error Rate.
-
-    Returns:
-    list: List of bits after transmission through the BSC.
-    """
-    return [bit if np.random.rand() > ber else 1 - bit for bit in bits]
-
-def gilbert_elliott_channel(bits, p, r, h, k):
-    """
-    Simulates a Gilbert-Elliott channel with given parameters.
-
-    Parameters:
-    bits (list): List of bits to be transmitted.
-    p (float): Probability of transitioning from Good to Bad state.
-    r (float): Probability of transitioning from Bad to Good state.
-    h (float): Error probability in Good state.
-    k (float): Error probability in Bad state.
-
-    Returns:
-    list: List of bits after transmission through the Gilbert-Elliott channel.
-    """
-    state = 0  # Start in Good state
-    transmitted_bits = []
-
-    for bit in bits:
-        if state == 0:
-            if np.random.rand() < p:
-                state = 1
-            error_prob = h
-        else:
-            if np.random.rand() < r:
-                state = 0
-            error_prob = k
-
-        if np.random.rand() < error_prob:
-            transmitted_bits.append(1 - bit)
-        else:
-            transmitted_bits.append(bit)
-
-    return transmitted_bits
+from channels.AWGN_channel import AWGNChannel
+from channels.BSC_channel import BSCChannel
+from channels.GE_channel import GilbertElliottChannel
+from codes import instrumentation
+from simulation.scripts.importance_sampling import importance_channel_args
+from simulation.scripts.report import render_report
+from simulation.scripts.result_store import ResultStore
+from simulation.scripts.sweep import StoppingRule, WorkUnit, point_channel_args, run_sweep
 
 # Function to simulate and save results
-def simulate_and_save_results(channel_fn, channel_name, ldpc_params, input_bits, bers, output_dir_figures, output_dir_csv, word_size, *channel_args):
+def simulate_and_save_results(channel_factory, channel_name, ldpc_params, input_bits, bers, output_dir_csv, word_size, *channel_args, point_name="BER"):
     """
     Simulates data transmission through a given channel and saves the results to a CSV file.
 
+    The (BER, code) points are run in parallel by the shared sweep engine. For the AWGN channel
+    the swept values are Eb/N0 in dB instead of BERs. BSC points below `importance_below` are
+    estimated by importance sampling, flipping `importance_flip_rate` of the bits on average.
+
     Parameters:
-    channel_fn (function): Function to simulate the transmission channel.
+    channel_factory (class): Channel class (BSCChannel, GilbertElliottChannel or AWGNChannel).
     channel_name (str): Name of the channel.
     ldpc_params (list): List of LDPC code parameters (n, k).
     input_bits (list): List of input bits to be transmitted.
-    bers (list): List of Bit Error Rates to simulate.
-    output_dir_figures (str): Directory to save the figures.
+    bers (list): List of Bit Error Rates (or Eb/N0 values in dB) to simulate.
     output_dir_csv (str): Directory to save the CSV file.
     word_size (int): Size of the word to be transmitted.
-    *channel_args: Additional arguments for the channel function.
+    *channel_args: Channel parameters; the BER (or Eb/N0 and code rate) is used when none are given.
+    point_name (str): Header of the swept-value column in the CSV file.
 
     Returns:
     list: List of all simulation results.
     """
-    results = []
-    num_samples = 1000
+    csv_file = f"{output_dir_csv}/{channel_name}_results_combined.csv"
+
+    # The file is shared by every word size: the header is only written when it is created
+    if not os.path.exists(csv_file):
+        with open(csv_file, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Word Size", point_name, "n", "k", "Average Bit Errors", "Bit Error Rate", "CI Lower",
+                             "CI Upper", "BER Variance", "Trials", "Estimator"])
+
+    units = []
     for ber in bers:
-        print(f"Simulating {channel_name} channel with BER={ber}")
         for n, k in ldpc_params:
-            ldpc = LDPC(n, k)
-            input_chunks = [input_bits[i:i + k] for i in range(0, len(input_bits), k)]
-            total_bit_errors = 0
-
-            for _ in range(num_samples):
-                bit_errors = 0
-                for chunk in input_chunks:
-                    # Pad with zeros if necessary
-                    if len(chunk) < k:
-                        chunk.extend([0] * (k - len(chunk)))
-                    encoded_bits = ldpc.encode(chunk)
-                    if channel_name == "GE":
-                        transmitted_bits = channel_fn(encoded_bits, *channel_args)
-                    else:
-                        transmitted_bits = channel_fn(encoded_bits, ber)
-                    decoded_bits = ldpc.decode(transmitted_bits)
-
-                    # Correctly compare errors
-                    if len(decoded_bits) < len(chunk):
-                        decoded_bits = np.pad(decoded_bits, (0, len(chunk) - len(decoded_bits)), 'constant')
-                    elif len(decoded_bits) > len(chunk):
-                        decoded_bits = decoded_bits[:len(chunk)]
-
-                    bit_errors += np.sum(np.array(chunk) != np.array(decoded_bits))
-                total_bit_errors += bit_errors
-
-            avg_bit_errors = total_bit_errors / num_samples
-            results.append((ber, n, k, avg_bit_errors))
-
-    # Save results to CSV file
-    csv_file = f"{output_dir_csv}/{channel_name}_results_combined.csv"
-    with open(csv_file, mode='w', newline='') as file:
+            args = point_channel_args(channel_factory, ber, n, k, channel_args)
+            units.append(WorkUnit(LDPC, (n, k), channel_factory, args, input_bits, key=(ber, n, k),
+                                  biased_channel_args=importance_channel_args(
+                                      channel_factory, args, n, importance_flip_rate * n, importance_below)))
+
+    def result_row(unit, unit_counts):
+        """
+        Returns the result tuple of a finished point.
+        """
+        return unit.key + (unit_counts.average_bit_errors, unit_counts.bit_error_rate,
+                           *unit_counts.confidence_interval(stopping.confidence, stopping.ci_method),
+                           unit_counts.bit_error_variance, unit_counts.samples,
+                           "importance" if unit.biased_channel_args is not None else "monte-carlo")
+
+    # Append each point to the CSV file as soon as it is finished
+    with open(csv_file, mode='a', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow(["BER", "n", "k", "Average Bit Errors"])
-        writer.writerows(results)
 
-    return results
+        def save_row(unit, unit_counts):
+            """
+            Appends the CSV row of a finished point.
+            """
+            with instrumentation.stage("csv"):
+                writer.writerow((word_size,) + result_row(unit, unit_counts))
+                file.flush()
+
+        print(f"Simulating {channel_name} channel: {len(units)} points")
+        counts = run_sweep(units, stopping=stopping, seed=seed, max_workers=max_workers, callback=save_row,
+                           store=store)
+
+    return [result_row(unit, unit_counts) for unit, unit_counts in zip(units, counts)]
 
 # LDPC parameters
 ldpc_params = [
@@ -127,72 +92,65 @@ word_sizes = [4, 5, 7, 11, 26, 39, 50, 57, 120]
 # BER range
 bers = np.logspace(-6, -2, 20)
 
+# BSC points below this BER see no errors in 100000 plain Monte Carlo samples; they are
+# importance-sampled instead, from a BSC flipping this fraction of the bits (where belief
+# propagation starts to fail)
+importance_below = 1e-4
+importance_flip_rate = 0.05
+
+# Eb/N0 range (dB) of the soft-decision AWGN channel
+ebn0s = np.arange(0.0, 10.5, 1.0)
+
 # Output directories
 output_dir_figures = "../figures"
 output_dir_csv = "../CSV"
 
-# Gilbert-Elliott channel parameters
-p, r, h, k = 0.01, 0.1, 0.001, 0.8
-
-# Create a plot grid with enough subplots for BSC channel
-fig_bsc, axes_bsc = plt.subplots(len(word_sizes), 1, figsize=(12, 5 * len(word_sizes)))
-axes_bsc = axes_bsc.flatten()  # Flatten axes for easier iteration
-
-# Create a plot grid with enough subplots for GE channel
-fig_ge, axes_ge = plt.subplots(len(word_sizes), 1, figsize=(12, 5 * len(word_sizes)))
-axes_ge = axes_ge.flatten()  # Flatten axes for easier iteration
-
-# Loop over the desired word sizes and run the simulation for each
-for i, word_size in enumerate(word_sizes):
-    print(f"Simulating for word size {word_size}")
-    input_bits = np.random.randint(0, 2, word_size).tolist()
-
-    # Simulate for BSC channel
-    results_bsc = simulate_and_save_results(bsc_channel, "BSC", ldpc_params, input_bits, bers, output_dir_figures, output_dir_csv, word_size)
-
-    # Simulate for Gilbert-Elliott channel
-    results_ge = simulate_and_save_results(gilbert_elliott_channel, "GE", ldpc_params, input_bits, bers, output_dir_figures, output_dir_csv, word_size, p, r, h, k)
-
-    # Get the current axis for plotting for BSC
-    ax_bsc = axes_bsc[i]
-    # Plot results for BSC
-    for n, k in ldpc_params:
-        errors_bsc = [r[3] for r in results_bsc if r[1] == n and r[2] == k]
-        ax_bsc.plot(bers, errors_bsc, label=f"LDPC (n={n}, k={k})", marker='o')
-
-    ax_bsc.set_xscale('log')
-    ax_bsc.set_xlabel("BER")
-    ax_bsc.set_ylabel("Average Bit Errors")
-    ax_bsc.set_title(f"BSC Channel - Word Size {word_size}")
-    ax_bsc.grid(True)
-    ax_bsc.legend(loc='upper left', bbox_to_anchor=(1.05, 1), ncol=1)  # Add legend for each plot
-
-    # Get the current axis for plotting for GE
-    ax_ge = axes_ge[i]
-    # Plot results for GE
-    for n, k in ldpc_params:
-        errors_ge = [r[3] for r in results_ge if r[1] == n and r[2] == k]
-        ax_ge.plot(bers, errors_ge, label=f"LDPC (n={n}, k={k})", marker='x')
-
-    ax_ge.set_xscale('log')
-    ax_ge.set_xlabel("BER")
-    ax_ge.set_ylabel("Average Bit Errors")
-    ax_ge.set_title(f"GE Channel - Word Size {word_size}")
-    ax_ge.grid(True)
-    ax_ge.legend(loc='upper left', bbox_to_anchor=(1.05, 1), ncol=1)  # Add legend for each plot
-
-# Adjust layout to prevent overlap for BSC and GE and add more space for the legend
-fig_bsc.tight_layout(pad=4.0)
-fig_ge.tight_layout(pad=4.0)
-
-# Increase figure width for better visibility of the legend
-fig_bsc.set_figwidth(15)
-fig_ge.set_figwidth(15)
-
-# Save the BSC and GE plots separately
-fig_bsc.savefig(f"{output_dir_figures}/bsc_performance_combined.png")
-fig_ge.savefig(f"{output_dir_figures}/ge_performance_combined.png")
-
-# Show both plots separately
-fig_bsc.show()
-fig_ge.show()
\ No newline at end of file
+# Gilbert-Elliott channel parameters (p, r, h, k)
+ge_params = (0.01, 0.1, 0.001, 0.8)
+
+# Stopping rule for each BER point: 100 frame errors, a +-10 % confidence interval or 100000 samples,
+# whichever comes first. Root seed of the sweep and number of worker processes
+stopping = StoppingRule(min_frame_errors=100, ci_width=0.2, max_trials=100000)
+seed = 0
+max_workers = None  # One worker per CPU
+
+# Every finished batch is checkpointed in this database; rerunning the script resumes the sweep
+results_db = f"{output_dir_csv}/LDPC_results.sqlite"
+store = None
+
+# Stage timers and counters (encode, channel, decode, chunking, CSV) of each run, one JSON line per run
+metrics_file = f"{output_dir_csv}/LDPC_metrics.jsonl"
+
+if __name__ == "__main__":
+    store = ResultStore(results_db)
+    instrumentation.enable()
+
+    # The CSV files are rebuilt on every run (points already in the store are not simulated again)
+    for channel_name in ("BSC", "GE", "AWGN"):
+        if os.path.exists(f"{output_dir_csv}/{channel_name}_results_combined.csv"):
+            os.remove(f"{output_dir_csv}/{channel_name}_results_combined.csv")
+
+    # Loop over the desired word sizes and run the simulation for each; the words are drawn from
+    # the seed so that a resumed run sends the same words
+    word_rng = np.random.default_rng(seed)
+    for word_size in word_sizes:
+        print(f"Simulating for word size {word_size}")
+        input_bits = word_rng.integers(0, 2, word_size).tolist()
+
+        # Simulate for BSC channel
+        simulate_and_save_results(BSCChannel, "BSC", ldpc_params, input_bits, bers, output_dir_csv, word_size)
+
+        # Simulate for Gilbert-Elliott channel
+        simulate_and_save_results(GilbertElliottChannel, "GE", ldpc_params, input_bits, bers, output_dir_csv, word_size, *ge_params)
+
+        # Simulate for the soft-decision AWGN channel over the Eb/N0 range
+        simulate_and_save_results(AWGNChannel, "AWGN", ldpc_params, input_bits, ebn0s, output_dir_csv, word_size, point_name="Eb/N0 (dB)")
+
+    # Draw the BER/FER panels of every channel and word size from the store (unchanged panels are
+    # kept); `python -m simulation.scripts.report` redraws them while a sweep is running
+    for path in render_report(store, output_dir_figures, stopping.confidence, stopping.ci_method):
+        print(f"Rendered {path}")
+    store.close()
+
+    with open(metrics_file, "a") as file:
+        file.write(instrumentation.disable().to_json_line(script="LDPC_errors") + "\n")
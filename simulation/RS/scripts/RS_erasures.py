@@ -0,0 +1,168 @@
+import csv
+import os
+
+import numpy as np
+
+from channels.GE_channel import GilbertElliottChannel, symbol_erasures
+from codes.ReedSolomon import ReedSolomon
+from simulation.scripts.sweep import ErrorCounts, StoppingRule
+
+
+def simulate_rs(nsym, trials, rng, use_erasures, guard_bits=0):
+    """
+    Sends RS(n_bytes, n_bytes - nsym) codewords through the Gilbert-Elliott channel and decodes them.
+
+    Parameters:
+    nsym (int): Number of parity bytes per codeword.
+    trials (int): Number of codewords.
+    rng (np.random.Generator): Generator for the messages and the channel.
+    use_erasures (bool): If True, the bytes overlapping a Bad-state burst are passed as erasures;
+        otherwise the decoder corrects errors only.
+    guard_bits (int): Number of bits around each burst also marked as erased.
+
+    Returns:
+    tuple: The ErrorCounts of the codewords and the number flagged as decoding failures.
+    """
+    rs = ReedSolomon(nsym, nsize=n_bytes)
+    messages = rng.integers(0, 256, (trials, rs.k), dtype=np.uint8)
+    encoded = rs.encode_batch(messages)
+
+    channel = GilbertElliottChannel(*ge_params, rng=rng)
+    received_bits, _, states = channel.transmit(np.unpackbits(encoded, axis=1), return_states=True)
+    received = np.packbits(received_bits, axis=1)
+
+    erasures = symbol_erasures(states, 8, guard_bits) if use_erasures else None
+    decoded, failed = rs.decode_batch(received, erasures=erasures, return_status=True)
+
+    bit_errors = np.unpackbits(np.asarray(decoded, dtype=np.uint8) ^ messages, axis=1)
+    counts = ErrorCounts(bit_errors=bit_errors.sum(), bits=bit_errors.size,
+                         frame_errors=bit_errors.any(axis=1).sum(), frames=trials, samples=trials)
+    return counts, int(np.count_nonzero(failed))
+
+
+def simulate_point(nsym, rng, use_erasures, guard_bits=0):
+    """
+    Simulates one parity size in growing batches until the stopping rule is met.
+
+    Parameters:
+    nsym (int): Number of parity bytes per codeword.
+    rng (np.random.Generator): Generator for the messages and the channel.
+    use_erasures (bool): If True, decode with the erasures of the GE state trace.
+    guard_bits (int): Number of bits around each burst also marked as erased.
+
+    Returns:
+    tuple: The merged ErrorCounts and the number of decoding failures.
+    """
+    counts, failures, batch = ErrorCounts(), 0, 0
+    while not stopping.is_met(counts) and (size := stopping.batch_size(batch, counts.samples)) > 0:
+        batch_counts, batch_failures = simulate_rs(nsym, size, rng, use_erasures, guard_bits)
+        counts, failures, batch = counts + batch_counts, failures + batch_failures, batch + 1
+    return counts, failures
+
+
+def plot_results(results, path):
+    """
+    Draws the frame error rate of both decoders against the code rate, with confidence bands.
+
+    matplotlib is imported here only and draws on an Agg canvas, so no display is needed.
+
+    Parameters:
+    results (list): Result rows, as built in `__main__`.
+    path (str): Output PNG path.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    axis = figure.subplots()
+    for method, marker in (("errors-only", 'o'), ("erasures", 's')):
+        rows = [row for row in results if row[0] == method]
+        rates = np.array([row[2] for row in rows])
+        # Points without frame errors only show their upper bound, in the band
+        line, = axis.plot(rates, [row[3] if row[3] > 0 else np.nan for row in rows], label=method, marker=marker)
+        axis.fill_between(rates, [row[4] for row in rows], [row[5] for row in rows], color=line.get_color(),
+                          alpha=0.2, linewidth=0)
+    axis.axhline(target_frame_error_rate, color='gray', linestyle='--', label="Target FER")
+    axis.set_yscale('log')
+    axis.set_ylim(bottom=min([row[3] for row in results if row[3] > 0] + [row[5] for row in results]) / 2)
+    axis.set_xlabel("Code rate k/n")
+    axis.set_ylabel("Frame Error Rate")
+    axis.set_title(f"RS({n_bytes}, k) on the GE channel {ge_params} ({stopping.confidence:.0%} bands)")
+    axis.grid(True)
+    axis.legend()
+    figure.savefig(path)
+
+
+def best_throughput(results, method):
+    """
+    Returns the result row with the highest effective throughput that meets the residual target.
+
+    A parity size only meets the target when the upper bound of its frame error rate's confidence
+    interval does, so that a lucky run with a few frame errors does not qualify.
+
+    Parameters:
+    results (list): Rows of (method, nsym, rate, frame error rate, CI lower, CI upper, failure rate,
+        throughput, trials).
+    method (str): Decoding method to select.
+
+    Returns:
+    tuple: The best row, or None if no parity size meets the target.
+    """
+    valid = [row for row in results if row[0] == method and row[5] <= target_frame_error_rate]
+    return max(valid, key=lambda row: row[7]) if valid else None
+
+
+# Codeword length in bytes and the parity sizes to compare
+n_bytes = 255
+nsym_values = [16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128]
+
+# Gilbert-Elliott channel parameters (p, r, h, k), as in the BCH and LDPC sweeps
+ge_params = (0.01, 0.1, 0.001, 0.8)
+
+# Codewords per point: 100 frame errors or 5000 codewords, whichever comes first. The exact
+# (Clopper-Pearson) interval suits the few frame errors of the best parity sizes
+stopping = StoppingRule(min_frame_errors=100, max_trials=5000, ci_method="clopper-pearson")
+
+# Residual frame error target and guard band of the erasure decoder
+target_frame_error_rate = 1e-2
+guard_bits = 0
+seed = 0
+
+# Output directories
+output_dir_figures = "../figures"
+output_dir_csv = "../CSV"
+
+if __name__ == "__main__":
+    results = []
+    for method_index, method in enumerate(("errors-only", "erasures")):
+        for nsym in nsym_values:
+            # Each point has its own stream, so points can be added or rerun on their own
+            rng = np.random.default_rng((seed, method_index, nsym))
+            counts, failures = simulate_point(nsym, rng, method == "erasures", guard_bits)
+            lower, upper = counts.frame_confidence_interval(stopping.confidence, stopping.ci_method)
+            rate = (n_bytes - nsym) / n_bytes
+            # Effective throughput: information rate of the frames that are delivered correctly
+            throughput = rate * (1.0 - counts.frame_error_rate)
+            results.append((method, nsym, rate, counts.frame_error_rate, lower, upper, failures / counts.frames,
+                            throughput, counts.frames))
+            print(f"{method:12s} nsym={nsym:3d} rate={rate:.3f} FER={counts.frame_error_rate:.4f} "
+                  f"[{lower:.4f}, {upper:.4f}] ({counts.frame_errors}/{counts.frames}) throughput={throughput:.3f}")
+
+    for method in ("errors-only", "erasures"):
+        best = best_throughput(results, method)
+        if best is None:
+            print(f"{method}: no parity size reaches FER <= {target_frame_error_rate} (CI upper bound)")
+        else:
+            print(f"{method}: best throughput {best[7]:.3f} with nsym={best[1]} "
+                  f"(FER {best[3]:.4f}, CI upper bound {best[5]:.4f}, {best[8]} frames)")
+
+    os.makedirs(output_dir_csv, exist_ok=True)
+    with open(f"{output_dir_csv}/RS_GE_erasures.csv", mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Method", "nsym", "Rate", "Frame Error Rate", "CI Lower", "CI Upper", "Failure Rate",
+                         "Throughput", "Trials"])
+        writer.writerows(results)
+
+    os.makedirs(output_dir_figures, exist_ok=True)
+    plot_results(results, f"{output_dir_figures}/rs_ge_erasures.png")
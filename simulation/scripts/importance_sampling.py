@@ -0,0 +1,145 @@
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from channels.GE_channel import GilbertElliottChannel
+from simulation.scripts.sweep import decode_frames, encode_frames
+
+
+class ImportanceSamplingEstimate:
+    """
+    Frame and bit error rates estimated by importance sampling, with the variance of each estimate.
+
+    Attributes:
+        frame_error_rate (float): Estimated probability that a decoded frame is wrong.
+        frame_error_variance (float): Variance of the frame error rate estimate.
+        bit_error_rate (float): Estimated probability that a decoded information bit is wrong.
+        bit_error_variance (float): Variance of the bit error rate estimate.
+        trials (int): Number of simulated frames.
+        observed_frame_errors (int): Number of wrongly decoded frames seen under the biased channel.
+    """
+
+    def __init__(self, frame_error_rate, frame_error_variance, bit_error_rate, bit_error_variance, trials,
+                 observed_frame_errors):
+        self.frame_error_rate = frame_error_rate
+        self.frame_error_variance = frame_error_variance
+        self.bit_error_rate = bit_error_rate
+        self.bit_error_variance = bit_error_variance
+        self.trials = trials
+        self.observed_frame_errors = observed_frame_errors
+
+    def __repr__(self):
+        return (f"ImportanceSamplingEstimate(frame_error_rate={self.frame_error_rate:.3e} "
+                f"+- {np.sqrt(self.frame_error_variance):.1e}, bit_error_rate={self.bit_error_rate:.3e} "
+                f"+- {np.sqrt(self.bit_error_variance):.1e}, trials={self.trials})")
+
+    @property
+    def frame_error_relative_error(self):
+        """float: Standard deviation of the frame error rate estimate divided by the estimate."""
+        return np.sqrt(self.frame_error_variance) / self.frame_error_rate if self.frame_error_rate else np.inf
+
+
+def biased_flip_probability(p, n, target_errors):
+    """
+    Suggests a simulation flip probability that puts the decoder near its failure threshold.
+
+    Drawing about `target_errors` flips per frame (e.g. t + 1 for a t-error-correcting code) makes
+    decoding failures common while keeping the likelihood ratios well behaved.
+
+    Args:
+        p (float): True flip probability.
+        n (int): Frame length.
+        target_errors (float): Desired mean number of flips per frame.
+
+    Returns:
+        float: The biased flip probability (never below `p`).
+    """
+    return min(0.5, max(p, target_errors / n))
+
+
+def importance_channel_args(channel_factory, channel_args, n, target_errors, below):
+    """
+    Returns the biased channel arguments of a sweep point estimated by importance sampling.
+
+    Only BSC points whose BER is below `below` are importance-sampled; the flip probability is
+    raised with `biased_flip_probability`. The result is passed as `WorkUnit.biased_channel_args`.
+
+    Args:
+        channel_factory (callable): Channel class of the point.
+        channel_args (tuple): Arguments of the point's channel.
+        n (int): Frame length.
+        target_errors (float): Desired mean number of flips per frame, e.g. t + 1.
+        below (float): BER under which importance sampling is used.
+
+    Returns:
+        tuple: The biased channel arguments, or None for plain Monte Carlo.
+    """
+    if channel_factory is not BSCChannel or channel_args[0] >= below:
+        return None
+    return (biased_flip_probability(channel_args[0], n, target_errors),)
+
+
+def estimate_error_rates(code, channel, biased_channel, trials, batch_size=10000, rng=None):
+    """
+    Estimates the frame and bit error rates of a code over a channel by importance sampling.
+
+    Frames are transmitted through `biased_channel` (a BSC with a larger flip probability, or a
+    Gilbert-Elliott channel with larger error and/or transition probabilities) and every outcome is
+    re-weighted by the likelihood ratio between `channel` and `biased_channel`, which keeps the
+    estimators unbiased for the true channel.
+
+    Args:
+        code: Code object with `k` and `encode`/`decode` (batched variants are used when present).
+        channel (BSCChannel or GilbertElliottChannel): The channel whose error rates are estimated.
+        biased_channel (BSCChannel or GilbertElliottChannel): Channel of the same type used to draw
+            the errors; its generator drives the simulation.
+        trials (int): Number of frames to simulate.
+        batch_size (int): Number of frames simulated per batch.
+        rng (np.random.Generator or int, optional): Generator for the random messages.
+
+    Returns:
+        ImportanceSamplingEstimate: The estimates and their variances.
+    """
+    if type(channel) is not type(biased_channel):
+        raise TypeError("The biased channel must be of the same type as the channel")
+
+    rng = np.random.default_rng(rng)
+    is_ge = isinstance(channel, GilbertElliottChannel)
+    k = code.k
+
+    # Running sums of the weighted frame-error indicators and bit-error fractions and their squares
+    sums = np.zeros(4)
+    observed_frame_errors = 0
+    done = 0
+    while done < trials:
+        size = min(batch_size, trials - done)
+        messages = rng.integers(0, 2, (size, k), dtype=np.uint8)
+        encoded = encode_frames(code, messages)
+
+        if is_ge:
+            received, _, states = biased_channel.transmit(encoded, return_states=True)
+            errors = received != encoded
+            log_weights = channel.log_likelihood(errors, states) - biased_channel.log_likelihood(errors, states)
+        else:
+            received, _ = biased_channel.transmit(encoded)
+            errors = received != encoded
+            log_weights = channel.log_likelihood(errors) - biased_channel.log_likelihood(errors)
+
+        decoded = decode_frames(code, received, k)
+        bit_errors = (decoded != messages).sum(axis=1)
+        weights = np.exp(log_weights)
+
+        weighted_frames = weights * (bit_errors > 0)
+        weighted_bits = weights * bit_errors / k
+        sums += [weighted_frames.sum(), (weighted_frames ** 2).sum(), weighted_bits.sum(), (weighted_bits ** 2).sum()]
+        observed_frame_errors += int((bit_errors > 0).sum())
+        done += size
+
+    frame_error_rate = sums[0] / trials
+    bit_error_rate = sums[2] / trials
+    # Variance of the sample mean: (E[x^2] - E[x]^2) / (N - 1)
+    denominator = max(trials - 1, 1)
+    frame_error_variance = max(sums[1] / trials - frame_error_rate ** 2, 0.0) / denominator
+    bit_error_variance = max(sums[3] / trials - bit_error_rate ** 2, 0.0) / denominator
+
+    return ImportanceSamplingEstimate(frame_error_rate, frame_error_variance, bit_error_rate, bit_error_variance,
+                                      trials, observed_frame_errors)
@@ -0,0 +1,219 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from simulation.scripts.result_store import ResultStore
+
+# Name of the file, in the output directory, recording the data digest of every rendered panel
+MANIFEST = "manifest.json"
+
+# Label of the swept value by channel class; the other channels sweep a crossover probability
+X_LABELS = {"AWGNChannel": "Eb/N0 (dB)"}
+
+# Bumped when the rendering changes, so that every panel is drawn again
+RENDER_VERSION = 1
+
+
+def curve_label(code, code_params):
+    """
+    Returns the legend label of a code, e.g. "bch:63,39" (registry specs) or "BCHCode(63, 39, 4)".
+    """
+    if code == "get_codec":
+        return code_params[0]
+    return f"{code}({', '.join(map(str, code_params))})"
+
+
+def panel_data(results):
+    """
+    Groups the stored points into panels and curves.
+
+    A panel holds the points of one channel, word size and interleaver; within it, a curve holds
+    the points of one code, seed and set of fixed channel parameters (e.g. those of the GE channel),
+    ordered by swept value. The swept value is the first element of the work unit's key; points
+    whose key does not start with a number (e.g. the interleaver depth sweep) are not plotted.
+
+    Args:
+        results (list[tuple]): Rows of `ResultStore.results`.
+
+    Returns:
+        dict: {(channel, word_size, interleaver): {label: [(x, ErrorCounts), ...]}}.
+    """
+    panels = {}
+    for code, code_params, channel, channel_params, interleaver, point, word_size, seed, counts in results:
+        x = point[0] if isinstance(point, list) and point else point
+        if isinstance(x, bool) or not isinstance(x, (int, float)):
+            continue
+        # Parameters other than the swept value (and the AWGN code rate) tell curves apart
+        fixed = channel_params[1:] if channel_params and channel_params[0] == x else channel_params
+        label = curve_label(code, code_params)
+        if fixed and channel not in X_LABELS:
+            label += f" {list(fixed)}"
+        curves = panels.setdefault((channel, word_size, interleaver), {})
+        curves.setdefault((label, seed), []).append((x, counts))
+
+    # Seeds only appear in the labels of panels simulated with several of them
+    for key, curves in panels.items():
+        seeds = {seed for _, seed in curves}
+        panels[key] = {(f"{label} seed={seed}" if len(seeds) > 1 else label): sorted(points, key=lambda p: p[0])
+                       for (label, seed), points in sorted(curves.items(), key=lambda item: str(item[0]))}
+    return panels
+
+
+def panel_name(channel, word_size, interleaver):
+    """
+    Returns the PNG file name of a panel, e.g. "bsc_word39.png".
+    """
+    name = f"{channel.removesuffix('Channel').lower()}_word{word_size}"
+    if interleaver:
+        name += "_" + hashlib.sha1(interleaver.encode()).hexdigest()[:8]
+    return name + ".png"
+
+
+def panel_digest(curves, confidence, method):
+    """
+    Returns a hash of everything drawn in a panel: the counts of every curve and the interval settings.
+    """
+    data = {label: [[x, c.bit_errors, c.bits, c.frame_errors, c.frames, c.bit_error_squares, c.frame_error_squares]
+                    for x, c in points]
+            for label, points in curves.items()}
+    payload = json.dumps([RENDER_VERSION, confidence, method, data], sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_panel(path, title, x_label, curves, confidence=0.95, method="wilson"):
+    """
+    Draws the BER and FER curves of a panel, with their confidence bands, into a PNG file.
+
+    The figure is drawn on an Agg canvas without pyplot, so no window or display is needed and the
+    pyplot global state of the calling process is left alone. matplotlib is imported here only.
+
+    Parameters:
+    path (str): Output PNG path.
+    title (str): Title of the panel.
+    x_label (str): Label of the swept value.
+    curves (dict): {label: [(x, ErrorCounts), ...]}, as built by `panel_data`.
+    confidence (float): Confidence level of the bands.
+    method (str): "wilson" or "clopper-pearson".
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(15, 5))
+    FigureCanvasAgg(figure)
+    ber_axis, fer_axis = figure.subplots(1, 2)
+
+    xs_all = [x for points in curves.values() for x, _ in points]
+    log_x = min(xs_all) > 0 and max(xs_all) >= 100 * min(xs_all)
+    lowest = {ber_axis: [], fer_axis: []}  # Positive rates and upper bounds, to set the y range
+    for label, points in curves.items():
+        xs = np.array([x for x, _ in points], dtype=float)
+        for axis, rate, interval in ((ber_axis, "bit_error_rate", "confidence_interval"),
+                                     (fer_axis, "frame_error_rate", "frame_confidence_interval")):
+            # Importance-sampled points have weighted counts; their bands come from the estimated variance
+            rates = np.array([getattr(c, rate) if c.frames else np.nan for _, c in points])
+            bands = np.array([getattr(c, interval)(confidence, method) for _, c in points])
+            # Zero rates have no place on a log axis; their upper bound still shows in the band
+            line, = axis.plot(xs, np.where(rates > 0, rates, np.nan), marker="o", label=label)
+            axis.fill_between(xs, bands[:, 0], bands[:, 1], color=line.get_color(), alpha=0.2, linewidth=0)
+            lowest[axis].extend(value for value in np.concatenate([rates, bands[:, 1]]) if value > 0)
+
+    for axis, y_label in ((ber_axis, "Bit Error Rate"), (fer_axis, "Frame Error Rate")):
+        axis.set_yscale("log")
+        if lowest[axis]:
+            # The lower bound of points without errors is ~0 and would stretch the axis by decades
+            axis.set_ylim(bottom=min(lowest[axis]) / 2)
+        if log_x:
+            axis.set_xscale("log")
+        axis.set_xlabel(x_label)
+        axis.set_ylabel(y_label)
+        axis.grid(True, which="both", alpha=0.3)
+    ber_axis.set_title(f"{title} - BER")
+    fer_axis.set_title(f"{title} - FER ({confidence:.0%} bands)")
+    fer_axis.legend(loc="upper left", bbox_to_anchor=(1.02, 1), fontsize="small")
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def render_report(store, output_dir, confidence=0.95, method="wilson", force=False):
+    """
+    Renders one PNG panel per channel, word size and interleaver of a result store.
+
+    Only the panels whose data changed since the last call (or whose file is missing) are drawn:
+    the digest of each panel's data is kept in the output directory's manifest. The report can
+    therefore be rerun cheaply while a sweep is still filling the store.
+
+    Parameters:
+    store (ResultStore or str): The result store, or the path of its database.
+    output_dir (str): Directory of the PNG files and the manifest.
+    confidence (float): Confidence level of the bands.
+    method (str): "wilson" or "clopper-pearson".
+    force (bool): If True, draw every panel.
+
+    Returns:
+    list[str]: Paths of the panels drawn by this call.
+    """
+    if isinstance(store, str):
+        with ResultStore(store) as opened:
+            return render_report(opened, output_dir, confidence, method, force)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    rendered = []
+    for (channel, word_size, interleaver), curves in panel_data(store.results()).items():
+        name = panel_name(channel, word_size, interleaver)
+        path = os.path.join(output_dir, name)
+        digest = panel_digest(curves, confidence, method)
+        if manifest.get(name) == digest and os.path.exists(path):
+            continue
+        title = f"{channel.removesuffix('Channel')} - Word Size {word_size}"
+        if interleaver:
+            title += f" - {interleaver.partition('{')[0]}"
+        render_panel(path, title, X_LABELS.get(channel, "BER"), curves, confidence, method)
+        manifest[name] = digest
+        rendered.append(path)
+
+        # Saved after every panel, so an interrupted report does not redraw the finished ones
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+    return rendered
+
+
+def main(argv=None):
+    """
+    Command-line entry point: renders the panels of a result store, once or periodically.
+
+    Parameters:
+    argv (list[str], optional): Arguments; defaults to the command line.
+    """
+    parser = argparse.ArgumentParser(description="Renders BER/FER panels from a sweep result store.")
+    parser.add_argument("store", help="SQLite result store written by the sweeps")
+    parser.add_argument("-o", "--output-dir", default="figures", help="directory of the PNG panels")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level of the bands")
+    parser.add_argument("--ci-method", default="wilson", choices=["wilson", "clopper-pearson"])
+    parser.add_argument("--force", action="store_true", help="redraw every panel")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="keep redrawing the changed panels at this interval (while a sweep runs)")
+    args = parser.parse_args(argv)
+
+    force = args.force
+    while True:
+        for path in render_report(args.store, args.output_dir, args.confidence, args.ci_method, force):
+            print(f"Rendered {path}", file=sys.stderr)
+        if not args.watch:
+            break
+        force = False
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import json
+import sqlite3
+
+from simulation.scripts.sweep import ErrorCounts, point_identity, stream_key
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    code_params TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    channel_params TEXT NOT NULL,
+    interleaver TEXT NOT NULL,
+    biased_channel_params TEXT NOT NULL,
+    point TEXT NOT NULL,
+    word_size INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    stream TEXT NOT NULL,
+    UNIQUE (code, code_params, channel, channel_params, interleaver, biased_channel_params, point, word, seed)
+);
+CREATE TABLE IF NOT EXISTS batches (
+    point_id INTEGER NOT NULL REFERENCES points (id),
+    batch INTEGER NOT NULL,
+    bit_errors REAL NOT NULL,  -- Weighted sums (not integers) for importance-sampled points
+    bits INTEGER NOT NULL,
+    frame_errors REAL NOT NULL,
+    frames INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    bit_error_squares REAL,  -- NULL for plain Monte Carlo points
+    frame_error_squares REAL,
+    recorded TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (point_id, batch)
+);
+"""
+
+
+class ResultStore:
+    """
+    Append-only SQLite store of the counts of a sweep, so an interrupted sweep can be resumed.
+
+    A point is identified by its code and parameters, channel and parameters, interleaver, biased
+    channel parameters (importance sampling), swept value (the work unit's key), transmitted word
+    and root seed; its random stream (`stream_key`) is recorded with it. Each simulated batch is
+    appended as one row as soon as it finishes; the counts of a point are the sum of its rows. `run_sweep`
+    reloads them on restart and continues each point from its next batch, with the same batch seeds
+    as an uninterrupted run, so points already meeting their stopping rule are not simulated again.
+
+    Attributes:
+        path (str): Path of the database file (":memory:" for a temporary store).
+        connection (sqlite3.Connection): Open connection to the database.
+    """
+
+    def __init__(self, path):
+        """
+        Opens (and creates if needed) the database.
+
+        Args:
+            path (str): Path of the database file.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")  # Readers do not block the running sweep
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(points)")}
+        if not {"biased_channel_params", "stream"} <= columns:
+            self.connection.close()
+            raise ValueError(f"{path} was written by an older version of the result store; use a new file")
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def point_id(self, unit, seed):
+        """
+        Returns the id of a work unit's point, registering the point on first use.
+
+        The random stream of the point is recorded with it. A stored point whose stream differs from
+        the one the unit draws now (the stream derivation changed) is refused, since its stored
+        batches could neither be continued nor replayed.
+
+        Args:
+            unit (WorkUnit): The work unit.
+            seed (int): Root seed of the sweep.
+
+        Returns:
+            int: The point id.
+        """
+        identity = point_identity(unit)
+        key = identity[:7] + (len(unit.input_bits), identity[7], int(seed))
+        stream = json.dumps(list(stream_key(unit)))
+        self.connection.execute(
+            "INSERT OR IGNORE INTO points (code, code_params, channel, channel_params, interleaver, "
+            "biased_channel_params, point, word_size, word, seed, stream) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            key + (stream,))
+        self.connection.commit()
+        point_id, stored_stream = self.connection.execute(
+            "SELECT id, stream FROM points WHERE code = ? AND code_params = ? AND channel = ? AND channel_params = ? "
+            "AND interleaver = ? AND biased_channel_params = ? AND point = ? AND word = ? AND seed = ?",
+            key[:7] + key[8:]).fetchone()
+        if stored_stream != stream:
+            raise ValueError(f"Point {identity[6]} of {self.path} was simulated from another random stream "
+                             f"({stored_stream}, now {stream}) and cannot be resumed; use a new store")
+        return point_id
+
+    def load(self, point_id):
+        """
+        Returns the counts recorded for a point and the number of batches they cover.
+
+        Returns:
+            tuple: The merged ErrorCounts and the number of batches.
+        """
+        row = self.connection.execute(
+            "SELECT COALESCE(SUM(bit_errors), 0), COALESCE(SUM(bits), 0), COALESCE(SUM(frame_errors), 0), "
+            "COALESCE(SUM(frames), 0), COALESCE(SUM(samples), 0), SUM(bit_error_squares), "
+            "SUM(frame_error_squares), COUNT(*) FROM batches WHERE point_id = ?", (point_id,)).fetchone()
+        return ErrorCounts(*row[:7]), row[7]
+
+    def add_batch(self, point_id, batch, counts):
+        """
+        Appends (and commits) the counts of one finished batch.
+
+        Args:
+            point_id (int): Id of the point.
+            batch (int): Index of the batch within the point.
+            counts (ErrorCounts): Counts of the batch.
+        """
+        self.connection.execute(
+            "INSERT INTO batches (point_id, batch, bit_errors, bits, frame_errors, frames, samples, "
+            "bit_error_squares, frame_error_squares) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (point_id, batch, counts.bit_errors, counts.bits, counts.frame_errors, counts.frames, counts.samples,
+             counts.bit_error_squares, counts.frame_error_squares))
+        self.connection.commit()
+
+    def results(self):
+        """
+        Returns the merged counts of every stored point.
+
+        Returns:
+            list[tuple]: One (code, code_params, channel, channel_params, interleaver, point, word_size,
+            seed, ErrorCounts) tuple per point, with the parameters decoded from JSON.
+        """
+        rows = self.connection.execute(
+            "SELECT code, code_params, channel, channel_params, interleaver, point, word_size, seed, "
+            "COALESCE(SUM(bit_errors), 0), COALESCE(SUM(bits), 0), COALESCE(SUM(frame_errors), 0), "
+            "COALESCE(SUM(frames), 0), COALESCE(SUM(samples), 0), SUM(bit_error_squares), SUM(frame_error_squares) "
+            "FROM points LEFT JOIN batches ON batches.point_id = points.id GROUP BY points.id ORDER BY points.id")
+        return [(code, tuple(json.loads(code_params)), channel, tuple(json.loads(channel_params)), interleaver,
+                 json.loads(point), word_size, seed, ErrorCounts(*counts))
+                for code, code_params, channel, channel_params, interleaver, point, word_size, seed, *counts in rows]
@@ -0,0 +1,432 @@
+import argparse
+import csv
+import importlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from codes import instrumentation
+from codes.registry import codec_spec, get_codec
+from simulation.scripts.sweep import StoppingRule, WorkUnit, point_channel_args, run_sweep
+
+# Channels and interleavers by config name, as "module:attribute". Like the codes of the registry,
+# they are imported only when a config uses them, so a Hamming run never loads galois (BCH) or
+# scipy (LDPC)
+CHANNELS = {
+    "bsc": "channels.BSC_channel:BSCChannel",
+    "ge": "channels.GE_channel:GilbertElliottChannel",
+    "awgn": "channels.AWGN_channel:AWGNChannel",
+}
+INTERLEAVERS = {
+    "block": "codes.interleaver:BlockInterleaver",
+    "random": "codes.interleaver:RandomInterleaver",
+    "convolutional": "codes.interleaver:ConvolutionalInterleaver",
+}
+MODES = ("sweep", "stream")
+PROFILERS = ("cprofile", "pyinstrument")
+METRICS_FORMATS = ("jsonl", "prometheus")
+
+# Number of functions listed by the cProfile summary printed to standard error
+PROFILE_LINES = 30
+
+CSV_HEADER = ["Code", "Channel", "Point", "Word Size", "Average Bit Errors", "Bit Error Rate",
+              "CI Lower", "CI Upper", "BER Variance", "Frame Error Rate", "Frames", "Trials", "Estimator"]
+
+
+def load_object(table, name, kind):
+    """
+    Imports the object registered under `name` in one of the tables above.
+
+    Args:
+        table (dict): CHANNELS or INTERLEAVERS.
+        name (str): Config name of the object.
+        kind (str): What the table holds, for the error message.
+
+    Returns:
+        The imported class.
+    """
+    if name not in table:
+        raise ValueError(f"Unknown {kind} '{name}', expected one of {sorted(table)}")
+    module, attribute = table[name].split(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def load_config(path):
+    """
+    Reads a run configuration from a JSON, TOML or YAML file (chosen by the extension).
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        dict: The configuration.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path) as file:
+            return json.load(file)
+    if extension == ".toml":
+        import tomllib
+
+        with open(path, "rb") as file:
+            return tomllib.load(file)
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"Reading {path} requires PyYAML (pip install pyyaml); use JSON or TOML instead")
+        with open(path) as file:
+            return yaml.safe_load(file)
+    raise ValueError(f"Unsupported config format '{extension}', expected .json, .toml, .yaml or .yml")
+
+
+def grid_points(grid):
+    """
+    Expands the swept values of a config.
+
+    Args:
+        grid (dict or list): A list of values, or a dict with one of "values", "logspace"
+            ([start exponent, stop exponent, count]), "linspace" ([start, stop, count]) or
+            "arange" ([start, stop, step]).
+
+    Returns:
+        list[float]: The points, in order.
+    """
+    if isinstance(grid, (list, tuple)):
+        return [float(value) for value in grid]
+    if "values" in grid:
+        return [float(value) for value in grid["values"]]
+    if "logspace" in grid:
+        start, stop, count = grid["logspace"]
+        return np.logspace(start, stop, int(count)).tolist()
+    if "linspace" in grid:
+        start, stop, count = grid["linspace"]
+        return np.linspace(start, stop, int(count)).tolist()
+    if "arange" in grid:
+        return np.arange(*grid["arange"]).tolist()
+    raise ValueError(f"A grid needs 'values', 'logspace', 'linspace' or 'arange', got {sorted(grid)}")
+
+
+def code_specs(config):
+    """
+    Returns the codec specs of a config.
+
+    The codes are either listed as specs ("codes": ["bch:63,39", "bch:127,113"]) or given as a
+    "code" section with a "type" and "params", holding one parameter set (e.g. [63, 39]) or a list
+    of them (e.g. [[63, 39], [127, 113]]).
+    """
+    if "codes" in config:
+        return list(config["codes"])
+    params = config["code"].get("params", [])
+    if params and not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return [codec_spec(config["code"]["type"], *args) for args in params]
+
+
+def build_interleaver(config, n):
+    """
+    Returns the interleaver described by the config for codewords of n bits, or None.
+    """
+    section = config.get("interleaver")
+    if not section:
+        return None
+    options = {key: value for key, value in section.items() if key not in ("type", "depth")}
+    return load_object(INTERLEAVERS, section["type"], "interleaver")(section["depth"], n, **options)
+
+
+def build_units(config):
+    """
+    Builds the work units of a sweep config: every code, grid point and word size.
+
+    Each unit carries its identifying key (grid point, codec spec, word size); the swept value
+    comes first, as the report expects. The transmitted words are drawn from the config's seed, so a config always simulates the same words.
+
+    With an "importance_sampling" section, BSC points below its "below" BER are estimated by
+    importance sampling, drawing about "target_errors" flips per frame (t + 1 by default, 2 for
+    codes without a t).
+
+    Args:
+        config (dict): The run configuration.
+
+    Returns:
+        list[WorkUnit]: The units, in the order of the CSV rows.
+    """
+    channel_factory = load_object(CHANNELS, config["channel"]["type"], "channel")
+    channel_args = tuple(config["channel"].get("params", ()))
+    points = grid_points(config.get("grid", {"values": [0.0]}))
+    rng = np.random.default_rng(config.get("seed", 0))
+    words = {size: rng.integers(0, 2, size, dtype=np.uint8) for size in config.get("word_sizes", [])}
+    sampling = config.get("importance_sampling")
+    if sampling:
+        from simulation.scripts.importance_sampling import importance_channel_args
+
+    units = []
+    for spec in code_specs(config):
+        # The code length is only needed for the channel arguments (AWGN), the interleaver and the
+        # importance sampling bias
+        code = get_codec(spec)
+        interleaver = build_interleaver(config, code.n)
+        for word_size, input_bits in (words or {code.k: rng.integers(0, 2, code.k, dtype=np.uint8)}).items():
+            for point in points:
+                args = point_channel_args(channel_factory, point, code.n, code.k, channel_args)
+                biased = None
+                if sampling:
+                    biased = importance_channel_args(channel_factory, args, code.n,
+                                                     sampling.get("target_errors", getattr(code, "t", 1) + 1),
+                                                     sampling["below"])
+                units.append(WorkUnit(get_codec, (spec,), channel_factory, args, input_bits,
+                                      key=(point, spec, word_size), interleaver=interleaver,
+                                      biased_channel_args=biased))
+    return units
+
+
+def run_config(config, output=None, seed=None, max_workers=None, max_trials=None, store=None, verbose=True):
+    """
+    Runs one configuration from start to finish without any user interaction.
+
+    Sweep configs write one CSV row per finished unit to the output path; with a result store
+    (the config's "store" path) every batch is checkpointed and a rerun resumes the sweep. Stream
+    configs send the input file (or standard input) through the code and channel into the output file.
+
+    Args:
+        config (dict): The run configuration.
+        output (str, optional): Output path, overriding the config's "output".
+        seed (int, optional): Seed overriding the config's "seed".
+        max_workers (int, optional): Number of worker processes, overriding the config's "workers".
+        max_trials (int, optional): Trial budget per point, overriding the config's stopping rule.
+        store (str, optional): Path of the result store, overriding the config's "store".
+        verbose (bool): If True, print progress to standard error.
+
+    Returns:
+        list[ErrorCounts]: The counts of each unit (a single element for stream configs).
+    """
+    config = dict(config)
+    if seed is not None:
+        config["seed"] = seed
+    mode = config.get("mode", "sweep")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {MODES}")
+    if mode == "stream":
+        return [run_stream(config, output, verbose)]
+
+    stopping = StoppingRule(**config.get("stopping", {}))
+    if max_trials is not None:
+        stopping.max_trials = max_trials
+    output = output or config.get("output")
+    store = store or config.get("store")
+    units = build_units(config)
+
+    writer = None
+    if output:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        file = open(output, mode='w', newline='')
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER)
+
+    def record(unit, counts):
+        """
+        Writes the row of a finished unit as soon as it is known.
+        """
+        point, spec, word_size = unit.key
+        if verbose:
+            print(f"{spec} point={point:.3g} word={word_size}: BER={counts.bit_error_rate:.3e} "
+                  f"FER={counts.frame_error_rate:.3e} ({counts.samples} trials)", file=sys.stderr)
+        if writer is not None:
+            with instrumentation.stage("csv"):
+                lower, upper = counts.confidence_interval(stopping.confidence, stopping.ci_method)
+                writer.writerow([spec, config["channel"]["type"], point, word_size,
+                                 counts.average_bit_errors, counts.bit_error_rate, lower, upper,
+                                 counts.bit_error_variance, counts.frame_error_rate, counts.frames, counts.samples,
+                                 "importance" if unit.biased_channel_args is not None else "monte-carlo"])
+                file.flush()
+
+    result_store = None
+    if store:
+        from simulation.scripts.result_store import ResultStore
+
+        os.makedirs(os.path.dirname(store) or ".", exist_ok=True)
+        result_store = ResultStore(store)
+
+    try:
+        return run_sweep(units, stopping, seed=config.get("seed", 0),
+                         max_workers=max_workers or config.get("workers"), callback=record, store=result_store)
+    finally:
+        if writer is not None:
+            file.close()
+        if result_store is not None:
+            result_store.close()
+
+
+def run_stream(config, output=None, verbose=True):
+    """
+    Streams the config's "input" (a path or "-" for standard input) through its code and channel.
+
+    Returns:
+        ErrorCounts: Bit and frame errors of the reconstructed stream.
+    """
+    from simulation.scripts.stream import BATCH_FRAMES, BLOCK_SIZE, StreamPipeline
+
+    specs = code_specs(config)
+    if len(specs) != 1:
+        raise ValueError(f"A stream config needs exactly one code, got {len(specs)}")
+    code = get_codec(specs[0])
+    channel = load_object(CHANNELS, config["channel"]["type"], "channel")(*config["channel"].get("params", ()),
+                                                                          rng=config.get("seed", 0))
+    pipeline = StreamPipeline(code, channel, build_interleaver(config, code.n),
+                              block_size=config.get("block_size", BLOCK_SIZE),
+                              batch_frames=config.get("batch_frames", BATCH_FRAMES))
+    counts = pipeline.run(config.get("input", "-"), output or config.get("output", "-"))
+    if verbose:
+        print(f"Stream: {counts.bits} bits, BER={counts.bit_error_rate:.3e} FER={counts.frame_error_rate:.3e}",
+              file=sys.stderr)
+    return counts
+
+
+def profile_point(config, index, profiler="cprofile", output=None, seed=None, max_trials=None):
+    """
+    Simulates a single point of a sweep config under a profiler, in this process.
+
+    The codes are built before profiling starts, so the profile only covers the simulation of the
+    point (encoding, channel, decoding and bookkeeping), with the config's stopping rule.
+
+    Args:
+        config (dict): The sweep configuration.
+        index (int): Index of the point, in the order of `build_units` (and of the CSV rows).
+        profiler (str): "cprofile" or "pyinstrument" (which must be installed).
+        output (str, optional): File receiving the profile: cProfile statistics (for pstats or
+            snakeviz), or a pyinstrument report (HTML if the path ends in .html, text otherwise). A
+            summary is printed to standard error when omitted.
+        seed (int, optional): Seed overriding the config's "seed".
+        max_trials (int, optional): Trial budget of the point, overriding the config's stopping rule.
+
+    Returns:
+        ErrorCounts: The counts of the point.
+    """
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}', expected one of {PROFILERS}")
+    if config.get("mode", "sweep") != "sweep":
+        raise ValueError("Only the points of sweep configs can be profiled")
+    stopping = StoppingRule(**config.get("stopping", {}))
+    if max_trials is not None:
+        stopping.max_trials = max_trials
+    units = build_units(config)
+    if not 0 <= index < len(units):
+        raise ValueError(f"Point {index} out of range, the config has {len(units)} points")
+    seed = config.get("seed", 0) if seed is None else seed
+
+    if profiler == "cprofile":
+        import cProfile
+        import pstats
+
+        with cProfile.Profile() as profile:
+            counts = run_sweep([units[index]], stopping, seed=seed, max_workers=1)[0]
+        if output:
+            profile.dump_stats(output)
+        else:
+            pstats.Stats(profile, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        return counts
+
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        raise ValueError("Profiling with pyinstrument requires it (pip install pyinstrument); use cprofile instead")
+    profile = Profiler()
+    profile.start()
+    try:
+        counts = run_sweep([units[index]], stopping, seed=seed, max_workers=1)[0]
+    finally:
+        profile.stop()
+    if output:
+        with open(output, "w") as file:
+            file.write(profile.output_html() if output.endswith(".html") else profile.output_text())
+    else:
+        print(profile.output_text(), file=sys.stderr)
+    return counts
+
+
+def write_metrics(metrics, path, metrics_format="jsonl", **labels):
+    """
+    Saves the stage timers and counters of a run.
+
+    Args:
+        metrics (Metrics): The collected metrics.
+        path (str): Output file. JSON lines are appended to it, a Prometheus dump replaces it.
+        metrics_format (str): "jsonl" (one JSON object per run) or "prometheus" (text exposition
+            format, e.g. for the node exporter's textfile collector).
+        **labels: Labels of the run, e.g. its configs.
+    """
+    if metrics_format not in METRICS_FORMATS:
+        raise ValueError(f"Unknown metrics format '{metrics_format}', expected one of {METRICS_FORMATS}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if metrics_format == "jsonl":
+        with open(path, "a") as file:
+            file.write(metrics.to_json_line(**labels) + "\n")
+    else:
+        with open(path, "w") as file:
+            file.write(metrics.to_prometheus())
+
+
+def build_parser():
+    """
+    Returns the argument parser of the runner.
+    """
+    parser = argparse.ArgumentParser(
+        description="Runs FEC simulations from JSON, TOML or YAML configs, one after another.")
+    parser.add_argument("configs", nargs="+", help="config files, run in the given order")
+    parser.add_argument("-o", "--output", help="output path (only with a single config)")
+    parser.add_argument("--seed", type=int, help="seed overriding the configs")
+    parser.add_argument("--workers", type=int, help="number of worker processes (1 runs in this process)")
+    parser.add_argument("--max-trials", type=int, help="trial budget per point, overriding the configs")
+    parser.add_argument("--store", help="SQLite result store checkpointing the sweeps; rerunning resumes them")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+    parser.add_argument("--metrics", help="file receiving the stage timers and counters of the run")
+    parser.add_argument("--metrics-format", choices=METRICS_FORMATS, default="jsonl",
+                        help="jsonl appends one JSON line per run, prometheus writes a text dump (default jsonl)")
+    parser.add_argument("--profile", type=int, metavar="INDEX",
+                        help="instead of the sweep, profile its point with this index (in the order of the CSV rows)")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile")
+    parser.add_argument("--profile-output",
+                        help="profile file (cProfile stats, or a pyinstrument .html/text report); "
+                             "a summary is printed by default")
+    return parser
+
+
+def main(argv=None):
+    """
+    Command-line entry point: runs every given config in turn, or profiles one point of a config.
+
+    Parameters:
+    argv (list[str], optional): Arguments; defaults to the command line.
+    """
+    args = build_parser().parse_args(argv)
+    if args.output and len(args.configs) > 1:
+        raise SystemExit("--output can only be used with a single config")
+
+    if args.profile is not None and len(args.configs) > 1:
+        raise SystemExit("--profile can only be used with a single config")
+
+    metrics = instrumentation.enable() if args.metrics else None
+    try:
+        if args.profile is not None:
+            counts = profile_point(load_config(args.configs[0]), args.profile, args.profiler, args.profile_output,
+                                   seed=args.seed, max_trials=args.max_trials)
+            if not args.quiet:
+                print(f"Point {args.profile}: BER={counts.bit_error_rate:.3e} FER={counts.frame_error_rate:.3e} "
+                      f"({counts.samples} trials)", file=sys.stderr)
+            return
+
+        for path in args.configs:
+            if not args.quiet:
+                print(f"Running {path}", file=sys.stderr)
+            run_config(load_config(path), output=args.output, seed=args.seed, max_workers=args.workers,
+                       max_trials=args.max_trials, store=args.store, verbose=not args.quiet)
+    finally:
+        if metrics is not None:
+            instrumentation.disable()
+            write_metrics(metrics, args.metrics, args.metrics_format, configs=args.configs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import queue
+import sys
+import threading
+
+import numpy as np
+
+from simulation.scripts.sweep import ErrorCounts, decode_frames, encode_frames, transmit_frames
+
+# Default number of bytes read at a time and of frames processed per batch
+BLOCK_SIZE = 1 << 20
+BATCH_FRAMES = 4096
+
+
+def read_blocks(source, block_size=BLOCK_SIZE):
+    """
+    Reads a byte stream in fixed-size blocks.
+
+    Args:
+        source (str or file): Path of the file to read, "-" for standard input, or a binary file object.
+        block_size (int): Number of bytes per block (the last block may be shorter).
+
+    Yields:
+        bytes: The blocks, in order.
+    """
+    if isinstance(source, str):
+        if source == "-":
+            yield from read_blocks(sys.stdin.buffer, block_size)
+            return
+        with open(source, "rb") as file:
+            yield from read_blocks(file, block_size)
+        return
+
+    while block := source.read(block_size):
+        yield block
+
+
+def segment_frames(blocks, k, batch_frames=BATCH_FRAMES):
+    """
+    Cuts a stream of byte blocks into batches of k-bit frames.
+
+    Bits left over at the end of a block are carried into the next one; the very last frame is
+    zero-padded.
+
+    Args:
+        blocks (iterable): Byte blocks, e.g. from `read_blocks`.
+        k (int): Number of bits per frame.
+        batch_frames (int): Maximum number of frames per batch.
+
+    Yields:
+        tuple: A uint8 array of shape (frames, k) and the number of stream bits it holds (smaller
+        than frames * k only for the padded last batch).
+    """
+    leftover = np.zeros(0, dtype=np.uint8)
+    for block in blocks:
+        bits = np.concatenate([leftover, np.unpackbits(np.frombuffer(block, dtype=np.uint8))])
+        whole = len(bits) // k * k
+        frames, leftover = bits[:whole].reshape(-1, k), bits[whole:]
+        for start in range(0, len(frames), batch_frames):
+            batch = frames[start:start + batch_frames]
+            yield batch, batch.size
+
+    if len(leftover):
+        last = np.zeros((1, k), dtype=np.uint8)
+        last[0, :len(leftover)] = leftover
+        yield last, len(leftover)
+
+
+class StreamPipeline:
+    """
+    Sends an arbitrarily large byte stream through a code and a channel with bounded memory.
+
+    Three threads run concurrently, connected by bounded queues: the reader segments the input into
+    batches of k-bit frames, the coder encodes, transmits (optionally interleaved) and decodes each
+    batch, and the writer packs the decoded bits back into bytes. NumPy releases the GIL in its
+    array kernels, so reading, coding and writing overlap; at most `queue_size` batches wait between
+    two stages.
+
+    Attributes:
+        code: Code object with `k` and `encode`/`decode` (batched variants are used when present).
+        channel: Channel object with `transmit`.
+        interleaver (Interleaver): Optional interleaver between the encoder and the channel.
+        block_size (int): Number of bytes read at a time.
+        batch_frames (int): Number of frames per batch.
+        queue_size (int): Capacity of each queue between stages, in batches.
+    """
+
+    def __init__(self, code, channel, interleaver=None, block_size=BLOCK_SIZE, batch_frames=BATCH_FRAMES, queue_size=4):
+        self.code = code
+        self.channel = channel
+        self.interleaver = interleaver
+        self.block_size = block_size
+        self.batch_frames = batch_frames
+        self.queue_size = queue_size
+
+    def process_batch(self, frames):
+        """
+        Encodes, transmits and decodes one batch of frames.
+
+        Args:
+            frames (np.array): uint8 array of shape (frames, k).
+
+        Returns:
+            np.array: The decoded uint8 array of shape (frames, k).
+        """
+        encoded = encode_frames(self.code, frames)
+        received = transmit_frames(self.channel, encoded, self.interleaver)
+        return decode_frames(self.code, received, self.code.k)
+
+    def run(self, source, sink):
+        """
+        Streams `source` through the pipeline and writes the reconstructed bytes to `sink`.
+
+        Args:
+            source (str or file): Path, "-" for standard input, or a binary file object.
+            sink (str or file): Path, "-" for standard output, or a binary file object.
+
+        Returns:
+            ErrorCounts: Bit and frame errors of the reconstructed stream (`samples` counts batches).
+        """
+        if isinstance(sink, str):
+            if sink == "-":
+                return self.run(source, sys.stdout.buffer)
+            with open(sink, "wb") as file:
+                return self.run(source, file)
+
+        stop = threading.Event()
+        errors = []
+        coded_queue = queue.Queue(self.queue_size)
+        decoded_queue = queue.Queue(self.queue_size)
+        counts = [ErrorCounts()]
+
+        def put(target, item):
+            """
+            Puts an item in a bounded queue, giving up when another stage has failed.
+            """
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def get(from_queue):
+            """
+            Gets an item from a queue, returning None when another stage has failed.
+            """
+            while not stop.is_set():
+                try:
+                    return from_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+
+        def stage(body):
+            """
+            Runs a stage, recording its exception and stopping the other stages if it fails.
+            """
+            def run_stage():
+                try:
+                    body()
+                except BaseException as error:
+                    errors.append(error)
+                    stop.set()
+            return threading.Thread(target=run_stage, daemon=True)
+
+        def read():
+            blocks = read_blocks(source, self.block_size)
+            for batch in segment_frames(blocks, self.code.k, self.batch_frames):
+                put(coded_queue, batch)
+                if stop.is_set():
+                    return
+            put(coded_queue, None)
+
+        def process():
+            while (item := get(coded_queue)) is not None:
+                frames, valid_bits = item
+                decoded = self.process_batch(frames)
+                bit_errors = (decoded != frames).ravel()[:valid_bits]
+                frame_errors = (decoded != frames).any(axis=1)
+                counts[0] = counts[0] + ErrorCounts(bit_errors.sum(), valid_bits, frame_errors.sum(),
+                                                    len(frames), 1)
+                put(decoded_queue, (decoded, valid_bits))
+            put(decoded_queue, None)
+
+        def write():
+            leftover = np.zeros(0, dtype=np.uint8)
+            while (item := get(decoded_queue)) is not None:
+                decoded, valid_bits = item
+                bits = np.concatenate([leftover, decoded.ravel()[:valid_bits]])
+                whole = len(bits) // 8 * 8
+                sink.write(np.packbits(bits[:whole]).tobytes())
+                leftover = bits[whole:]
+
+        threads = [stage(read), stage(process), stage(write)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        sink.flush()
+        return counts[0]
@@ -1,37 +1,88 @@
+import codecs
+
 import numpy as np
 
-def string_to_bits(s):
+# Number of characters read at a time by `text_file_to_bits`
+CHUNK_SIZE = 1 << 20
+
+
+def string_to_bits(s, encoding="utf-8"):
     """
     Converts a string to a list of bits.
 
+    The string is encoded (UTF-8 by default, so any Unicode text is supported) and the bytes are
+    unpacked most significant bit first; ASCII characters give the same 8 bits as before.
+
     Parameters:
     s (str): The input string to be converted.
+    encoding (str): Text encoding of the bytes.
 
     Returns:
     np.array: A NumPy array of bits representing the input string.
     """
-    # Convert each character to its ASCII value, then to its binary representation as bits (0s and 1s).
-    bit_list = [int(bit) for char in s for bit in format(ord(char), '08b')]
-
-    # Convert the list of bits to a NumPy array of integers
-    return np.array(bit_list, dtype=int)
+    # View the encoded bytes as a uint8 array (no copy) and unpack every byte into 8 bits
+    return np.unpackbits(np.frombuffer(s.encode(encoding), dtype=np.uint8))
 
-def bits_to_string(bits):
+def bits_to_string(bits, encoding="utf-8", errors="replace"):
     """
     Converts a list of bits to a string.
 
     Parameters:
-    bits (list or np.array): The input list or array of bits to be converted.
+    bits (list or np.array): The input list or array of bits to be converted. A trailing partial
+        byte is padded with zeros.
+    encoding (str): Text encoding of the bytes.
+    errors (str): How bytes that are not valid in the encoding (e.g. corrupted by the channel) are
+        handled: "replace" (by U+FFFD), "ignore" or "strict" (raise UnicodeDecodeError).
 
     Returns:
     str: The string representation of the input bits.
     """
-    # Ensure the input is a NumPy array; if not, convert it to one
-    if isinstance(bits, list):
-        bits = np.array(bits, dtype=int)
+    # Pack the bits 8 at a time into bytes and decode them
+    return np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes().decode(encoding, errors)
+
+def text_file_to_bits(source, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """
+    Converts a text file to bits chunk by chunk, so files larger than memory can be processed.
+
+    Parameters:
+    source (str or file): Path of the file or an open text file.
+    chunk_size (int): Number of characters converted at a time.
+    encoding (str): Encoding of the file and of the bits (UTF-8 and other stateless encodings
+        give the same bits as converting the whole text at once).
+
+    Yields:
+    np.array: The bits of each chunk, in order.
+    """
+    if isinstance(source, str):
+        with open(source, encoding=encoding, newline="") as file:
+            yield from text_file_to_bits(file, chunk_size, encoding)
+        return
+
+    while chunk := source.read(chunk_size):
+        yield string_to_bits(chunk, encoding)
+
+def bits_to_text_chunks(bit_chunks, encoding="utf-8", errors="replace"):
+    """
+    Converts a stream of bit arrays back to text, the streaming counterpart of `bits_to_string`.
 
-    # Split the NumPy array of bits into chunks of 8 bits (since each character is 8 bits long)
-    chars = [bits[i:i+8] for i in range(0, len(bits), 8)]
+    Chunks do not have to hold whole bytes or whole characters: partial bytes and multi-byte
+    characters split between chunks are carried over to the next chunk.
+
+    Parameters:
+    bit_chunks (iterable): Arrays of bits, in order.
+    encoding (str): Text encoding of the bytes.
+    errors (str): Handling of invalid bytes, as in `bits_to_string`.
+
+    Yields:
+    str: The text decoded so far from each chunk (possibly empty).
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    leftover = np.zeros(0, dtype=np.uint8)
+    for chunk in bit_chunks:
+        bits = np.concatenate([leftover, np.asarray(chunk, dtype=np.uint8)])
+        whole = len(bits) // 8 * 8
+        leftover = bits[whole:]
+        yield decoder.decode(np.packbits(bits[:whole]).tobytes())
 
-    # Convert each 8-bit chunk to a character
-    return ''.join(chr(int(''.join(map(str, char)), 2)) for char in chars)
\ No newline at end of file
+    # A final partial byte is zero-padded, as in `bits_to_string`
+    yield decoder.decode(np.packbits(leftover).tobytes(), final=True)
@@ -0,0 +1,810 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import sqrt
+from statistics import NormalDist
+
+import numpy as np
+
+from channels.AWGN_channel import AWGNChannel, hard_decision
+from codes import instrumentation
+
+# Codes built inside the current (worker) process, keyed by (factory, args)
+_CODE_CACHE = {}
+
+# Number of samples (transmitted words) sent through the channel with one generator. Each block of
+# a batch has its own Philox counter range, so any frame is replayed by redrawing a single block
+BLOCK_SAMPLES = 256
+
+# Version of the derivation of the units' streams (`stream_key`). Result stores record the stream of
+# every point, so bumping it makes them refuse to resume points drawn from the previous streams
+STREAM_VERSION = 1
+
+
+class WorkUnit:
+    """
+    One point of a Monte Carlo sweep: a code, a channel and the word sent through them.
+
+    A unit with `biased_channel_args` is estimated by importance sampling: the noise is drawn from
+    the channel built with those arguments (e.g. a BSC with a much higher BER), and every frame is
+    weighted by its likelihood ratio between the channel of `channel_args` and the biased one. This
+    gives usable estimates at error rates far below 1 / max_trials, where plain Monte Carlo sees no
+    errors at all.
+
+    Attributes:
+        code_factory (callable): Class (or picklable function) building the code, e.g. BCHCode.
+        code_args (tuple): Arguments passed to `code_factory`.
+        channel_factory (callable): Class building the channel, e.g. BSCChannel. It is called
+            with `channel_args` followed by the `rng` keyword.
+        channel_args (tuple): Arguments passed to `channel_factory`.
+        input_bits (np.array): Word transmitted in every sample, split into k-bit frames.
+        key (tuple): Identifier of the point, returned unchanged with the results. Sweeps put
+            the swept value (BER or Eb/N0) first, which is what the report plots against.
+        stopping (StoppingRule): Rule deciding when the point has been simulated enough. When
+            None, the rule passed to `run_sweep` is used.
+        interleaver (Interleaver): Interleaver placed between the encoder and the channel, or None.
+            Its codeword length must be the code's n.
+        biased_channel_args (tuple): Arguments of the channel the noise is drawn from for importance
+            sampling, or None for plain Monte Carlo. The channel needs a `log_likelihood` method
+            (BSCChannel, GilbertElliottChannel).
+    """
+
+    def __init__(self, code_factory, code_args, channel_factory, channel_args, input_bits, key=None, stopping=None,
+                 interleaver=None, biased_channel_args=None):
+        self.code_factory = code_factory
+        self.code_args = tuple(code_args)
+        self.channel_factory = channel_factory
+        self.channel_args = tuple(channel_args)
+        self.input_bits = np.asarray(input_bits, dtype=np.uint8)
+        self.key = key
+        self.stopping = stopping
+        self.interleaver = interleaver
+        self.biased_channel_args = None if biased_channel_args is None else tuple(biased_channel_args)
+        if self.biased_channel_args is not None and interleaver is not None:
+            # The weights assume that each frame sees its own, independent stretch of the channel
+            raise ValueError("Importance sampling cannot be combined with an interleaver")
+
+    @property
+    def noise_channel_args(self):
+        """tuple: Arguments of the channel the noise is drawn from (the biased one, if any)."""
+        return self.channel_args if self.biased_channel_args is None else self.biased_channel_args
+
+
+def _to_json(values):
+    """
+    Serializes parameters (tuples of numbers, strings or NumPy scalars) to a canonical JSON string.
+    """
+    return json.dumps(values, default=lambda value: value.item() if hasattr(value, "item") else str(value))
+
+
+def _describe_interleaver(interleaver):
+    """
+    Returns a string identifying an interleaver and its parameters ("" for no interleaver).
+    """
+    if interleaver is None:
+        return ""
+    parameters = {name: value for name, value in vars(interleaver).items() if not name.startswith("_")}
+    return f"{type(interleaver).__name__}{_to_json(parameters)}"
+
+
+def point_identity(unit):
+    """
+    Returns the strings identifying the point of a work unit, whatever its position in a sweep.
+
+    Args:
+        unit (WorkUnit): The work unit.
+
+    Returns:
+        tuple: Code name, code parameters, channel name, channel parameters, interleaver, biased
+        channel parameters ("" without importance sampling), key and transmitted word.
+    """
+    return (getattr(unit.code_factory, "__name__", str(unit.code_factory)), _to_json(unit.code_args),
+            getattr(unit.channel_factory, "__name__", str(unit.channel_factory)), _to_json(unit.channel_args),
+            _describe_interleaver(unit.interleaver),
+            "" if unit.biased_channel_args is None else _to_json(unit.biased_channel_args), _to_json(unit.key),
+            "".join(map(str, unit.input_bits.tolist())))
+
+
+def stream_key(unit):
+    """
+    Returns the spawn key of a unit's random stream: a hash of STREAM_VERSION and `point_identity`.
+
+    The key depends on the point only, so a point draws the same stream wherever it sits in the list
+    of units (adding a BER or a code to a sweep leaves the other points unchanged), and points
+    differing in any parameter, word or key draw unrelated streams.
+
+    Args:
+        unit (WorkUnit): The work unit.
+
+    Returns:
+        tuple: Four 32-bit integers.
+    """
+    digest = hashlib.sha256(json.dumps([STREAM_VERSION, *point_identity(unit)]).encode()).digest()
+    return tuple(int.from_bytes(digest[start:start + 4], "little") for start in range(0, 16, 4))
+
+
+def unit_seed(unit, seed):
+    """
+    Returns the seed of a work unit: the root seed with the unit's `stream_key` as spawn key.
+
+    Args:
+        unit (WorkUnit): The work unit.
+        seed (int or np.random.SeedSequence): Root seed of the sweep.
+
+    Returns:
+        np.random.SeedSequence: Seed of the unit.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return np.random.SeedSequence(root.entropy, spawn_key=stream_key(unit))
+
+
+def point_channel_args(channel_factory, point, n, k, channel_args=()):
+    """
+    Returns the channel arguments of one sweep point.
+
+    Args:
+        channel_factory (callable): Channel class of the sweep.
+        point (float): Swept value: the BER for hard channels, Eb/N0 in dB for AWGNChannel.
+        n (int): Code length.
+        k (int): Number of information bits per frame.
+        channel_args (tuple): Fixed channel parameters; used as they are when given.
+
+    Returns:
+        tuple: The arguments for `channel_factory`.
+    """
+    if channel_args:
+        return tuple(channel_args)
+    if channel_factory is AWGNChannel:
+        return point, k / n  # Eb/N0 is per information bit, so the noise depends on the code rate
+    return (point,)
+
+
+def confidence_interval(errors, trials, confidence=0.95, method="wilson"):
+    """
+    Computes a two-sided confidence interval for an error probability.
+
+    Args:
+        errors (int): Number of observed errors.
+        trials (int): Number of trials.
+        confidence (float): Confidence level, e.g. 0.95.
+        method (str): "wilson" (score interval) or "clopper-pearson" (exact interval).
+
+    Returns:
+        tuple: Lower and upper bound of the interval.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    alpha = 1.0 - confidence
+
+    if method == "wilson":
+        z = NormalDist().inv_cdf(1.0 - alpha / 2)
+        p_hat = errors / trials
+        denominator = 1.0 + z * z / trials
+        center = (p_hat + z * z / (2 * trials)) / denominator
+        half_width = z * sqrt(p_hat * (1.0 - p_hat) / trials + z * z / (4 * trials * trials)) / denominator
+        return max(0.0, center - half_width), min(1.0, center + half_width)
+
+    if method == "clopper-pearson":
+        from scipy.stats import beta  # Only needed for the exact interval
+
+        lower = beta.ppf(alpha / 2, errors, trials - errors + 1) if errors > 0 else 0.0
+        upper = beta.ppf(1.0 - alpha / 2, errors + 1, trials - errors) if errors < trials else 1.0
+        return float(lower), float(upper)
+
+    raise ValueError(f"Unknown confidence interval method: {method}")
+
+
+class StoppingRule:
+    """
+    Decides how many samples a sweep point gets: samples are simulated in growing batches until
+    enough errors have been seen, the confidence interval is narrow enough, or the budget is spent.
+
+    The error targets compare the counts as they are: the weighted counts of importance-sampled
+    units stay far below them, so those units run until `ci_width` or `max_trials` is reached.
+
+    Attributes:
+        min_bit_errors (int): Stop once this many bit errors have been observed (None to ignore).
+        min_frame_errors (int): Stop once this many frame errors have been observed (None to ignore).
+        max_trials (int): Maximum number of samples (transmitted words) per point.
+        ci_width (float): Stop once the confidence interval of the bit error rate is narrower than
+            this fraction of the estimate, e.g. 0.2 for +-10 % (None to ignore).
+        confidence (float): Confidence level of the interval.
+        ci_method (str): "wilson" or "clopper-pearson".
+        initial_batch (int): Number of samples in the first batch.
+        growth (float): Factor by which each batch is larger than the previous one.
+        max_batch (int): Upper bound on the batch size.
+    """
+
+    def __init__(self, min_bit_errors=None, min_frame_errors=None, max_trials=1000, ci_width=None,
+                 confidence=0.95, ci_method="wilson", initial_batch=100, growth=2.0, max_batch=10000):
+        self.min_bit_errors = min_bit_errors
+        self.min_frame_errors = min_frame_errors
+        self.max_trials = max_trials
+        self.ci_width = ci_width
+        self.confidence = confidence
+        self.ci_method = ci_method
+        self.initial_batch = initial_batch
+        self.growth = growth
+        self.max_batch = max_batch
+
+    def batch_size(self, batch_index, samples_done):
+        """
+        Returns the number of samples of the given batch, or 0 when the budget is spent.
+        """
+        size = int(self.initial_batch * self.growth ** batch_index)
+        return max(0, min(size, self.max_batch, self.max_trials - samples_done))
+
+    def is_met(self, counts):
+        """
+        Returns True when the accumulated counts satisfy the rule.
+        """
+        if counts.samples >= self.max_trials:
+            return True
+        if self.min_bit_errors is not None and counts.bit_errors >= self.min_bit_errors:
+            return True
+        if self.min_frame_errors is not None and counts.frame_errors >= self.min_frame_errors:
+            return True
+        if self.ci_width is not None and counts.bit_errors > 0:
+            lower, upper = counts.confidence_interval(self.confidence, self.ci_method)
+            return (upper - lower) <= self.ci_width * counts.bit_error_rate
+        return False
+
+
+class ErrorCounts:
+    """
+    Error and trial counts accumulated for a work unit. Partial counts are merged with `+`.
+
+    The counts of importance-sampled units are weighted: every frame contributes its likelihood
+    ratio instead of 1, and the sums of the squared contributions are kept to estimate the variance.
+    Empty counts can be added to either kind.
+
+    Attributes:
+        bit_errors (int): Number of wrongly decoded information bits (weighted sum, a float, for
+            importance sampling).
+        bits (int): Number of information bits compared.
+        frame_errors (int): Number of decoded frames with at least one bit error (weighted sum, a
+            float, for importance sampling).
+        frames (int): Number of frames decoded.
+        samples (int): Number of transmitted words (each word is one or more frames).
+        bit_error_squares (float): Sum over frames of the squared weighted bit errors, or None for
+            plain Monte Carlo counts.
+        frame_error_squares (float): Sum over frames of the squared weighted frame errors, or None
+            for plain Monte Carlo counts.
+    """
+
+    def __init__(self, bit_errors=0, bits=0, frame_errors=0, frames=0, samples=0, bit_error_squares=None,
+                 frame_error_squares=None):
+        number = int if bit_error_squares is None else float
+        self.bit_errors = number(bit_errors)
+        self.bits = int(bits)
+        self.frame_errors = number(frame_errors)
+        self.frames = int(frames)
+        self.samples = int(samples)
+        self.bit_error_squares = None if bit_error_squares is None else float(bit_error_squares)
+        self.frame_error_squares = None if frame_error_squares is None else float(frame_error_squares)
+
+    def __add__(self, other):
+        squares = {}
+        if self.weighted or other.weighted:
+            squares = {"bit_error_squares": (self.bit_error_squares or 0.0) + (other.bit_error_squares or 0.0),
+                       "frame_error_squares": (self.frame_error_squares or 0.0) + (other.frame_error_squares or 0.0)}
+        return ErrorCounts(self.bit_errors + other.bit_errors, self.bits + other.bits,
+                           self.frame_errors + other.frame_errors, self.frames + other.frames,
+                           self.samples + other.samples, **squares)
+
+    def __repr__(self):
+        text = (f"ErrorCounts(bit_errors={self.bit_errors}, bits={self.bits}, frame_errors={self.frame_errors}, "
+                f"frames={self.frames}, samples={self.samples}")
+        if self.weighted:
+            text += f", bit_error_squares={self.bit_error_squares}, frame_error_squares={self.frame_error_squares}"
+        return text + ")"
+
+    @property
+    def weighted(self):
+        """bool: Whether the counts come from importance sampling."""
+        return self.bit_error_squares is not None
+
+    @property
+    def average_bit_errors(self):
+        """float: Average number of bit errors per transmitted word."""
+        return self.bit_errors / self.samples if self.samples else 0.0
+
+    @property
+    def bit_error_rate(self):
+        """float: Fraction of information bits decoded wrongly."""
+        return self.bit_errors / self.bits if self.bits else 0.0
+
+    @property
+    def frame_error_rate(self):
+        """float: Fraction of frames decoded with at least one bit error."""
+        return self.frame_errors / self.frames if self.frames else 0.0
+
+    @property
+    def bit_error_variance(self):
+        """float: Variance of the bit error rate estimate (binomial for plain Monte Carlo counts)."""
+        if not self.weighted:
+            return self.bit_error_rate * (1.0 - self.bit_error_rate) / self.bits if self.bits else 0.0
+        # The rate is the mean weighted bit errors per frame, divided by the (fixed) bits per frame
+        bits_per_frame = self.bits / self.frames if self.frames else 1.0
+        return _mean_variance(self.bit_errors, self.bit_error_squares, self.frames) / bits_per_frame ** 2
+
+    @property
+    def frame_error_variance(self):
+        """float: Variance of the frame error rate estimate (binomial for plain Monte Carlo counts)."""
+        if not self.weighted:
+            return self.frame_error_rate * (1.0 - self.frame_error_rate) / self.frames if self.frames else 0.0
+        return _mean_variance(self.frame_errors, self.frame_error_squares, self.frames)
+
+    def confidence_interval(self, confidence=0.95, method="wilson"):
+        """
+        Returns the confidence interval (lower, upper) of the bit error rate.
+
+        Weighted counts get the normal interval of their estimated variance, whatever the method.
+        """
+        if self.weighted:
+            return _normal_interval(self.bit_error_rate, self.bit_error_variance, confidence)
+        return confidence_interval(self.bit_errors, self.bits, confidence, method)
+
+    def frame_confidence_interval(self, confidence=0.95, method="wilson"):
+        """
+        Returns the confidence interval (lower, upper) of the frame error rate.
+        """
+        if self.weighted:
+            return _normal_interval(self.frame_error_rate, self.frame_error_variance, confidence)
+        return confidence_interval(self.frame_errors, self.frames, confidence, method)
+
+
+def _mean_variance(total, squares, count):
+    """
+    Returns the estimated variance of the mean of `count` values from their sum and sum of squares.
+    """
+    if count < 2:
+        return 0.0
+    mean = total / count
+    return max(squares / count - mean * mean, 0.0) / (count - 1)
+
+
+def _normal_interval(estimate, variance, confidence):
+    """
+    Returns the normal-approximation interval of an estimate, clipped to [0, 1].
+    """
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * sqrt(variance)
+    return max(0.0, estimate - half_width), min(1.0, estimate + half_width)
+
+
+def _get_code(code_factory, code_args):
+    """
+    Returns the code built from the given factory and arguments, constructing it once per process.
+    """
+    key = (code_factory, code_args)
+    if key not in _CODE_CACHE:
+        _CODE_CACHE[key] = code_factory(*code_args)
+    return _CODE_CACHE[key]
+
+
+def encode_frames(code, messages):
+    """
+    Encodes a (frames, k) array of messages, using the code's batched encoder when it has one.
+
+    Args:
+        code: Code object with `encode` (and optionally `encode_batch`).
+        messages (np.array): Array of shape (frames, k).
+
+    Returns:
+        np.array: uint8 array of shape (frames, n).
+    """
+    if hasattr(code, "encode_batch"):
+        return np.asarray(code.encode_batch(messages), dtype=np.uint8)
+    return np.array([code.encode(message) for message in messages], dtype=np.uint8)
+
+
+def decode_frames(code, received, k):
+    """
+    Decodes a (frames, n) array of received words, using the code's batched decoder when it has one.
+
+    Soft channel outputs (float LLRs) are passed as they are to codes whose `soft_input` attribute
+    is True and sliced to hard bits for every other code.
+
+    Args:
+        code: Code object with `decode` (and optionally `decode_batch`).
+        received (np.array): Array of shape (frames, n), bits or LLRs.
+        k (int): Number of information bits per frame; per-word results are padded or trimmed to it.
+
+    Returns:
+        np.array: uint8 array of shape (frames, k).
+    """
+    if np.issubdtype(received.dtype, np.floating) and not getattr(code, "soft_input", False):
+        received = hard_decision(received)
+
+    if hasattr(code, "decode_batch"):
+        if instrumentation.active() is None:
+            return np.asarray(code.decode_batch(received), dtype=np.uint8)
+        decoded, failed = code.decode_batch(received, return_status=True)
+        instrumentation.count("decode_failures", np.count_nonzero(failed))
+        return np.asarray(decoded, dtype=np.uint8)
+
+    decoded = np.zeros((len(received), k), dtype=np.uint8)
+    for i, word in enumerate(received):
+        bits = np.asarray(code.decode(word))[:k]
+        decoded[i, :len(bits)] = bits
+    return decoded
+
+
+def transmit_frames(channel, encoded, interleaver=None, return_states=False):
+    """
+    Sends a (frames, n) array of codewords through the channel, optionally interleaved.
+
+    With an interleaver, consecutive groups of `interleaver.depth` codewords form one channel frame;
+    the last group is completed with all-zero codewords, which are dropped after deinterleaving.
+
+    Args:
+        channel: Channel object with `transmit`.
+        encoded (np.array): uint8 array of shape (frames, n).
+        interleaver (Interleaver, optional): Interleaver spanning depth codewords of n bits.
+        return_states (bool): If True, also return the channel's state trace (channels whose
+            `transmit` accepts `return_states`, i.e. the Gilbert-Elliott channel).
+
+    Returns:
+        np.array: The received bits or LLRs, shape (frames, n), and the state of every codeword bit
+        (same shape) if `return_states` is True.
+    """
+    options = {"return_states": True} if return_states else {}
+    if interleaver is None:
+        output = channel.transmit(encoded, **options)
+        return (output[0], output[2]) if return_states else output[0]
+
+    frames, n = encoded.shape
+    groups = -(-frames // interleaver.depth)
+    padded = np.zeros((groups * interleaver.depth, n), dtype=encoded.dtype)
+    padded[:frames] = encoded
+
+    output = channel.transmit(interleaver.interleave(padded.reshape(groups, -1)), **options)
+    received = interleaver.deinterleave(output[0]).reshape(-1, n)[:frames]
+    if return_states:
+        return received, interleaver.deinterleave(output[2]).reshape(-1, n)[:frames]
+    return received
+
+
+def word_frames(input_bits, k):
+    """
+    Splits a word into k-bit frames, zero-padding the last one.
+
+    Args:
+        input_bits (np.array): The word.
+        k (int): Number of information bits per frame.
+
+    Returns:
+        tuple: The frames, uint8 array of shape (chunks, k), and a boolean array of the same shape
+        marking the bits of the word (False for the padding).
+    """
+    word_length = len(input_bits)
+    chunks = -(-word_length // k)
+    frame_bits = np.zeros(chunks * k, dtype=np.uint8)
+    frame_bits[:word_length] = input_bits
+    return frame_bits.reshape(chunks, k), (np.arange(chunks * k) < word_length).reshape(chunks, k)
+
+
+def block_rng(seed, block):
+    """
+    Returns the generator of one block of samples of a batch.
+
+    The generator is a counter-based Philox stream: its key is drawn from the batch seed, i.e. from
+    (run seed, work unit, batch index), and its counter starts at `block` in the highest word. Blocks
+    thus get disjoint streams that are positioned directly, without drawing the preceding ones.
+
+    Args:
+        seed (np.random.SeedSequence): Seed of the batch.
+        block (int): Index of the block within the batch.
+
+    Returns:
+        np.random.Generator: The generator.
+    """
+    return np.random.Generator(np.random.Philox(key=seed.generate_state(2, np.uint64), counter=[0, 0, 0, block]))
+
+
+def simulate_errors(unit, seed, num_samples, return_weights=False):
+    """
+    Transmits the unit's word `num_samples` times and returns the bit errors of every frame.
+
+    The samples are sent through the channel in blocks of BLOCK_SAMPLES, each drawing from its own
+    `block_rng`; encoding and decoding still process the whole batch at once.
+
+    Args:
+        unit (WorkUnit): The point to simulate.
+        seed (np.random.SeedSequence): Seed of this batch's random stream.
+        num_samples (int): Number of samples in this batch.
+        return_weights (bool): If True, also return the log-likelihood ratio of every frame between
+            the unit's channel and the channel the noise was drawn from (0 without importance sampling).
+
+    Returns:
+        np.array: Boolean array of shape (num_samples * chunks, k), True for the wrongly decoded bits
+        of the word (the padding never counts), and the float array of log-likelihood ratios of
+        shape (num_samples * chunks,) if `return_weights` is True.
+    """
+    code = _get_code(unit.code_factory, unit.code_args)
+    with instrumentation.stage("chunking"):
+        frames, valid = word_frames(unit.input_bits, code.k)
+        messages = np.tile(frames, (num_samples, 1))
+    with instrumentation.stage("encode"):
+        encoded = encode_frames(code, messages)
+
+    with instrumentation.stage("channel"):
+        chunks = len(frames)
+        channel = unit.channel_factory(*unit.noise_channel_args, rng=block_rng(seed, 0))
+        # The Gilbert-Elliott likelihood depends on the state trace as well as on the errors
+        with_states = unit.biased_channel_args is not None and hasattr(channel, "states")
+        received, states = [], []
+        for block, start in enumerate(range(0, num_samples, BLOCK_SAMPLES)):
+            channel.rng = block_rng(seed, block)
+            rows = encoded[start * chunks:min(start + BLOCK_SAMPLES, num_samples) * chunks]
+            output = transmit_frames(channel, rows, unit.interleaver, return_states=with_states)
+            received.append(output[0] if with_states else output)
+            if with_states:
+                states.append(output[1])
+        received = np.concatenate(received)
+    with instrumentation.stage("decode"):
+        decoded = decode_frames(code, received, code.k)
+
+    with instrumentation.stage("chunking"):
+        errors = (decoded != messages) & np.tile(valid, (num_samples, 1))
+    if not return_weights:
+        return errors
+    if unit.biased_channel_args is None:
+        return errors, np.zeros(len(errors))
+
+    with instrumentation.stage("weights"):
+        flips = received != encoded
+        state_args = (np.concatenate(states),) if with_states else ()
+        nominal = unit.channel_factory(*unit.channel_args)
+        return errors, nominal.log_likelihood(flips, *state_args) - channel.log_likelihood(flips, *state_args)
+
+
+def simulate_samples(unit, seed, num_samples):
+    """
+    Transmits the unit's word `num_samples` times and counts the decoding errors.
+
+    This is the function run by the worker processes. All randomness comes from `seed`, so a
+    batch gives the same counts whichever process runs it. Importance-sampled units get weighted
+    counts.
+
+    Args:
+        unit (WorkUnit): The point to simulate.
+        seed (np.random.SeedSequence): Seed of this batch's random stream.
+        num_samples (int): Number of samples in this batch.
+
+    Returns:
+        ErrorCounts: The counts for this batch.
+    """
+    if unit.biased_channel_args is None:
+        errors = simulate_errors(unit, seed, num_samples)
+        counts = ErrorCounts(bit_errors=errors.sum(), bits=num_samples * len(unit.input_bits),
+                             frame_errors=errors.any(axis=1).sum(), frames=len(errors), samples=num_samples)
+    else:
+        errors, log_weights = simulate_errors(unit, seed, num_samples, return_weights=True)
+        weights = np.exp(log_weights)
+        bit_errors = weights * errors.sum(axis=1)
+        frame_errors = weights * errors.any(axis=1)
+        counts = ErrorCounts(bit_errors=bit_errors.sum(), bits=num_samples * len(unit.input_bits),
+                             frame_errors=frame_errors.sum(), frames=len(errors), samples=num_samples,
+                             bit_error_squares=np.square(bit_errors).sum(),
+                             frame_error_squares=np.square(frame_errors).sum())
+    if instrumentation.active() is not None:
+        for name, value in (("batches", 1), ("samples", counts.samples), ("frames", counts.frames),
+                            ("bits", counts.bits)):
+            instrumentation.count(name, value)
+    return counts
+
+
+def instrumented_samples(unit, seed, num_samples):
+    """
+    Runs `simulate_samples` in a worker process with instrumentation enabled.
+
+    Returns:
+        tuple: The ErrorCounts of the batch and the metrics collected for it, as `Metrics.as_dict()`.
+    """
+    metrics = instrumentation.enable()
+    try:
+        return simulate_samples(unit, seed, num_samples), metrics.as_dict()
+    finally:
+        instrumentation.disable()
+
+
+def batch_seed(unit_seed, batch_index):
+    """
+    Returns the seed of one batch of a work unit, derived directly from the unit's seed.
+
+    Args:
+        unit_seed (np.random.SeedSequence): Seed of the work unit.
+        batch_index (int): Index of the batch within the unit.
+
+    Returns:
+        np.random.SeedSequence: Seed of the batch.
+    """
+    return np.random.SeedSequence(unit_seed.entropy, spawn_key=unit_seed.spawn_key + (batch_index,))
+
+
+def unit_batch_seed(seed, unit, batch_index):
+    """
+    Returns the seed `run_sweep(seed=seed)` gives to a batch of a unit.
+
+    Args:
+        seed (int): Root seed of the sweep.
+        unit (WorkUnit): The unit.
+        batch_index (int): Index of the batch within the unit.
+
+    Returns:
+        np.random.SeedSequence: Seed of the batch.
+    """
+    return batch_seed(unit_seed(unit, seed), batch_index)
+
+
+def batch_samples(rule, batch_index):
+    """
+    Returns the number of samples of a batch under a stopping rule (0 if the budget is spent first).
+    """
+    samples_done = sum(rule.batch_size(index, 0) for index in range(batch_index))
+    return rule.batch_size(batch_index, min(samples_done, rule.max_trials))
+
+
+def frame_errors(unit, seed, batch_index, stopping=None):
+    """
+    Simulates one batch of a sweep again and returns the frames decoded with errors.
+
+    Only that batch is simulated, with the random streams of the original sweep, so the returned
+    indices can be passed to `replay_frame`.
+
+    Args:
+        unit (WorkUnit): The unit, as given to `run_sweep` (its position in the sweep does not matter).
+        seed (int): Root seed of the sweep.
+        batch_index (int): Index of the batch within the unit.
+        stopping (StoppingRule, optional): Rule given to `run_sweep` (when the unit has none).
+
+    Returns:
+        np.array: Indices (within the batch) of the frames with bit errors.
+    """
+    num_samples = batch_samples(unit.stopping or stopping or StoppingRule(), batch_index)
+    errors = simulate_errors(unit, unit_batch_seed(seed, unit, batch_index), num_samples)
+    return np.flatnonzero(errors.any(axis=1))
+
+
+def replay_frame(unit, seed, batch_index, frame, stopping=None):
+    """
+    Regenerates a single frame of a sweep bit for bit, e.g. to debug a decoding failure.
+
+    Only the block of BLOCK_SAMPLES samples holding the frame is sent through the channel again, from
+    its own Philox stream, so the cost does not depend on the position of the frame in the sweep.
+
+    Args:
+        unit (WorkUnit): The unit, as given to `run_sweep` (its position in the sweep does not matter).
+        seed (int): Root seed of the sweep.
+        batch_index (int): Index of the batch within the unit.
+        frame (int): Index of the frame within the batch (the word's frames follow each other).
+        stopping (StoppingRule, optional): Rule given to `run_sweep` (when the unit has none).
+
+    Returns:
+        dict: The frame's "message", "codeword", "received" (bits or LLRs), "states" (channel
+        state of each bit, None for channels without states), "decoded" and "errors" (wrong bits
+        of the word, padding excluded).
+    """
+    num_samples = batch_samples(unit.stopping or stopping or StoppingRule(), batch_index)
+    code = _get_code(unit.code_factory, unit.code_args)
+    frames, valid = word_frames(unit.input_bits, code.k)
+    chunks = len(frames)
+    if not 0 <= frame < num_samples * chunks:
+        raise ValueError(f"Frame {frame} outside batch {batch_index} of {num_samples * chunks} frames")
+
+    block, row = divmod(frame, BLOCK_SAMPLES * chunks)
+    block_samples = min(BLOCK_SAMPLES, num_samples - block * BLOCK_SAMPLES)
+    encoded = encode_frames(code, np.tile(frames, (block_samples, 1)))
+    channel = unit.channel_factory(*unit.noise_channel_args,
+                                   rng=block_rng(unit_batch_seed(seed, unit, batch_index), block))
+    if hasattr(channel, "states"):
+        received, states = transmit_frames(channel, encoded, unit.interleaver, return_states=True)
+        states = states[row]
+    else:
+        received, states = transmit_frames(channel, encoded, unit.interleaver), None
+
+    message = frames[row % chunks]
+    decoded = decode_frames(code, received[row:row + 1], code.k)[0]
+    return {"message": message, "codeword": encoded[row], "received": received[row], "states": states,
+            "decoded": decoded, "errors": (decoded != message) & valid[row % chunks]}
+
+
+def run_sweep(units, stopping=None, seed=None, max_workers=None, callback=None, store=None):
+    """
+    Runs every work unit in growing batches across a pool of worker processes.
+
+    Each unit is simulated batch after batch until its stopping rule is met; batches of different
+    units run in parallel. Batch `i` of a unit always draws from the same stream, derived from the
+    root seed and the unit's point identity (`unit_seed`), and the stopping decisions only depend
+    on the counts merged so far, so the results of a point depend only on `seed` and the point
+    itself, not on the other units, the number of workers or the completion order.
+
+    Args:
+        units (list[WorkUnit]): The points to simulate.
+        stopping (StoppingRule, optional): Rule for the units that do not carry their own.
+            Defaults to 1000 samples per point.
+        seed (int, optional): Root seed of the sweep. A fresh one is drawn if omitted.
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU count;
+            1 runs everything in the current process.
+        callback (callable, optional): Called as `callback(unit, counts)` when a unit is finished.
+            Its time is recorded as the "callback" stage while instrumentation is enabled.
+        store (ResultStore, optional): Store checkpointing the counts of every finished batch. Units
+            found in it continue from their next batch (or finish at once if their rule is already
+            met), so an interrupted sweep resumes where it stopped. Requires an explicit `seed`.
+
+    Returns:
+        list[ErrorCounts]: The merged counts of each unit, in the order of `units`.
+    """
+    stopping = stopping or StoppingRule()
+    rules = [unit.stopping or stopping for unit in units]
+    root_seed = np.random.SeedSequence(seed)
+    unit_seeds = [unit_seed(unit, root_seed) for unit in units]
+    results = [ErrorCounts() for _ in units]
+    batches = [0] * len(units)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # With instrumentation enabled, the workers send the metrics of each batch back with its counts;
+    # batches run in this process add to the active metrics directly
+    metrics = instrumentation.active() if max_workers > 1 else None
+    simulate = simulate_samples if metrics is None else instrumented_samples
+
+    point_ids = None
+    if store is not None:
+        if seed is None:
+            raise ValueError("A sweep can only be stored and resumed with an explicit seed")
+        point_ids = [store.point_id(unit, seed) for unit in units]
+        for index, point_id in enumerate(point_ids):
+            results[index], batches[index] = store.load(point_id)
+
+    def next_batch(index):
+        """
+        Returns the (seed, size) of the unit's next batch, or None when the unit is finished.
+        """
+        size = rules[index].batch_size(batches[index], results[index].samples)
+        if size == 0 or rules[index].is_met(results[index]):
+            if callback is not None:
+                with instrumentation.stage("callback"):
+                    callback(units[index], results[index])
+            return None
+        batch = (batch_seed(unit_seeds[index], batches[index]), size)
+        batches[index] += 1
+        return batch
+
+    def merge(index, counts):
+        """
+        Adds the counts of the unit's last batch, checkpointing them in the store.
+        """
+        if metrics is not None:
+            counts, batch_metrics = counts
+            metrics.merge(batch_metrics)
+        results[index] = results[index] + counts
+        if store is not None:
+            with instrumentation.stage("store"):
+                store.add_batch(point_ids[index], batches[index] - 1, counts)
+
+    if max_workers == 1:
+        for index, unit in enumerate(units):
+            while (batch := next_batch(index)) is not None:
+                merge(index, simulate_samples(unit, *batch))
+        return results
+
+    # Spawned (not forked) workers: forking after galois/numba have started threads can deadlock
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {}
+        for index, unit in enumerate(units):
+            if (batch := next_batch(index)) is not None:
+                futures[executor.submit(simulate, unit, *batch)] = index
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                merge(index, future.result())
+                if (batch := next_batch(index)) is not None:
+                    futures[executor.submit(simulate, units[index], *batch)] = index
+
+    return results
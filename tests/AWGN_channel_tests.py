@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from statistics import NormalDist
+
+from channels.AWGN_channel import AWGNChannel, hard_decision
+from codes.LDPC import LDPC
+from simulation.scripts.sweep import WorkUnit, point_channel_args, run_sweep
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+
+class TestAWGNChannel(unittest.TestCase):
+
+    def test_uncoded_error_rate(self):
+        """
+        Tests that the hard-decision error rate of both modulations matches Q(sqrt(2 Eb/N0)).
+        """
+        input_bits = np.random.default_rng(0).integers(0, 2, (400, 501), dtype=np.uint8)
+        for modulation in ("bpsk", "qpsk"):
+            for ebn0_db in (0.0, 4.0):
+                llrs, flipped_bits_count = AWGNChannel(ebn0_db, modulation=modulation, rng=1).transmit(input_bits)
+                self.assertEqual(llrs.dtype, np.float32)
+                self.assertEqual(llrs.shape, input_bits.shape)
+                np.testing.assert_array_equal(flipped_bits_count, (hard_decision(llrs) != input_bits).sum(axis=1))
+
+                expected = NormalDist().cdf(-np.sqrt(2 * 10 ** (ebn0_db / 10)))
+                self.assertAlmostEqual(flipped_bits_count.sum() / input_bits.size, expected, delta=0.1 * expected)
+
+    def test_llr_scale(self):
+        """
+        Tests that the LLRs are calibrated: bits with LLR near L are wrong with probability 1/(1+e^L).
+        """
+        channel = AWGNChannel(1.0, rate=0.5, rng=2)
+        llrs, _ = channel.transmit(np.zeros((200, 1000), dtype=np.uint8))
+        near = np.abs(np.abs(llrs) - 1.0) < 0.1
+        self.assertAlmostEqual((llrs[near] < 0).mean(), 1 / (1 + np.e), delta=0.02)
+
+    def test_soft_ldpc_sweep(self):
+        """
+        Tests that soft LLRs reach the LDPC decoder through the sweep and beat hard slicing.
+        """
+        code = LDPC(96, 48, cache=False)
+        channel = AWGNChannel(2.0, rate=0.5, rng=3)
+        messages = np.random.default_rng(4).integers(0, 2, (300, 48))
+        llrs, _ = channel.transmit(code.encode(messages))
+        soft_errors = (code.decode_batch(llrs) != messages).sum()
+        hard_errors = (code.decode_batch(hard_decision(llrs)) != messages).sum()
+        self.assertLess(soft_errors, hard_errors)
+
+        self.assertEqual(point_channel_args(AWGNChannel, 3.0, 96, 48), (3.0, 0.5))
+        unit = WorkUnit(LDPC, (96, 48), AWGNChannel, point_channel_args(AWGNChannel, 3.0, 96, 48), np.ones(48))
+        counts, = run_sweep([unit], seed=0, max_workers=1)
+        self.assertEqual(counts.samples, 1000)
+        self.assertLess(counts.bit_error_rate, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
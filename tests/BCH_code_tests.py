@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
 from codes.BCH_code import BCHCode
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
 
 
 class TestBCHCode(unittest.TestCase):
@@ -64,6 +65,61 @@ class TestBCHCode(unittest.TestCase):
         decoded_data = self.bch.decode(encoded_data_with_errors)
         self.assertEqual(decoded_data.tolist(), data.tolist())
 
+    def test_leading_zeros(self):
+        """
+        Tests that messages and codewords starting with zeros keep their length.
+        """
+        data = np.array([0, 0, 1, 1, 0], dtype=int)
+        encoded_data = self.bch.encode(data)
+        self.assertEqual(len(encoded_data), 15)
+        np.testing.assert_array_equal(self.bch.decode(encoded_data), data)
+
+    def test_batch_matches_single(self):
+        """
+        Tests that the batched encoder/decoder agree with the per-word methods and flag failures.
+        """
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 2, (50, 5))
+        encoded_data = self.bch.encode_batch(data)
+        np.testing.assert_array_equal(encoded_data, [self.bch.encode(word) for word in data])
+
+        # Up to t errors are corrected, 5 errors in a (15, 5, 3) word are not always correctable
+        received = encoded_data.copy()
+        received[:25, :3] ^= 1
+        received[25:, :5] ^= 1
+        decoded_data, failed = self.bch.decode_batch(received, return_status=True)
+        np.testing.assert_array_equal(decoded_data[:25], data[:25])
+        self.assertFalse(failed[:25].any())
+        np.testing.assert_array_equal(decoded_data, [self.bch.decode(word) for word in received])
+
+    def test_table_decoder_matches_galois(self):
+        """
+        Tests that the table-driven decoder gives the galois results, failure flags included.
+        """
+        rng = np.random.default_rng(1)
+        for n, k in ((15, 7), (31, 11), (63, 39), (255, 223)):
+            table, reference = BCHCode(n, k, backend="table"), BCHCode(n, k, backend="galois")
+            data = rng.integers(0, 2, (400, k))
+            received = table.encode_batch(data)
+            weights = rng.integers(0, table.t + 3, len(received))
+            for word, weight in zip(received, weights):
+                word[rng.choice(n, weight, replace=False)] ^= 1
+
+            decoded_data, failed = table.decode_batch(received, return_status=True)
+            expected_data, expected_failed = reference.decode_batch(received, return_status=True)
+            np.testing.assert_array_equal(decoded_data, expected_data)
+            np.testing.assert_array_equal(failed, expected_failed)
+            np.testing.assert_array_equal(decoded_data[weights <= table.t], data[weights <= table.t])
+
+    def test_capability_check(self):
+        """
+        Tests that t is checked against the designed distance of the code.
+        """
+        self.assertEqual(BCHCode(31, 11).t, 5)
+        self.assertIs(BCHCode(15, 5).bch, self.bch.bch)  # Codecs are shared
+        with self.assertRaises(ValueError):
+            BCHCode(15, 7, 3)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+
+
+class TestBSCChannel(unittest.TestCase):
+
+    def test_transmit_batch(self):
+        """
+        Tests that a batch is transmitted in one call and the error counts match the flipped bits.
+        """
+        for ber in (1e-3, 0.2):  # Sparse and dense error generation
+            channel = BSCChannel(ber, rng=1)
+            input_bits = np.ones((300, 255), dtype=np.uint8)
+            output_bits, flipped_bits_count = channel.transmit(input_bits)
+            self.assertEqual(output_bits.shape, input_bits.shape)
+            np.testing.assert_array_equal(flipped_bits_count, (output_bits != input_bits).sum(axis=1))
+
+    def test_error_rate(self):
+        """
+        Tests that the sparse error positions give the requested bit error rate.
+        """
+        ber = 1e-3
+        rows, cols = BSCChannel(ber, rng=2).error_positions(10000, 1000)
+        self.assertAlmostEqual(len(rows) / 1e7, ber, delta=ber * 0.05)
+        self.assertTrue((cols < 1000).all())
+        self.assertTrue((rows < 10000).all())
+
+    def test_edge_probabilities(self):
+        """
+        Tests that BER 0 leaves the bits untouched and BER 1 flips every bit.
+        """
+        input_bits = np.array([[0, 1, 1, 0, 1]], dtype=np.uint8)
+        output_bits, flipped_bits_count = BSCChannel(0.0).transmit(input_bits)
+        np.testing.assert_array_equal(output_bits, input_bits)
+        output_bits, flipped_bits_count = BSCChannel(1.0).transmit(input_bits)
+        np.testing.assert_array_equal(output_bits, 1 - input_bits)
+        self.assertEqual(flipped_bits_count[0], 5)
+
+    def test_packed_matches_unpacked(self):
+        """
+        Tests that the bit-packed path flips the same bits as the unpacked path for the same seed.
+        """
+        n = 100
+        input_bits = np.random.default_rng(0).integers(0, 2, (50, n), dtype=np.uint8)
+        expected, expected_count = BSCChannel(0.01, rng=5).transmit(input_bits)
+
+        packed_output, flipped_bits_count = BSCChannel(0.01, rng=5).transmit_packed(np.packbits(input_bits, axis=1), n)
+        np.testing.assert_array_equal(np.unpackbits(packed_output, axis=1, count=n), expected)
+        np.testing.assert_array_equal(flipped_bits_count, expected_count)
+
+        # 64-bit words, most significant bit first
+        packed64 = np.zeros((50, 2), dtype=np.uint64)
+        packed64_output, _ = BSCChannel(0.01, rng=5).transmit_packed(packed64, n)
+        as_bytes = packed64_output.astype('>u8').view(np.uint8).reshape(50, 16)
+        np.testing.assert_array_equal(np.unpackbits(as_bytes, axis=1, count=n), expected ^ input_bits)
+
+
+if __name__ == '__main__':
+    unittest.main()
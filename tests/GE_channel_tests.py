@@ -0,0 +1,84 @@
+import unittest
+import numpy as np
+
+from channels.GE_channel import GilbertElliottChannel, symbol_erasures
+from codes.ReedSolomon import ReedSolomon
+
+
+class TestGilbertElliottChannel(unittest.TestCase):
+
+    def test_transmit_batch(self):
+        """
+        Tests that a batch is transmitted in one call and the error counts match the flipped bits.
+        """
+        channel = GilbertElliottChannel(0.01, 0.1, 0.001, 0.8, rng=1)
+        input_bits = np.zeros((200, 127), dtype=np.uint8)
+
+        output_bits, flipped_bits_count, states = channel.transmit(input_bits, return_states=True)
+        self.assertEqual(output_bits.shape, input_bits.shape)
+        self.assertEqual(states.shape, input_bits.shape)
+        np.testing.assert_array_equal(flipped_bits_count, output_bits.sum(axis=1))
+        self.assertTrue((states[:, 0] == 0).all())  # Every frame starts in the Good state
+
+    def test_seeded_generator_is_reproducible(self):
+        """
+        Tests that two channels seeded identically produce identical outputs.
+        """
+        input_bits = np.ones((10, 63), dtype=np.uint8)
+        first = GilbertElliottChannel(0.05, 0.2, 0.01, 0.5, rng=7).transmit(input_bits, return_states=True)
+        second = GilbertElliottChannel(0.05, 0.2, 0.01, 0.5, rng=7).transmit(input_bits, return_states=True)
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a, b)
+
+    def test_state_statistics(self):
+        """
+        Tests that the state sequence matches the Markov chain: Bad-state occupancy and error rate.
+        """
+        p_gb, p_bg, p_g, p_b = 0.02, 0.1, 0.01, 0.5
+        channel = GilbertElliottChannel(p_gb, p_bg, p_g, p_b, rng=3)
+        _, flipped_bits_count, states = channel.transmit(np.zeros((2000, 1000), dtype=np.uint8), return_states=True)
+
+        # Occupancy of the Bad state in the second half of the frames (close to stationary)
+        stationary_bad = p_gb / (p_gb + p_bg)
+        self.assertAlmostEqual(states[:, 500:].mean(), stationary_bad, delta=0.01)
+
+        expected_errors = (np.where(states == 1, p_b, p_g)).sum(axis=1)
+        self.assertAlmostEqual(flipped_bits_count.mean() / expected_errors.mean(), 1.0, delta=0.02)
+
+    def test_never_leaving_good_state(self):
+        """
+        Tests that p_gb = 0 keeps the channel in the Good state.
+        """
+        channel = GilbertElliottChannel(0.0, 0.5, 0.0, 1.0, rng=0)
+        output_bits, flipped_bits_count = channel.transmit(np.zeros(500, dtype=np.uint8))
+        self.assertEqual(flipped_bits_count, 0)
+        self.assertFalse(output_bits.any())
+
+    def test_symbol_erasures(self):
+        """
+        Tests that the symbols overlapping a burst (and its guard band) are marked as erasures.
+        """
+        states = np.zeros((1, 20), dtype=np.uint8)
+        states[0, 9:11] = 1
+        np.testing.assert_array_equal(symbol_erasures(states), [[False, True, False]])
+        np.testing.assert_array_equal(symbol_erasures(states, 4, guard_bits=2), [[False, True, True, True, False]])
+
+    def test_erasures_extend_rs_capacity(self):
+        """
+        Tests that erasures from the state trace let RS decode frames that errors-only decoding fails.
+        """
+        rng = np.random.default_rng(3)
+        rs = ReedSolomon(64)
+        messages = rng.integers(0, 256, (60, rs.k), dtype=np.uint8)
+        channel = GilbertElliottChannel(0.01, 0.1, 0.001, 0.8, rng=4)
+        received_bits, _, states = channel.transmit(np.unpackbits(rs.encode_batch(messages), axis=1),
+                                                    return_states=True)
+        received = np.packbits(received_bits, axis=1)
+
+        errors_only = (rs.decode_batch(received) != messages).any(axis=1).sum()
+        with_erasures = (rs.decode_batch(received, erasures=symbol_erasures(states)) != messages).any(axis=1).sum()
+        self.assertLess(with_erasures, errors_only)
+
+
+if __name__ == '__main__':
+    unittest.main()
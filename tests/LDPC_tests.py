@@ -0,0 +1,149 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from codes.LDPC import (LDPC, BeliefPropagationDecoder, DECODING_METHODS, peg_matrix, quasi_cyclic_matrix,
+                        systematic_generator)
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+
+def gallager_matrix(n, column_weight, row_weight, rng):
+    """
+    Builds a regular Gallager parity-check matrix (test helper).
+    """
+    rows = n // row_weight
+    band = np.zeros((rows, n), dtype=np.uint8)
+    band[np.repeat(np.arange(rows), row_weight), np.arange(n)] = 1
+    return np.vstack([band] + [band[:, rng.permutation(n)] for _ in range(column_weight - 1)])
+
+
+class TestBeliefPropagationDecoder(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.n = 240
+        self.H = gallager_matrix(self.n, 3, 6, rng)
+        # All-zero codeword through a BSC with p = 0.02
+        self.received = (rng.random((200, self.n)) < 0.02).astype(np.uint8)
+        self.llr = np.log(0.98 / 0.02) * (1.0 - 2.0 * self.received)
+
+    def test_edge_structure(self):
+        """
+        Tests that the padded check/variable tables list every edge exactly once.
+        """
+        decoder = BeliefPropagationDecoder(self.H)
+        self.assertEqual(decoder.num_edges, self.H.sum())
+        for table in (decoder.check_edges, decoder.var_edges):
+            edges = np.sort(table[table < decoder.num_edges])
+            np.testing.assert_array_equal(edges, np.arange(decoder.num_edges))
+        np.testing.assert_array_equal(decoder.syndromes(self.received), (self.received @ self.H.T) % 2 == 1)
+
+    def test_methods_correct_errors(self):
+        """
+        Tests that every method corrects most frames and reports consistent convergence flags.
+        """
+        for method in DECODING_METHODS:
+            decoder = BeliefPropagationDecoder(self.H, method=method, max_iterations=30)
+            decoded, iterations, converged = decoder.decode(self.llr)
+
+            np.testing.assert_array_equal(converged, ~decoder.syndromes(decoded).any(axis=1))
+            self.assertGreater((decoded.sum(axis=1) == 0).mean(), 0.9, method)
+            self.assertTrue((iterations <= 30).all())
+            self.assertTrue((iterations[converged] > 0).any())
+
+    def test_early_termination(self):
+        """
+        Tests that codewords stop at iteration 0 and each frame stops when its syndrome is zero.
+        """
+        decoder = BeliefPropagationDecoder(self.H, max_iterations=50)
+        clean = np.full((5, self.n), 4.0)
+        decoded, iterations, converged = decoder.decode(clean)
+        self.assertTrue(converged.all())
+        self.assertFalse(iterations.any())
+        self.assertFalse(decoded.any())
+
+        _, iterations, converged = decoder.decode(self.llr)
+        self.assertLess(iterations[converged].max(), 50)
+        self.assertGreater(len(np.unique(iterations)), 1)  # Frames finish at different iterations
+
+    def test_degree_one_check(self):
+        """
+        Tests that a check of weight 1 leaves every method's messages finite.
+        """
+        H = np.array([[1, 1, 0, 1],
+                      [0, 1, 1, 1],
+                      [1, 0, 1, 1],
+                      [0, 0, 0, 1]], dtype=np.uint8)
+        llr = np.array([[2.0, -0.5, 1.5, 3.0], [1.0, 1.0, -1.0, 0.5]])
+        for method in DECODING_METHODS:
+            decoder = BeliefPropagationDecoder(H, method=method, max_iterations=10)
+            v2c = np.zeros((len(llr), decoder.num_edges + 1))
+            v2c[:, :-1] = llr[:, decoder.edge_vars]
+            if method != "bit-flipping":
+                self.assertTrue(np.isfinite(decoder._check_update(v2c)).all(), method)
+            decoded, _, converged = decoder.decode(llr)
+            np.testing.assert_array_equal(converged, ~decoder.syndromes(decoded).any(axis=1))
+            self.assertFalse(decoded[:, 3].any(), method)  # The weight-1 check forces bit 3 to 0
+
+
+class TestLDPCConstructions(unittest.TestCase):
+
+    def test_peg_matrix(self):
+        """
+        Tests the PEG construction: fixed column weight, near-regular rows and no 4-cycles.
+        """
+        H = peg_matrix(120, 60, 3, np.random.default_rng(0)).astype(np.int64)
+        np.testing.assert_array_equal(H.sum(axis=0), 3)
+        self.assertLessEqual(H.sum(axis=1).max() - H.sum(axis=1).min(), 2)
+        # Two columns sharing two checks form a 4-cycle
+        overlaps = H.T @ H
+        np.fill_diagonal(overlaps, 0)
+        self.assertLessEqual(overlaps.max(), 1)
+
+    def test_quasi_cyclic_matrix(self):
+        """
+        Tests that each base entry becomes a zero block or a shifted identity block.
+        """
+        H = quasi_cyclic_matrix([[0, -1], [2, 1]], 4)
+        self.assertEqual(H.shape, (8, 8))
+        np.testing.assert_array_equal(H[:4, :4], np.eye(4))
+        self.assertFalse(H[:4, 4:].any())
+        np.testing.assert_array_equal(H[4:, :4], np.roll(np.eye(4), 2, axis=1))
+        with self.assertRaises(ValueError):
+            quasi_cyclic_matrix([[4]], 4)
+
+    def test_systematic_generator(self):
+        """
+        Tests that G spans codewords of H and carries the message at the information positions.
+        """
+        H = peg_matrix(60, 30, 3, np.random.default_rng(1))
+        G, info_positions = systematic_generator(H)
+        self.assertFalse(((G.astype(np.int64) @ H.T) % 2).any())
+        np.testing.assert_array_equal(G[:, info_positions], np.eye(len(info_positions)))
+
+    def test_code_round_trip_and_cache(self):
+        """
+        Tests that every construction encodes and decodes, and that cached codes are identical.
+        """
+        rng = np.random.default_rng(2)
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch("codes.cache.CACHE_DIR", cache_dir):
+            codes = [LDPC(96, 48, construction="gallager"), LDPC(96, 48, construction="peg"),
+                     LDPC(96, 48, construction="qc", base_matrix=[[0, 1, 2, 3], [3, -1, 1, 0]], lifting=24)]
+            for code in codes:
+                messages = rng.integers(0, 2, (10, code.k))
+                received = code.encode(messages)
+                received[:, 7] ^= 1
+                decoded, failed = code.decode_batch(received, return_status=True)
+                np.testing.assert_array_equal(decoded, messages)
+                self.assertFalse(failed.any())
+
+            cached = LDPC(96, 48, construction="peg")
+            np.testing.assert_array_equal(cached.H.toarray(), codes[1].H.toarray())
+            np.testing.assert_array_equal(cached.G, codes[1].G)
+            self.assertFalse(np.array_equal(LDPC(96, 48, seed=1).H.toarray(), cached.H.toarray()))
+
+
+if __name__ == '__main__':
+    unittest.main()
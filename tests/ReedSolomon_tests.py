@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+
+from codes.ReedSolomon import ReedSolomon
+
+
+class TestReedSolomon(unittest.TestCase):
+
+    def setUp(self):
+        self.rs = ReedSolomon(10)
+        self.rng = np.random.default_rng(0)
+
+    def test_bytes_round_trip(self):
+        """
+        Tests that bytes, memoryviews and uint8 arrays are accepted and that errors are corrected.
+        """
+        message = b"Reed-Solomon codec test message"
+        encoded = self.rs.encode(memoryview(message))
+        self.assertEqual(len(encoded), self.rs.encoded_length(len(message)))
+
+        received = bytearray(encoded)
+        received[0] ^= 0xFF
+        received[20] ^= 0x01
+        decoded, errata, failed = self.rs.decode(np.frombuffer(bytes(received), dtype=np.uint8))
+        self.assertEqual(decoded, message)
+        np.testing.assert_array_equal(errata, [0, 20])
+        self.assertFalse(failed)
+
+    def test_batch_with_chunks_and_erasures(self):
+        """
+        Tests batched decoding of multi-chunk words, with erasures beyond the error capacity.
+        """
+        messages = self.rng.integers(0, 256, (12, 300), dtype=np.uint8)
+        encoded = self.rs.encode_batch(messages)
+        self.assertEqual(encoded.shape, (12, 320))
+        np.testing.assert_array_equal(self.rs.decode_batch(encoded), messages)
+
+        received = encoded.copy()
+        received[:4, [3, 100, 260, 270]] ^= 0x55  # Errors in both chunks
+        received[4:8, :8] ^= 0x01  # 8 errors in one chunk: more than nsym / 2 ...
+        erasures = np.zeros(received.shape, dtype=bool)
+        erasures[4:8, :8] = True  # ... but correctable as erasures
+
+        decoded, failed, errata = self.rs.decode_batch(received, erasures=erasures, return_status=True,
+                                                       return_errata=True)
+        np.testing.assert_array_equal(decoded, messages)
+        self.assertFalse(failed.any())
+        np.testing.assert_array_equal(np.flatnonzero(errata[0]), [3, 100, 260, 270])
+        self.assertFalse(errata[8:].any())
+
+    def test_failure_mask(self):
+        """
+        Tests that an uncorrectable word is flagged instead of raising.
+        """
+        messages = self.rng.integers(0, 256, (3, 50), dtype=np.uint8)
+        received = self.rs.encode_batch(messages)
+        received[1, :20] ^= 0xFF
+        decoded, failed = self.rs.decode_batch(received, return_status=True)
+        np.testing.assert_array_equal(failed, [False, True, False])
+        np.testing.assert_array_equal(decoded[1], received[1, :50])
+
+    def test_bit_helpers(self):
+        """
+        Tests the bit-level helpers used by main.py.
+        """
+        bits = self.rng.integers(0, 2, 80).astype(np.uint8)
+        encoded_bits = ReedSolomon.encode_text_rs(bits, 4)
+        self.assertEqual(len(encoded_bits), 80 + 32)
+        encoded_bits[5] ^= 1
+        np.testing.assert_array_equal(ReedSolomon.decode_text_rs(encoded_bits, 4), bits)
+        self.assertIs(ReedSolomon(4).codec, ReedSolomon(4).codec)  # Codecs are shared
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks.fec_benchmarks import compare, main, run_benchmarks, time_call, time_calls
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.timing = {"warmup": 1, "repeats": 3, "min_time": 0.0002, "max_time": 0.05}
+
+    def test_time_call(self):
+        """
+        Tests that short calls are looped and that the repeat count respects the time budget.
+        """
+        calls = []
+        timings = time_call(lambda: calls.append(1), warmup=2, repeats=5, min_time=0.001, max_time=1.0)
+        self.assertEqual(len(timings), 5)
+        self.assertGreater(len(calls), 7)  # More than one call per measurement
+        self.assertTrue((timings > 0).all())
+
+    def test_time_calls(self):
+        """
+        Tests that latencies are timed one call at a time, up to the sample count or the time budget.
+        """
+        calls = []
+        latencies = time_calls(lambda: calls.append(1), samples=250)
+        self.assertEqual(len(latencies), 250)
+        self.assertEqual(len(calls), 250)
+        self.assertEqual(len(time_calls(lambda: None, samples=1000, max_time=0.0)), 3)
+
+    def test_run(self):
+        """
+        Tests the records of a small run of one codec and one channel.
+        """
+        output = run_benchmarks(["hamming:4"], ["bsc"], batch_sizes=[1, 16], frame_sizes=[63], verbose=False,
+                                latency_samples=200, **self.timing)
+        names = [record["name"] for record in output["results"]]
+        self.assertEqual(names, ["encode/hamming:4/batch=1", "decode/hamming:4/batch=1", "encode/hamming:4/batch=16",
+                                 "decode/hamming:4/batch=16", "channel/bsc/n=63/batch=1", "channel/bsc/n=63/batch=16"])
+        for record in output["results"]:
+            self.assertGreater(record["mbps"], 0)
+            self.assertLessEqual(record["latency_us"]["p50"], record["latency_us"]["p99"])
+            self.assertEqual(record["latency_samples"], 200)
+        self.assertIn("numpy", output["metadata"])
+
+    def test_compare(self):
+        """
+        Tests that only throughput losses beyond the threshold are regressions, from the command line too.
+        """
+        baseline = {"results": [{"name": "a", "mbps": 10.0}, {"name": "b", "mbps": 10.0}, {"name": "c", "mbps": 1.0}]}
+        current = {"results": [{"name": "a", "mbps": 9.5}, {"name": "b", "mbps": 5.0}, {"name": "d", "mbps": 1.0}]}
+        rows = compare(baseline, current, threshold=0.1)
+        self.assertEqual([(row[0], row[4]) for row in rows], [("a", False), ("b", True)])
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("baseline.json", "current.json")]
+            for path, output in zip(paths, (baseline, current)):
+                with open(path, "w") as file:
+                    json.dump(output, file)
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(["compare", *paths]), 1)
+                self.assertEqual(main(["compare", *paths, "--threshold", "0.6"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from channels.GE_channel import GilbertElliottChannel
+from codes.bitvector import BitVector, gf2_matmul, gf2_matvec
+from codes.hamming_code import HammingCode
+
+
+class TestBitVector(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.bits = self.rng.integers(0, 2, (20, 150), dtype=np.uint8)
+
+    def test_round_trip(self):
+        """
+        Tests packing and unpacking, including the byte layout shared with np.packbits.
+        """
+        packed = BitVector.from_bits(self.bits)
+        self.assertEqual(packed.words.shape, (20, 3))
+        np.testing.assert_array_equal(packed.to_bits(), self.bits)
+        np.testing.assert_array_equal(packed.to_bytes(), np.packbits(self.bits, axis=1))
+        self.assertEqual(BitVector.from_bytes(np.packbits(self.bits, axis=1), 150), packed)
+        self.assertEqual(BitVector.from_bytes(b"\xa5").to_bits().tolist(), [1, 0, 1, 0, 0, 1, 0, 1])
+
+    def test_xor_popcount_distance(self):
+        """
+        Tests XOR, popcount and Hamming distance against the unpacked equivalents.
+        """
+        other = self.rng.integers(0, 2, (20, 150), dtype=np.uint8)
+        a, b = BitVector.from_bits(self.bits), BitVector.from_bits(other)
+        np.testing.assert_array_equal((a ^ b).to_bits(), self.bits ^ other)
+        np.testing.assert_array_equal(a.popcount(), self.bits.sum(axis=1))
+        np.testing.assert_array_equal(a.hamming_distance(b), (self.bits != other).sum(axis=1))
+
+    def test_slicing(self):
+        """
+        Tests batch indexing and bit slicing (word-aligned and unaligned).
+        """
+        packed = BitVector.from_bits(self.bits)
+        np.testing.assert_array_equal(packed[3:5].to_bits(), self.bits[3:5])
+        for start, stop in ((0, 70), (64, 150), (5, 133)):
+            sliced = packed.slice_bits(start, stop)
+            np.testing.assert_array_equal(sliced.to_bits(), self.bits[:, start:stop])
+            np.testing.assert_array_equal(sliced.popcount(), self.bits[:, start:stop].sum(axis=1))
+
+    def test_matvec(self):
+        """
+        Tests the packed GF(2) matrix-vector product against the unpacked matrix product.
+        """
+        matrix = self.rng.integers(0, 2, (40, 150), dtype=np.uint8)
+        product = gf2_matvec(BitVector.from_bits(matrix), BitVector.from_bits(self.bits))
+        np.testing.assert_array_equal(product.to_bits(), gf2_matmul(self.bits, matrix.T))
+
+    def test_codes_and_channels_accept_packed(self):
+        """
+        Tests that the Hamming code and both channels work on packed frames end to end.
+        """
+        hamming = HammingCode(11)
+        data = self.rng.integers(0, 2, (20, 11), dtype=np.uint8)
+        encoded = hamming.encode_batch(BitVector.from_bits(data))
+        np.testing.assert_array_equal(encoded.to_bits(), hamming.encode_batch(data))
+
+        received, flipped_bits_count = BSCChannel(0.02, rng=1).transmit(encoded)
+        self.assertIsInstance(received, BitVector)
+        np.testing.assert_array_equal(received.hamming_distance(encoded), flipped_bits_count)
+        decoded = hamming.decode_batch(received)
+        np.testing.assert_array_equal(decoded.to_bits(), hamming.decode_batch(received.to_bits()))
+
+        received, flipped_bits_count = GilbertElliottChannel(0.1, 0.2, 0.01, 0.5, rng=2).transmit(encoded)
+        np.testing.assert_array_equal(received.hamming_distance(encoded), flipped_bits_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import shutil
+import tempfile
+
+import codes.cache
+
+# (FEC_CACHE_DIR, codes.cache.CACHE_DIR, temporary directory) of each isolated module, innermost last
+_SAVED = []
+
+
+def setUpModule():
+    """
+    Points the code cache at a new temporary directory for the test module importing this function.
+
+    Test modules building codes whose matrices or syndrome tables are cached import `setUpModule`
+    and `tearDownModule` from here, so that neither unittest nor pytest ever writes to the user's
+    cache. The environment variable reaches the spawned sweep workers and the subprocesses.
+    """
+    directory = tempfile.mkdtemp(prefix="fec-test-cache-")
+    _SAVED.append((os.environ.get("FEC_CACHE_DIR"), codes.cache.CACHE_DIR, directory))
+    os.environ["FEC_CACHE_DIR"] = directory
+    codes.cache.CACHE_DIR = directory
+
+
+def tearDownModule():
+    """
+    Restores the previous cache location and removes the temporary directory.
+    """
+    environment, cache_dir, directory = _SAVED.pop()
+    if environment is None:
+        os.environ.pop("FEC_CACHE_DIR", None)
+    else:
+        os.environ["FEC_CACHE_DIR"] = environment
+    codes.cache.CACHE_DIR = cache_dir
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,18 @@
+import os
+import shutil
+import tempfile
+
+import codes.cache
+
+# Code matrices and syndrome tables built by the tests go to a temporary cache, never the user's.
+# The environment variable reaches the spawned sweep workers and the subprocesses started by tests
+_CACHE_DIR = tempfile.mkdtemp(prefix="fec-test-cache-")
+os.environ["FEC_CACHE_DIR"] = _CACHE_DIR
+codes.cache.CACHE_DIR = _CACHE_DIR
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Removes the temporary cache once the test session is over.
+    """
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
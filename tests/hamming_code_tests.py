@@ -1,3 +1,4 @@
+import itertools
 import unittest
 import numpy as np
 
@@ -74,6 +75,56 @@ class TestHammingCode(unittest.TestCase):
             corrected_data = hamming.decode(encoded_data)
             np.testing.assert_array_equal(corrected_data, expected_corrected)
 
+    def test_hamming_batch_matches_per_word(self):
+        """
+        Tests that the batched encoder and decoder give the same results as the per-word methods,
+        for every data word and every single-bit error position.
+        """
+        for m in (4, 5, 11):
+            hamming = HammingCode(m)
+            data = ((np.arange(2 ** m)[:, None] >> np.arange(m)[::-1]) & 1).astype(np.uint8)
+
+            encoded = hamming.encode_batch(data)
+            expected_encoded = np.array([hamming.encode(word) for word in data])
+            np.testing.assert_array_equal(encoded, expected_encoded)
+
+            for position in range(hamming.n):
+                received = encoded.copy()
+                received[:, position] ^= 1
+                decoded, uncorrectable = hamming.decode_batch(received, return_status=True)
+                expected_decoded = np.array([hamming.decode(word.copy()) for word in received])
+                np.testing.assert_array_equal(decoded, expected_decoded)
+                np.testing.assert_array_equal(decoded, data)
+                self.assertFalse(uncorrectable.any())
+
+    def test_hamming_batch_uncorrectable(self):
+        """
+        Tests that the batched decoder flags words whose syndrome points outside a shortened code.
+        """
+        hamming = HammingCode(5)  # (9,5) code, syndromes 10..15 are out of range
+        received = hamming.encode_batch(np.zeros((1, 5), dtype=np.uint8))
+        received[0, [1, 7]] ^= 1  # Syndrome 2 ^ 8 = 10
+
+        decoded, uncorrectable = hamming.decode_batch(received, return_status=True)
+        self.assertTrue(uncorrectable[0])
+        np.testing.assert_array_equal(decoded[0], received[0, hamming.data_positions])
+
+    def test_hamming_uncorrectable_matches_per_word(self):
+        """
+        Tests that both decoders return the received data bits for every uncorrectable weight-2 error.
+        """
+        hamming = HammingCode(5)
+        codeword = hamming.encode_batch(np.array([[1, 0, 1, 1, 0]], dtype=np.uint8))[0]
+        received = np.tile(codeword, (hamming.n * (hamming.n - 1) // 2, 1))
+        for row, (first, second) in enumerate(itertools.combinations(range(hamming.n), 2)):
+            received[row, [first, second]] ^= 1
+
+        decoded, uncorrectable = hamming.decode_batch(received, return_status=True)
+        self.assertTrue(uncorrectable.any())
+        expected = np.array([hamming.decode(word.copy()) for word in received])
+        np.testing.assert_array_equal(decoded, expected)
+        np.testing.assert_array_equal(decoded[uncorrectable], received[uncorrectable][:, hamming.data_positions])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import itertools
+import unittest
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from channels.GE_channel import GilbertElliottChannel
+from codes.hamming_code import HammingCode
+from codes.interleaver import BlockInterleaver
+from simulation.scripts.importance_sampling import (biased_flip_probability, estimate_error_rates,
+                                                    importance_channel_args)
+from simulation.scripts.sweep import StoppingRule, WorkUnit, run_sweep
+
+
+class TestImportanceSampling(unittest.TestCase):
+
+    def test_likelihoods_sum_to_one(self):
+        """
+        Tests that the channel log-likelihoods define probability distributions over short frames.
+        """
+        n = 4
+        patterns = np.array(list(itertools.product([0, 1], repeat=n)), dtype=np.uint8)
+        bsc = BSCChannel(0.1)
+        self.assertAlmostEqual(np.exp(bsc.log_likelihood(patterns)).sum(), 1.0)
+
+        # Frames start in the Good state, so only traces with a leading 0 are possible
+        ge = GilbertElliottChannel(0.2, 0.3, 0.05, 0.6)
+        traces = patterns[patterns[:, 0] == 0]
+        errors = np.repeat(patterns, len(traces), axis=0)
+        states = np.tile(traces, (len(patterns), 1))
+        self.assertAlmostEqual(np.exp(ge.log_likelihood(errors, states)).sum(), 1.0)
+
+    def test_bsc_low_ber(self):
+        """
+        Tests the estimate for Hamming(7,4) at BER 1e-4 against the exact frame error rate.
+        """
+        p = 1e-4
+        hamming = HammingCode(4)
+        exact = 1 - (1 - p) ** 7 - 7 * p * (1 - p) ** 6  # More than one error in the frame
+
+        biased = BSCChannel(biased_flip_probability(p, 7, 2), rng=1)
+        estimate = estimate_error_rates(hamming, BSCChannel(p), biased, trials=20000, rng=2)
+
+        self.assertAlmostEqual(estimate.frame_error_rate / exact, 1.0, delta=0.1)
+        self.assertLess(estimate.frame_error_relative_error, 0.05)
+        self.assertGreater(estimate.bit_error_rate, 0.0)
+
+    def test_ge_matches_monte_carlo(self):
+        """
+        Tests the Gilbert-Elliott estimate against plain Monte Carlo where the latter is affordable.
+        """
+        hamming = HammingCode(4)
+        channel = GilbertElliottChannel(0.01, 0.1, 0.001, 0.3)
+
+        plain = estimate_error_rates(hamming, channel, GilbertElliottChannel(0.01, 0.1, 0.001, 0.3, rng=3),
+                                     trials=200000, rng=4)
+        biased = GilbertElliottChannel(0.05, 0.1, 0.01, 0.3, rng=5)
+        weighted = estimate_error_rates(hamming, channel, biased, trials=50000, rng=6)
+
+        tolerance = 4 * np.sqrt(plain.frame_error_variance + weighted.frame_error_variance)
+        self.assertAlmostEqual(weighted.frame_error_rate, plain.frame_error_rate, delta=tolerance)
+
+    def test_sweep_unit(self):
+        """
+        Tests an importance-sampled work unit of a sweep against the exact Hamming(7,4) error rates.
+        """
+        p = 1e-4
+        exact = 1 - (1 - p) ** 7 - 7 * p * (1 - p) ** 6
+        word = np.random.default_rng(0).integers(0, 2, 4)
+        unit = WorkUnit(HammingCode, (4,), BSCChannel, (p,), word,
+                        biased_channel_args=importance_channel_args(BSCChannel, (p,), 7, 2, below=1e-3))
+        plain = WorkUnit(HammingCode, (4,), BSCChannel, (p,), word)
+        weighted, counts = run_sweep([unit, plain], StoppingRule(max_trials=20000), seed=1, max_workers=1)
+
+        self.assertTrue(weighted.weighted)
+        self.assertAlmostEqual(weighted.frame_error_rate / exact, 1.0, delta=0.1)
+        lower, upper = weighted.frame_confidence_interval()
+        self.assertLess(lower, exact)
+        self.assertGreater(upper, exact)
+        self.assertGreater(weighted.bit_error_variance, 0.0)
+        self.assertLess(weighted.frame_error_variance, (weighted.frame_error_rate / 10) ** 2)
+
+        # Plain Monte Carlo sees nothing at this rate
+        self.assertFalse(counts.weighted)
+        self.assertEqual(counts.frame_errors, 0)
+
+    def test_importance_channel_args(self):
+        """
+        Tests that only BSC points below the threshold are biased, and not next to an interleaver.
+        """
+        self.assertEqual(importance_channel_args(BSCChannel, (1e-6,), 63, 5, below=1e-4), (5 / 63,))
+        self.assertIsNone(importance_channel_args(BSCChannel, (1e-3,), 63, 5, below=1e-4))
+        self.assertIsNone(importance_channel_args(GilbertElliottChannel, (1e-6, 0.1, 0.0, 0.5), 63, 5, below=1e-4))
+        with self.assertRaises(ValueError):
+            WorkUnit(HammingCode, (4,), BSCChannel, (1e-6,), [0, 1, 1, 0], biased_channel_args=(0.1,),
+                     interleaver=BlockInterleaver(2, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from channels.AWGN_channel import AWGNChannel
+from channels.BSC_channel import BSCChannel
+from codes import instrumentation
+from codes.hamming_code import HammingCode
+from codes.LDPC import LDPC
+from simulation.scripts.sweep import StoppingRule, WorkUnit, run_sweep
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        input_bits = np.random.default_rng(0).integers(0, 2, 11)
+        self.units = [WorkUnit(HammingCode, (4,), BSCChannel, (ber,), input_bits, key=(ber,)) for ber in (0.01, 0.1)]
+        self.rule = StoppingRule(max_trials=300, initial_batch=100, growth=1.0)
+
+    def tearDown(self):
+        instrumentation.disable()
+
+    def test_disabled_is_a_no_op(self):
+        """
+        Tests that stages and counters do nothing while instrumentation is disabled.
+        """
+        self.assertIsNone(instrumentation.active())
+        with instrumentation.stage("encode"):
+            instrumentation.count("frames", 10)
+        self.assertIsNone(instrumentation.disable())
+
+    def test_metrics(self):
+        """
+        Tests the timers, counters, merging and the JSON and Prometheus outputs.
+        """
+        metrics = instrumentation.enable()
+        with instrumentation.stage("encode"):
+            instrumentation.count("frames", 10)
+        with instrumentation.stage("encode"):
+            instrumentation.count("frames", 5)
+        other = instrumentation.Metrics()
+        other.count("decode_failures", 2)
+        other.add_time("decode", 0.5)
+        metrics.merge(other.as_dict())
+
+        self.assertEqual(metrics.timers["encode"][1], 2)
+        self.assertEqual(metrics.counters, {"frames": 15, "decode_failures": 2})
+        line = metrics.to_json_line(config="run.toml")
+        self.assertNotIn("\n", line)
+        self.assertIn('"config": "run.toml"', line)
+
+        text = metrics.to_prometheus(run='a"b')
+        self.assertIn('fec_stage_seconds_total{run="a\\"b",stage="decode"} 0.5', text)
+        self.assertIn('fec_stage_calls_total{run="a\\"b",stage="encode"} 2', text)
+        self.assertIn("# TYPE fec_frames_total counter", text)
+        self.assertIn('fec_frames_total{run="a\\"b"} 15', text)
+
+    def test_sweep_metrics(self):
+        """
+        Tests that serial and parallel sweeps count the same frames and time every stage.
+        """
+        for workers in (1, 2):
+            metrics = instrumentation.enable()
+            counts = run_sweep(self.units, self.rule, seed=1, max_workers=workers, callback=lambda *args: None)
+            instrumentation.disable()
+
+            self.assertEqual(metrics.counters["frames"], sum(c.frames for c in counts))
+            self.assertEqual(metrics.counters["bits"], sum(c.bits for c in counts))
+            self.assertEqual(metrics.counters["batches"], 6)
+            self.assertEqual(metrics.timers["callback"][1], 2)
+            for name in ("chunking", "encode", "channel", "decode"):
+                self.assertEqual(metrics.timers[name][1], 6 * (2 if name == "chunking" else 1))
+
+    def test_decoder_iterations(self):
+        """
+        Tests that the LDPC decoder reports its iterations and failures.
+        """
+        unit = WorkUnit(LDPC, (15, 7), AWGNChannel, (1.0, 7 / 15), np.ones(7, dtype=np.uint8))
+        metrics = instrumentation.enable()
+        run_sweep([unit], StoppingRule(max_trials=200), seed=2, max_workers=1)
+        self.assertGreater(metrics.counters["decoder_iterations"], 0)
+        self.assertIn("decode_failures", metrics.counters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+
+from channels.GE_channel import GilbertElliottChannel
+from codes.BCH_code import BCHCode
+from codes.interleaver import BlockInterleaver, ConvolutionalInterleaver, RandomInterleaver
+from simulation.scripts.sweep import StoppingRule, WorkUnit, run_sweep
+
+
+class TestInterleavers(unittest.TestCase):
+
+    def test_round_trip(self):
+        """
+        Tests that deinterleaving restores batches of bits and LLRs for every interleaver.
+        """
+        rng = np.random.default_rng(0)
+        frames = rng.integers(0, 2, (5, 4 * 15)).astype(np.uint8)
+        for interleaver in (BlockInterleaver(4, 15), RandomInterleaver(4, 15), ConvolutionalInterleaver(4, 15)):
+            interleaved = interleaver.interleave(frames)
+            self.assertEqual(interleaved.shape, (5, interleaver.interleaved_length))
+            np.testing.assert_array_equal(interleaver.deinterleave(interleaved), frames)
+            llrs = 1.0 - 2.0 * interleaved
+            np.testing.assert_array_equal(interleaver.deinterleave(llrs), 1.0 - 2.0 * frames)
+
+    def test_bursts_are_spread(self):
+        """
+        Tests that a burst of `depth` channel bits hits each codeword at most once.
+        """
+        for interleaver in (BlockInterleaver(8, 31), ConvolutionalInterleaver(8, 31)):
+            for start in range(0, interleaver.interleaved_length - 8, 5):
+                burst = np.zeros(interleaver.interleaved_length, dtype=np.uint8)
+                burst[start:start + 8] = 1
+                errors = interleaver.deinterleave(burst).reshape(8, 31)
+                self.assertLessEqual(errors.sum(axis=1).max(), 1)
+
+    def test_random_permutation_cached(self):
+        """
+        Tests that random interleavers with the same length and seed share their permutation.
+        """
+        self.assertIs(RandomInterleaver(4, 15)._forward, RandomInterleaver(2, 30)._forward)
+        self.assertFalse(np.array_equal(RandomInterleaver(4, 15, seed=1)._forward, RandomInterleaver(4, 15)._forward))
+
+    def test_sweep_over_depth(self):
+        """
+        Tests that deeper interleaving lowers the frame error rate on a bursty channel.
+        """
+        units = [WorkUnit(BCHCode, (63, 39), GilbertElliottChannel, (0.002, 0.1, 0.0, 0.5), np.ones(117),
+                          key=depth, interleaver=BlockInterleaver(depth, 63)) for depth in (1, 16)]
+        shallow, deep = run_sweep(units, stopping=StoppingRule(max_trials=1000), seed=0, max_workers=1)
+        self.assertLess(deep.frame_error_rate, shallow.frame_error_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
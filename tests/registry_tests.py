@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from codes.hamming_code import HammingCode
+from codes.registry import Codec, codec_spec, fit_spec, get_codec, parse_spec
+from simulation.scripts.sweep import WorkUnit, simulate_samples
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+
+class TestCodecRegistry(unittest.TestCase):
+
+    def test_parse_spec(self):
+        """
+        Tests positional and keyword arguments and the canonical form of specs.
+        """
+        self.assertEqual(parse_spec("bch:127,113"), ("bch", (127, 113), {}))
+        self.assertEqual(parse_spec(" LDPC:63, 32, construction=gallager, max_iterations=20"),
+                         ("ldpc", (63, 32), {"construction": "gallager", "max_iterations": 20}))
+        self.assertEqual(codec_spec("ldpc", 63, 32, method="min-sum", construction="qc"),
+                         "ldpc:63,32,construction=qc,method=min-sum")
+        with self.assertRaises(ValueError):
+            parse_spec("turbo:100")
+        with self.assertRaises(ValueError):
+            parse_spec("bch:n=15,7")
+
+    def test_memoized(self):
+        """
+        Tests that equivalent specs share one codec instance.
+        """
+        self.assertIs(get_codec("hamming:11"), get_codec(" hamming: 11 "))
+        self.assertIsInstance(get_codec("hamming:11"), HammingCode)
+
+    def test_common_interface(self):
+        """
+        Tests that every family round-trips a batch through the Codec interface and flags failures.
+        """
+        rng = np.random.default_rng(0)
+        for spec in ("hamming:11", "bch:15,7", "ldpc:63,32", "rs:4,20"):
+            codec = get_codec(spec)
+            self.assertIsInstance(codec, Codec)
+            self.assertAlmostEqual(codec.rate, codec.k / codec.n)
+
+            messages = rng.integers(0, 2, (8, codec.k), dtype=np.uint8)
+            encoded = codec.encode_batch(messages)
+            self.assertEqual(encoded.shape, (8, codec.n))
+            encoded[:, 0] ^= 1
+            decoded, failed = codec.decode_batch(encoded, return_status=True)
+            np.testing.assert_array_equal(decoded, messages, err_msg=spec)
+            self.assertFalse(failed.any())
+
+    def test_reed_solomon_failure_status(self):
+        """
+        Tests that the bit-level Reed-Solomon adapter flags words with too many byte errors.
+        """
+        codec = get_codec("rs:2,10")
+        messages = np.zeros((2, codec.k), dtype=np.uint8)
+        encoded = codec.encode_batch(messages)
+        encoded[1, ::8] ^= 1  # One bit error in every byte of the second word
+        _, failed = codec.decode_batch(encoded, return_status=True)
+        np.testing.assert_array_equal(failed, [False, True])
+
+    def test_fit_spec(self):
+        """
+        Tests that the smallest fitting code of each family is chosen.
+        """
+        self.assertEqual(fit_spec("hamming", 20), "hamming:20")
+        self.assertEqual(fit_spec("bch", 7), "bch:15,7")
+        self.assertEqual(fit_spec("bch", 100), "bch:127,113")
+        self.assertEqual(fit_spec("ldpc", 40), "ldpc:63,40")
+        self.assertEqual(fit_spec("rs", 40, nsym=4), "rs:4,9")
+        with self.assertRaises(ValueError):
+            fit_spec("bch", 500)
+
+    def test_sweep_with_specs(self):
+        """
+        Tests that sweep units built from specs match units built from the code class.
+        """
+        word = np.random.default_rng(1).integers(0, 2, 22)
+        # The units are different points (and draw different streams in a sweep): same batch seed here
+        seed = np.random.SeedSequence(7)
+        by_spec = simulate_samples(WorkUnit(get_codec, ("hamming:11",), BSCChannel, (0.02,), word), seed, 300)
+        by_class = simulate_samples(WorkUnit(HammingCode, (11,), BSCChannel, (0.02,), word), seed, 300)
+        self.assertEqual(repr(by_spec), repr(by_class))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from codes.hamming_code import HammingCode
+from simulation.scripts.report import MANIFEST, panel_data, render_report
+from simulation.scripts.result_store import ResultStore
+from simulation.scripts.sweep import StoppingRule, WorkUnit, run_sweep
+
+
+class TestReport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.sqlite")
+        self.output = os.path.join(self.directory.name, "figures")
+        rng = np.random.default_rng(0)
+        self.words = {size: rng.integers(0, 2, size) for size in (11, 22)}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def sweep(self, word_sizes, max_trials=100):
+        """
+        Runs a small Hamming sweep over three BERs into the store.
+        """
+        units = [WorkUnit(HammingCode, (m,), BSCChannel, (ber,), self.words[size], key=(ber, m))
+                 for size in word_sizes for m in (4, 11) for ber in (0.001, 0.01, 0.1)]
+        with ResultStore(self.path) as store:
+            run_sweep(units, StoppingRule(max_trials=max_trials), seed=0, max_workers=1, store=store)
+
+    def test_panel_data(self):
+        """
+        Tests that points are grouped by word size into one curve per code, ordered by swept value.
+        """
+        self.sweep([11, 22])
+        with ResultStore(self.path) as store:
+            panels = panel_data(store.results())
+        self.assertEqual(sorted(panels), [("BSCChannel", 11, ""), ("BSCChannel", 22, "")])
+        curves = panels[("BSCChannel", 11, "")]
+        self.assertEqual(sorted(curves), ["HammingCode(11)", "HammingCode(4)"])
+        self.assertEqual([x for x, _ in curves["HammingCode(4)"]], [0.001, 0.01, 0.1])
+
+    def test_only_changed_panels_are_rendered(self):
+        """
+        Tests that a second report draws nothing, and that new points redraw only their panel.
+        """
+        self.sweep([11])
+        first = render_report(self.path, self.output)
+        self.assertEqual([os.path.basename(path) for path in first], ["bsc_word11.png"])
+        self.assertTrue(os.path.getsize(first[0]) > 0)
+        self.assertEqual(render_report(self.path, self.output), [])
+
+        self.sweep([11, 22])
+        self.assertEqual([os.path.basename(path) for path in render_report(self.path, self.output)],
+                         ["bsc_word22.png"])
+
+        # More trials change the counts of the first panel too
+        self.sweep([11, 22], max_trials=300)
+        self.assertEqual(len(render_report(self.path, self.output)), 2)
+        with open(os.path.join(self.output, MANIFEST)) as file:
+            self.assertEqual(sorted(json.load(file)), ["bsc_word11.png", "bsc_word22.png"])
+        self.assertEqual(len(render_report(self.path, self.output, force=True)), 2)
+
+    def test_sweep_does_not_import_matplotlib(self):
+        """
+        Tests that importing the report (as the sweep scripts do) leaves matplotlib unloaded.
+        """
+        code = "import sys, simulation.scripts.report; print('matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
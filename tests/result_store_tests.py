@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from codes.hamming_code import HammingCode
+from codes.interleaver import BlockInterleaver
+from simulation.scripts.result_store import ResultStore
+from simulation.scripts.sweep import StoppingRule, WorkUnit, run_sweep
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.sqlite")
+        word = np.random.default_rng(0).integers(0, 2, 20)
+        self.units = [WorkUnit(HammingCode, (11,), BSCChannel, (ber,), word, key=(ber,)) for ber in (0.01, 0.05)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def rule(self, max_trials):
+        """
+        Returns a rule with fixed-size batches, so that runs of different lengths share their batches.
+        """
+        return StoppingRule(max_trials=max_trials, initial_batch=50, growth=1.0)
+
+    def test_resume_matches_uninterrupted_run(self):
+        """
+        Tests that a sweep stopped early and resumed gives the counts of an uninterrupted sweep.
+        """
+        uninterrupted = run_sweep(self.units, stopping=self.rule(400), seed=5, max_workers=1)
+        with ResultStore(self.path) as store:
+            partial = run_sweep(self.units, stopping=self.rule(150), seed=5, max_workers=1, store=store)
+        self.assertEqual([counts.samples for counts in partial], [150, 150])
+
+        with ResultStore(self.path) as store:
+            resumed = run_sweep(self.units, stopping=self.rule(400), seed=5, max_workers=1, store=store)
+        self.assertEqual([repr(counts) for counts in resumed], [repr(counts) for counts in uninterrupted])
+
+    def test_completed_points_are_not_simulated_again(self):
+        """
+        Tests that finished points are read from the store without simulating new batches.
+        """
+        with ResultStore(self.path) as store:
+            first = run_sweep(self.units, stopping=self.rule(100), seed=1, max_workers=1, store=store)
+            finished = []
+            again = run_sweep(self.units, stopping=self.rule(100), seed=1, max_workers=1, store=store,
+                              callback=lambda unit, counts: finished.append(unit.key))
+            batches = store.connection.execute("SELECT COUNT(*) FROM batches").fetchone()[0]
+        self.assertEqual([repr(counts) for counts in again], [repr(counts) for counts in first])
+        self.assertEqual(finished, [(0.01,), (0.05,)])
+        self.assertEqual(batches, 4)
+
+    def test_points_are_keyed_by_seed_and_interleaver(self):
+        """
+        Tests that the seed and the interleaver are part of a point's identity.
+        """
+        unit = self.units[0]
+        interleaved = WorkUnit(HammingCode, (11,), BSCChannel, (0.01,), unit.input_bits, key=(0.01,),
+                               interleaver=BlockInterleaver(4, 15))
+        with ResultStore(self.path) as store:
+            ids = {store.point_id(unit, 0), store.point_id(unit, 1), store.point_id(interleaved, 0)}
+            self.assertEqual(len(ids), 3)
+            self.assertEqual(store.point_id(unit, 0), store.point_id(unit, 0))
+
+    def test_results(self):
+        """
+        Tests that the stored points are listed with their decoded parameters and merged counts.
+        """
+        with ResultStore(self.path) as store:
+            counts = run_sweep(self.units, stopping=self.rule(100), seed=2, max_workers=1, store=store)
+            rows = store.results()
+        self.assertEqual([row[:4] for row in rows], [("HammingCode", (11,), "BSCChannel", (0.01,)),
+                                                     ("HammingCode", (11,), "BSCChannel", (0.05,))])
+        self.assertEqual([row[6] for row in rows], [20, 20])
+        self.assertEqual([repr(row[8]) for row in rows], [repr(c) for c in counts])
+
+    def test_importance_sampled_points(self):
+        """
+        Tests that the weighted counts of importance-sampled points are stored and resumed exactly.
+        """
+        unit = self.units[0]
+        biased = WorkUnit(HammingCode, (11,), BSCChannel, (0.01,), unit.input_bits, key=(0.01,),
+                          biased_channel_args=(0.1,))
+        with ResultStore(self.path) as store:
+            self.assertNotEqual(store.point_id(unit, 0), store.point_id(biased, 0))
+            partial, = run_sweep([biased], stopping=self.rule(100), seed=2, max_workers=1, store=store)
+            resumed, = run_sweep([biased], stopping=self.rule(300), seed=2, max_workers=1, store=store)
+            self.assertTrue(store.load(store.point_id(biased, 2))[0].weighted)
+        uninterrupted, = run_sweep([biased], stopping=self.rule(300), seed=2, max_workers=1)
+        self.assertTrue(partial.weighted)
+        self.assertEqual(resumed.samples, 300)
+        self.assertAlmostEqual(resumed.bit_errors, uninterrupted.bit_errors)
+        self.assertAlmostEqual(resumed.frame_error_squares, uninterrupted.frame_error_squares)
+
+    def test_resume_after_grid_edit(self):
+        """
+        Tests that a point resumes on its own stream after points were added before it, and that a
+        point stored from another stream is refused.
+        """
+        extra = WorkUnit(HammingCode, (11,), BSCChannel, (0.02,), self.units[0].input_bits, key=(0.02,))
+        with ResultStore(self.path) as store:
+            run_sweep(self.units, stopping=self.rule(100), seed=2, max_workers=1, store=store)
+            resumed = run_sweep([extra] + self.units, stopping=self.rule(300), seed=2, max_workers=1, store=store)
+        uninterrupted = run_sweep(self.units, stopping=self.rule(300), seed=2, max_workers=1)
+        self.assertEqual([repr(c) for c in resumed[1:]], [repr(c) for c in uninterrupted])
+
+        with ResultStore(self.path) as store, mock.patch("simulation.scripts.sweep.STREAM_VERSION", 2):
+            with self.assertRaises(ValueError):
+                run_sweep(self.units, stopping=self.rule(400), seed=2, max_workers=1, store=store)
+
+    def test_rejects_older_store(self):
+        """
+        Tests that a store written before importance sampling was supported is not reused.
+        """
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE points (id INTEGER PRIMARY KEY, code TEXT NOT NULL)")
+        connection.close()
+        with self.assertRaises(ValueError):
+            ResultStore(self.path)
+
+    def test_requires_seed(self):
+        """
+        Tests that a stored sweep needs an explicit seed.
+        """
+        with ResultStore(self.path) as store, self.assertRaises(ValueError):
+            run_sweep(self.units, seed=None, max_workers=1, store=store)
+
+
+if __name__ == "__main__":
+    unittest.main()
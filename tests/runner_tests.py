@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import numpy as np
+
+import main
+from simulation.scripts import runner
+from simulation.scripts.runner import build_units, grid_points, load_config, run_config
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {
+            "code": {"type": "hamming", "params": [[4], [11]]},
+            "channel": {"type": "bsc"},
+            "grid": {"values": [0.0, 0.05]},
+            "word_sizes": [11, 20],
+            "stopping": {"max_trials": 200},
+            "seed": 3,
+            "workers": 1,
+        }
+
+    def test_load_config(self):
+        """
+        Tests that JSON and TOML configs load to the same dictionary.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            json_path, toml_path = os.path.join(directory, "run.json"), os.path.join(directory, "run.toml")
+            with open(json_path, "w") as file:
+                json.dump({"seed": 3, "code": {"type": "bch", "params": [[63, 39]]}}, file)
+            with open(toml_path, "w") as file:
+                file.write('seed = 3\n[code]\ntype = "bch"\nparams = [[63, 39]]\n')
+            self.assertEqual(load_config(json_path), load_config(toml_path))
+            with self.assertRaises(ValueError):
+                load_config(os.path.join(directory, "run.ini"))
+
+    def test_grid_points(self):
+        """
+        Tests the explicit and generated grids.
+        """
+        self.assertEqual(grid_points([1, 2]), [1.0, 2.0])
+        np.testing.assert_allclose(grid_points({"logspace": [-3, -1, 3]}), [1e-3, 1e-2, 1e-1])
+        np.testing.assert_allclose(grid_points({"arange": [0.0, 1.5, 0.5]}), [0.0, 0.5, 1.0])
+        with self.assertRaises(ValueError):
+            grid_points({"range": [0, 1]})
+
+    def test_build_units(self):
+        """
+        Tests that every code, word size and grid point gets a unit with the same seeded words.
+        """
+        units = build_units(self.config)
+        self.assertEqual(len(units), 2 * 2 * 2)
+        self.assertEqual(units[0].key, (0.0, "hamming:4", 11))
+        self.assertEqual(units[0].channel_args, (0.0,))
+        np.testing.assert_array_equal(units[0].input_bits, build_units(self.config)[0].input_bits)
+
+    def test_sweep_writes_csv(self):
+        """
+        Tests a headless sweep: a row per unit, no errors on a noiseless channel, reproducible counts.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "CSV", "results.csv")
+            results = run_config(self.config, output=output, verbose=False)
+            with open(output, newline='') as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(len(rows), len(results))
+        noiseless = [row for row in rows if float(row["Point"]) == 0.0]
+        self.assertTrue(all(float(row["Bit Error Rate"]) == 0.0 for row in noiseless))
+        self.assertTrue(all(int(row["Trials"]) == 200 for row in rows))
+        again = run_config(self.config, verbose=False)
+        self.assertEqual([counts.bit_errors for counts in results], [counts.bit_errors for counts in again])
+
+    def test_importance_sampling(self):
+        """
+        Tests that the points below the config's threshold are importance-sampled and marked in the CSV.
+        """
+        self.config.update(grid={"values": [1e-5, 0.05]}, word_sizes=[11], importance_sampling={"below": 1e-4})
+        units = build_units(self.config)
+        self.assertEqual([unit.biased_channel_args for unit in units], [(2 / 7,), None, (2 / 15,), None])
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.csv")
+            run_config(self.config, output=output, verbose=False)
+            with open(output, newline='') as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual([row["Estimator"] for row in rows], ["importance", "monte-carlo"] * 2)
+        self.assertTrue(all(0.0 < float(row["Bit Error Rate"]) < 1e-4 for row in rows[::2]))
+        self.assertTrue(all(float(row["BER Variance"]) > 0.0 for row in rows))
+
+    def test_metrics_and_profile(self):
+        """
+        Tests the metrics files written by the runner and the profile of a single point.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "run.json")
+            with open(config, "w") as file:
+                json.dump(self.config, file)
+            metrics = os.path.join(directory, "metrics.jsonl")
+            for _ in range(2):
+                runner.main([config, "-q", "-o", os.path.join(directory, "out.csv"), "--metrics", metrics])
+            with open(metrics) as file:
+                lines = [json.loads(line) for line in file]
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(lines[0]["configs"], [config])
+            self.assertEqual(lines[0]["counters"]["frames"], 2 * 200 * (3 + 5 + 1 + 2))
+            self.assertEqual(lines[0]["timers"]["csv"]["calls"], 8)
+
+            prometheus = os.path.join(directory, "metrics.prom")
+            runner.main([config, "-q", "--metrics", prometheus, "--metrics-format", "prometheus"])
+            with open(prometheus) as file:
+                self.assertIn('fec_stage_calls_total{stage="decode"}', file.read())
+
+            stats = os.path.join(directory, "point.prof")
+            runner.main([config, "-q", "--profile", "1", "--profile-output", stats])
+            self.assertGreater(os.path.getsize(stats), 0)
+            with self.assertRaises(ValueError):
+                runner.profile_point(self.config, 8)
+
+    def test_main_headless(self):
+        """
+        Tests that main runs without prompting when every setting is given on the command line.
+        """
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main.main(["--text", "FEC", "--channel", "bsc", "--channel-params", "0.0", "--code", "h"])
+        self.assertIn("Received text matches original: True", output.getvalue())
+
+    def test_main_channel_params(self):
+        """
+        Tests that a wrong number of channel parameters is a usage error, not a traceback.
+        """
+        for argv in (["--channel", "bsc", "--channel-params", "0.01", "0.02"],
+                     ["--channel", "ge", "--channel-params", "0.01", "0.1", "0.001"],
+                     ["--channel", "bsc", "--channel-params", "1.5"],
+                     ["--channel-params", "0.01"]):
+            with redirect_stderr(io.StringIO()) as errors, self.assertRaises(SystemExit) as raised:
+                main.parse_arguments(["--text", "FEC", "--code", "h"] + argv)
+            self.assertEqual(raised.exception.code, 2)
+            self.assertIn("error:", errors.getvalue())
+        args = main.parse_arguments(["--channel", "ge", "--channel-params", "0.01", "0.1", "0.001", "0.8"])
+        self.assertEqual(args.channel_params, [0.01, 0.1, 0.001, 0.8])
+
+    def test_lazy_imports(self):
+        """
+        Tests that the help texts and a Hamming stream run do not import galois, scipy or matplotlib.
+        """
+        script = (
+            "import sys, contextlib, io\n"
+            "import main\n"
+            "from simulation.scripts import runner\n"
+            "for parse in (main.parse_arguments, runner.main):\n"
+            "    try:\n"
+            "        with contextlib.redirect_stdout(io.StringIO()):\n"
+            "            parse(['--help'])\n"
+            "    except SystemExit:\n"
+            "        pass\n"
+            "runner.run_config({'mode': 'stream', 'code': {'type': 'hamming', 'params': [57]},\n"
+            "                   'channel': {'type': 'bsc', 'params': [0.01]}, 'input': sys.argv[1],\n"
+            "                   'output': sys.argv[1] + '.out'}, verbose=False)\n"
+            "print(sorted(name for name in ('galois', 'scipy', 'matplotlib') if name in sys.modules))\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "in.bin")
+            with open(source, "wb") as file:
+                file.write(bytes(range(256)) * 10)
+            result = subprocess.run([sys.executable, "-c", script, source], cwd=REPO_ROOT, capture_output=True,
+                                    text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from codes.hamming_code import HammingCode
+from codes.interleaver import BlockInterleaver
+from simulation.scripts.stream import StreamPipeline, read_blocks, segment_frames
+
+
+class TestStreamPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.data = np.random.default_rng(0).bytes(100003)
+
+    def test_segment_frames(self):
+        """
+        Tests that frames cross block boundaries and only the last frame is padded.
+        """
+        blocks = read_blocks(io.BytesIO(self.data[:1001]), block_size=100)
+        batches = list(segment_frames(blocks, 57, batch_frames=16))
+        bits = np.concatenate([frames.ravel()[:valid_bits] for frames, valid_bits in batches])
+        np.testing.assert_array_equal(np.packbits(bits), np.frombuffer(self.data[:1001], dtype=np.uint8))
+        self.assertTrue(all(len(frames) <= 16 for frames, _ in batches))
+        self.assertEqual(sum(valid_bits for _, valid_bits in batches), 8008)
+
+    def test_round_trip(self):
+        """
+        Tests that a noiseless stream is reconstructed exactly, through files and in memory.
+        """
+        pipeline = StreamPipeline(HammingCode(57), BSCChannel(0.0), block_size=4096, batch_frames=256)
+        with tempfile.TemporaryDirectory() as directory:
+            source, sink = os.path.join(directory, "in.bin"), os.path.join(directory, "out.bin")
+            with open(source, "wb") as file:
+                file.write(self.data)
+            counts = pipeline.run(source, sink)
+            with open(sink, "rb") as file:
+                self.assertEqual(file.read(), self.data)
+        self.assertEqual(counts.bits, 8 * len(self.data))
+        self.assertEqual(counts.bit_errors, 0)
+
+        sink = io.BytesIO()
+        pipeline = StreamPipeline(HammingCode(57), BSCChannel(1e-3, rng=1), interleaver=BlockInterleaver(4, 63))
+        counts = pipeline.run(io.BytesIO(self.data), sink)
+        received = np.unpackbits(np.frombuffer(sink.getvalue(), dtype=np.uint8))
+        sent = np.unpackbits(np.frombuffer(self.data, dtype=np.uint8))
+        self.assertEqual((received != sent).sum(), counts.bit_errors)
+
+    def test_stage_failure_is_raised(self):
+        """
+        Tests that an exception in a stage stops the pipeline and is re-raised.
+        """
+        class FailingSink(io.BytesIO):
+            def write(self, data):
+                raise OSError("disk full")
+
+        pipeline = StreamPipeline(HammingCode(57), BSCChannel(0.0), block_size=256, batch_frames=8, queue_size=1)
+        with self.assertRaises(OSError):
+            pipeline.run(io.BytesIO(self.data), FailingSink())
+
+
+if __name__ == '__main__':
+    unittest.main()
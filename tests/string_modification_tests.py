@@ -0,0 +1,73 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from simulation.scripts.string_modification import (bits_to_string, bits_to_text_chunks, string_to_bits,
+                                                    text_file_to_bits)
+
+
+class TestStringModification(unittest.TestCase):
+
+    def setUp(self):
+        self.text = "Forward error correction: ČŠŽ ÆØÅ, Ελληνικά, 日本語 and 🚀\n" * 50
+
+    def test_ascii_bits(self):
+        """
+        Tests that ASCII characters map to their 8-bit codes, most significant bit first.
+        """
+        np.testing.assert_array_equal(string_to_bits("Ab"), [0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 1, 0, 0, 0, 1, 0])
+        self.assertEqual(string_to_bits("Ab").dtype, np.uint8)
+        self.assertEqual(bits_to_string([0, 1, 0, 0, 0, 0, 0, 1]), "A")
+        self.assertEqual(bits_to_string(string_to_bits("")), "")
+
+    def test_unicode_round_trip(self):
+        """
+        Tests that non-ASCII text round-trips through its UTF-8 bits.
+        """
+        bits = string_to_bits(self.text)
+        self.assertEqual(len(bits), 8 * len(self.text.encode("utf-8")))
+        self.assertEqual(bits_to_string(bits), self.text)
+
+    def test_invalid_bytes(self):
+        """
+        Tests that bytes corrupted into invalid UTF-8 are replaced, or raise in strict mode.
+        """
+        bits = string_to_bits("é")
+        bits[0] ^= 1  # The lead byte becomes a continuation byte
+        self.assertIn("�", bits_to_string(bits))
+        with self.assertRaises(UnicodeDecodeError):
+            bits_to_string(bits, errors="strict")
+
+    def test_streaming(self):
+        """
+        Tests that the chunked conversions give the same bits and text as the whole-string ones.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input.txt")
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.write(self.text)
+            chunks = list(text_file_to_bits(path, chunk_size=37))
+        bits = np.concatenate(chunks)
+        np.testing.assert_array_equal(bits, string_to_bits(self.text))
+
+        # Re-split at arbitrary bit positions, cutting through bytes and multi-byte characters
+        pieces = np.split(bits, [5, 13, 100, 1001, 2049])
+        self.assertEqual("".join(bits_to_text_chunks(pieces)), self.text)
+        self.assertEqual("".join(bits_to_text_chunks(text_file_to_bits(io.StringIO("abc"), 2))), "abc")
+
+    def test_large_text_is_fast(self):
+        """
+        Tests that megabytes of text are converted in well under a second.
+        """
+        text = "0123456789abcdef" * (1 << 16)  # 1 MiB
+        start = time.perf_counter()
+        self.assertEqual(bits_to_string(string_to_bits(text)), text)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
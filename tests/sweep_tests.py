@@ -0,0 +1,149 @@
+import unittest
+import numpy as np
+
+from channels.BSC_channel import BSCChannel
+from channels.GE_channel import GilbertElliottChannel
+from codes.hamming_code import HammingCode
+from codes.interleaver import BlockInterleaver
+from simulation.scripts.result_store import ResultStore
+from simulation.scripts.sweep import (BLOCK_SAMPLES, ErrorCounts, StoppingRule, WorkUnit, confidence_interval,
+                                      frame_errors, replay_frame, run_sweep, unit_seed)
+
+
+class TestSweepEngine(unittest.TestCase):
+
+    def setUp(self):
+        input_bits = np.random.default_rng(0).integers(0, 2, 11)
+        self.units = [WorkUnit(HammingCode, (4,), BSCChannel, (ber,), input_bits, key=(ber,))
+                      for ber in (0.001, 0.01, 0.1)]
+        self.units.append(WorkUnit(HammingCode, (4,), GilbertElliottChannel, (0.01, 0.1, 0.001, 0.8),
+                                   input_bits, key=("GE",)))
+        self.fixed = StoppingRule(max_trials=250, initial_batch=60, growth=1.0)
+
+    def test_results_independent_of_worker_count(self):
+        """
+        Tests that the merged counts depend only on the seed, not on the number of workers.
+        """
+        adaptive = StoppingRule(min_frame_errors=20, max_trials=5000, initial_batch=50)
+        serial = run_sweep(self.units, stopping=adaptive, seed=42, max_workers=1)
+        parallel = run_sweep(self.units, stopping=adaptive, seed=42, max_workers=3)
+        for a, b in zip(serial, parallel):
+            self.assertEqual(repr(a), repr(b))
+
+    def test_counts(self):
+        """
+        Tests the trial bookkeeping and that errors grow with the BER.
+        """
+        finished = []
+        counts = run_sweep(self.units, stopping=self.fixed, seed=1, max_workers=1,
+                           callback=lambda unit, unit_counts: finished.append(unit.key))
+
+        self.assertEqual(sorted(finished, key=str), sorted([unit.key for unit in self.units], key=str))
+        for unit_counts in counts:
+            self.assertEqual(unit_counts.samples, 250)
+            self.assertEqual(unit_counts.frames, 250 * 3)  # 11 bits -> three 4-bit frames
+            self.assertEqual(unit_counts.bits, 250 * 11)
+        self.assertLess(counts[0].bit_errors, counts[2].bit_errors)
+
+    def test_adaptive_stopping(self):
+        """
+        Tests that points stop on the error target at high BER and on the trial budget at low BER.
+        """
+        rule = StoppingRule(min_frame_errors=50, max_trials=3000, initial_batch=100, growth=2.0)
+        low, _, high, _ = run_sweep(self.units, stopping=rule, seed=3, max_workers=1)
+
+        self.assertGreaterEqual(high.frame_errors, 50)
+        self.assertLess(high.samples, 3000)
+        self.assertLess(low.frame_errors, 50)
+        self.assertEqual(low.samples, 3000)
+
+    def test_ci_width_rule(self):
+        """
+        Tests that the confidence-interval rule stops once the relative width is reached.
+        """
+        rule = StoppingRule(ci_width=0.5, max_trials=100000)
+        counts = run_sweep(self.units[2:3], stopping=rule, seed=4, max_workers=1)[0]
+        lower, upper = counts.confidence_interval()
+        self.assertLessEqual(upper - lower, 0.5 * counts.bit_error_rate)
+        self.assertLess(counts.samples, 100000)
+
+    def test_confidence_interval(self):
+        """
+        Tests the Wilson and Clopper-Pearson intervals against known values.
+        """
+        lower, upper = confidence_interval(10, 100, 0.95, "wilson")
+        self.assertAlmostEqual(lower, 0.0552, places=4)
+        self.assertAlmostEqual(upper, 0.1744, places=4)
+        lower, upper = confidence_interval(10, 100, 0.95, "clopper-pearson")
+        self.assertAlmostEqual(lower, 0.0490, places=4)
+        self.assertAlmostEqual(upper, 0.1762, places=4)
+        self.assertEqual(confidence_interval(0, 100, 0.95, "clopper-pearson")[0], 0.0)
+
+    def test_merge(self):
+        """
+        Tests that partial counts are merged field by field.
+        """
+        merged = ErrorCounts(1, 10, 1, 2, 1) + ErrorCounts(2, 10, 1, 2, 1)
+        self.assertEqual(repr(merged), repr(ErrorCounts(3, 20, 2, 4, 2)))
+        self.assertEqual(merged.average_bit_errors, 1.5)
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        input_bits = np.random.default_rng(0).integers(0, 2, 11)
+        self.units = [WorkUnit(HammingCode, (4,), BSCChannel, (0.05,), input_bits, key=(0.05,)),
+                      WorkUnit(HammingCode, (4,), GilbertElliottChannel, (0.05, 0.2, 0.001, 0.5), input_bits,
+                               key=("GE",), interleaver=BlockInterleaver(4, 7))]
+        # Two batches spanning several blocks each, the last one partial
+        self.rule = StoppingRule(max_trials=2 * (2 * BLOCK_SAMPLES + 50), initial_batch=2 * BLOCK_SAMPLES + 50,
+                                 growth=1.0)
+
+    def test_failed_frames_match_the_sweep(self):
+        """
+        Tests that re-simulating a single batch finds as many failed frames as the sweep counted.
+        """
+        with ResultStore(":memory:") as store:
+            run_sweep(self.units, stopping=self.rule, seed=7, max_workers=1, store=store)
+            batches = store.connection.execute(
+                "SELECT point_id, batch, frame_errors FROM batches ORDER BY point_id, batch").fetchall()
+        self.assertEqual(len(batches), 4)
+        for point_id, batch, errors in batches:
+            failed = frame_errors(self.units[point_id - 1], 7, batch, self.rule)
+            self.assertEqual(len(failed), errors)
+
+    def test_replay_frame(self):
+        """
+        Tests that replaying every frame of a batch one by one reproduces the errors of the batch.
+        """
+        for unit in self.units:
+            failed = frame_errors(unit, 3, 1, self.rule)
+            replayed = [frame for frame in range((2 * BLOCK_SAMPLES + 50) * 3)
+                        if replay_frame(unit, 3, 1, frame, self.rule)["errors"].any()]
+            self.assertEqual(replayed, failed.tolist())
+
+        frame = replay_frame(self.units[1], 3, 1, int(failed[-1]), self.rule)
+        self.assertEqual(frame["states"].shape, (7,))
+        self.assertTrue((frame["received"] != frame["codeword"]).any())
+        with self.assertRaises(ValueError):
+            replay_frame(self.units[0], 3, 0, (2 * BLOCK_SAMPLES + 50) * 3, self.rule)
+
+    def test_streams_follow_the_point(self):
+        """
+        Tests that a point draws the same stream wherever it sits in the sweep, and other points other streams.
+        """
+        extra = WorkUnit(HammingCode, (4,), BSCChannel, (0.1,), self.units[0].input_bits, key=(0.1,))
+        alone = run_sweep(self.units[:1], stopping=self.rule, seed=3, max_workers=1)
+        shifted = run_sweep([extra] + self.units, stopping=self.rule, seed=3, max_workers=1)
+        self.assertEqual(repr(shifted[1]), repr(alone[0]))
+
+        # Same parameters and key, but another word: an unrelated stream
+        other_word = WorkUnit(HammingCode, (4,), BSCChannel, (0.05,), 1 - self.units[0].input_bits, key=(0.05,))
+        seeds = {tuple(unit_seed(unit, 3).generate_state(4)) for unit in (self.units[0], other_word, extra)}
+        self.assertEqual(len(seeds), 3)
+        self.assertEqual(unit_seed(self.units[0], 3).generate_state(4).tolist(),
+                         unit_seed(self.units[0], 3).generate_state(4).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
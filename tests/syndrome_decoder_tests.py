@@ -0,0 +1,93 @@
+import itertools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from codes.BCH_code import BCHCode
+from codes.hamming_code import HammingCode
+from codes.syndrome_decoder import NO_LEADER, SyndromeTableDecoder
+from tests.cache_isolation import setUpModule, tearDownModule  # Temporary code cache
+
+
+class TestSyndromeTableDecoder(unittest.TestCase):
+
+    def setUp(self):
+        self.H = np.random.default_rng(0).integers(0, 2, (6, 12)).astype(np.uint8)
+
+    def test_coset_leaders_have_minimum_weight(self):
+        """
+        Tests the table against an exhaustive search over all 2^n error patterns.
+        """
+        decoder = SyndromeTableDecoder(self.H, cache=False)
+        patterns = np.array(list(itertools.product((0, 1), repeat=12)), dtype=np.uint8)
+        syndromes = decoder.syndromes(patterns)
+        minimum = np.full(len(decoder.weights), NO_LEADER)
+        np.minimum.at(minimum, syndromes, patterns.sum(axis=1))
+        np.testing.assert_array_equal(decoder.weights, minimum)
+
+        # Every leader has its syndrome and its weight
+        leaders = np.unpackbits(decoder.leaders, axis=1, count=12)
+        reachable = decoder.weights != NO_LEADER
+        np.testing.assert_array_equal(decoder.syndromes(leaders)[reachable], np.flatnonzero(reachable))
+        np.testing.assert_array_equal(leaders.sum(axis=1)[reachable], decoder.weights[reachable])
+
+    def test_decode(self):
+        """
+        Tests that complete decoding corrects up to a leader and bounded decoding flags heavier errors.
+        """
+        complete = SyndromeTableDecoder(self.H, cache=False)
+        bounded = SyndromeTableDecoder(self.H, max_weight=1, cache=False)
+        leaders = np.unpackbits(complete.leaders, axis=1, count=12)
+        heavy = np.flatnonzero(complete.weights == 2)[:5]
+
+        corrected, failed = complete.decode(leaders[heavy])
+        self.assertFalse(corrected.any() or failed.any())
+        corrected, failed = bounded.decode(leaders[heavy])
+        np.testing.assert_array_equal(corrected, leaders[heavy])  # Left uncorrected
+        self.assertTrue(failed.all())
+
+    def test_disk_cache(self):
+        """
+        Tests that a cached table is identical to a freshly built one.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch("codes.cache.CACHE_DIR", cache_dir):
+            built = SyndromeTableDecoder(self.H, max_weight=2)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, "syndrome"))), 1)
+            loaded = SyndromeTableDecoder(self.H, max_weight=2)
+        np.testing.assert_array_equal(built.leaders, loaded.leaders)
+        np.testing.assert_array_equal(built.weights, loaded.weights)
+
+    def test_hamming_backend(self):
+        """
+        Tests that the syndrome backend of HammingCode matches the error-position decoder.
+        """
+        rng = np.random.default_rng(1)
+        for m in (4, 11, 20):
+            position, syndrome = HammingCode(m), HammingCode(m, backend="syndrome")
+            received = rng.integers(0, 2, (500, position.n), dtype=np.uint8)
+            for expected, actual in zip(position.decode_batch(received, return_status=True),
+                                        syndrome.decode_batch(received, return_status=True)):
+                np.testing.assert_array_equal(actual, expected)
+
+    def test_bch_backend(self):
+        """
+        Tests that the syndrome backend of BCHCode matches the Berlekamp-Massey decoder, errors beyond t included.
+        """
+        rng = np.random.default_rng(2)
+        for n, k in ((15, 5), (31, 26), (63, 57)):
+            table, syndrome = BCHCode(n, k, backend="table"), BCHCode(n, k, backend="syndrome")
+            received = table.encode_batch(rng.integers(0, 2, (400, k), dtype=np.uint8))
+            received ^= (rng.random(received.shape) < 0.06).astype(np.uint8)
+            for expected, actual in zip(table.decode_batch(received, return_status=True),
+                                        syndrome.decode_batch(received, return_status=True)):
+                np.testing.assert_array_equal(actual, expected)
+        self.assertEqual(BCHCode(15, 7).backend, "syndrome")
+        with self.assertRaises(ValueError):
+            BCHCode(127, 50, backend="syndrome")
+
+
+if __name__ == "__main__":
+    unittest.main()